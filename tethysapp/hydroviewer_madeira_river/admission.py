@@ -0,0 +1,207 @@
+"""
+Admission control of the requests to the upstream services (ANA and GEOGloWS), shared by all the workers of a node.
+
+Each upstream has a number of concurrency slots and a token bucket refilled at its rate (requests per minute),
+both kept in lock files of the app workspace so every worker process and thread takes from the same pool. Callers
+wait in line for a slot, and the interactive requests (station clicks) go ahead of the background work (cache
+refreshes, batch jobs, pre-warming): background callers never take the last slot and step aside while any
+interactive caller is waiting. The limits are set with the app custom settings upstream_concurrency and
+upstream_rates, e.g. ana:4, geoglows:8 and ana:120, geoglows:300.
+"""
+import fcntl
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from . import timing
+from .cache import parse_namespace_values
+from .config import APP_WORKSPACE
+
+ADMISSION_DIR = os.path.join(APP_WORKSPACE, 'admission')
+
+DEFAULT_CONCURRENCY = {
+    'ana': 4,
+    'geoglows': 8,
+}
+DEFAULT_RATES = {
+    'ana': 120,
+    'geoglows': 300,
+}
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+# Interval between the attempts to take a slot, and longest wait in line, by priority
+RETRY_INTERVAL = {INTERACTIVE: 0.02, BACKGROUND: 0.2}
+QUEUE_TIMEOUT = {INTERACTIVE: 60, BACKGROUND: 900}
+
+_settings = {}
+
+# Priority set explicitly for the current context (e.g. the background jobs of a user)
+_priority = ContextVar('hydroviewer_priority', default=None)
+
+
+class AdmissionTimeout(Exception):
+    pass
+
+
+def admission_settings():
+    """
+    Concurrency and rate of each upstream. Batch jobs run outside of the portal use the defaults.
+    """
+    if not _settings:
+        concurrency = ''
+        rates = ''
+        try:
+            from .app import HistoricalValidationToolMadeiraRiver as app
+            concurrency = app.get_custom_setting('upstream_concurrency') or ''
+            rates = app.get_custom_setting('upstream_rates') or ''
+        except Exception as e:
+            print('Using the default upstream limits: {0}'.format(str(e)))
+
+        _settings['concurrency'] = parse_namespace_values(concurrency, DEFAULT_CONCURRENCY)
+        _settings['rates'] = parse_namespace_values(rates, DEFAULT_RATES)
+
+    return _settings
+
+
+def current_priority():
+    """
+    Priority set for the context, otherwise interactive within a controller request and background elsewhere
+    """
+    level = _priority.get()
+    if level is not None:
+        return level
+    return INTERACTIVE if timing._request.get() is not None else BACKGROUND
+
+
+@contextmanager
+def priority(level):
+    """
+    Run a block with the given priority
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _lock_file(upstream, name):
+    os.makedirs(ADMISSION_DIR, exist_ok=True)
+    return os.open(os.path.join(ADMISSION_DIR, '{0}.{1}'.format(upstream, name)), os.O_RDWR | os.O_CREAT, 0o644)
+
+
+def _try_slot(upstream, slots):
+    """
+    Lock the first free slot of an upstream, None if they are all taken.
+    The lock is released by the system if the worker dies.
+    """
+    for slot in range(slots):
+        fd = _lock_file(upstream, 'slot{0}'.format(slot))
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            os.close(fd)
+    return None
+
+
+def _release(fd):
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+def _interactive_waiting(upstream):
+    """
+    Whether interactive callers are waiting for a slot (they hold a shared lock on the waiting file)
+    """
+    fd = _lock_file(upstream, 'waiting')
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        return False
+    except BlockingIOError:
+        return True
+    finally:
+        os.close(fd)
+
+
+def _acquire_slot(upstream, concurrency, level):
+    deadline = time.time() + QUEUE_TIMEOUT[level]
+    waiting = None
+
+    if level == INTERACTIVE:
+        slots = concurrency
+        waiting = _lock_file(upstream, 'waiting')
+        fcntl.flock(waiting, fcntl.LOCK_SH)
+    else:
+        # The last slot is kept for the interactive requests
+        slots = max(concurrency - 1, 1)
+
+    try:
+        while True:
+            if level == INTERACTIVE or not _interactive_waiting(upstream):
+                fd = _try_slot(upstream, slots)
+                if fd is not None:
+                    return fd
+            if time.time() > deadline:
+                raise AdmissionTimeout('No {0} slot was free after {1} seconds.'.format(upstream,
+                                                                                        QUEUE_TIMEOUT[level]))
+            time.sleep(RETRY_INTERVAL[level])
+    finally:
+        if waiting is not None:
+            _release(waiting)
+
+
+def _take_token(upstream, rate):
+    """
+    Take a token from the bucket of an upstream, returns the seconds to wait for it.
+    The bucket holds up to one minute of requests and goes negative while callers wait for their tokens.
+    """
+    fd = _lock_file(upstream, 'bucket')
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        now = time.time()
+        state = os.pread(fd, 64, 0).decode('ascii').split()
+        if len(state) == 2:
+            tokens, updated = float(state[0]), float(state[1])
+            tokens = min(float(rate), tokens + (now - updated) * rate / 60.0)
+        else:
+            tokens = float(rate)
+        tokens -= 1
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, '{0:.6f} {1:.6f}'.format(tokens, now).encode('ascii'), 0)
+    finally:
+        _release(fd)
+
+    return max(-tokens, 0) * 60.0 / rate
+
+
+@contextmanager
+def admit(upstream):
+    """
+    Hold a slot of an upstream (and a token of its rate) while a block calls it
+    """
+    settings = admission_settings()
+    concurrency = settings['concurrency'].get(upstream, 0)
+    rate = settings['rates'].get(upstream, 0)
+
+    if concurrency <= 0:
+        yield
+        return
+
+    with timing.stage('queue', upstream=upstream):
+        fd = _acquire_slot(upstream, concurrency, current_priority())
+        try:
+            if rate > 0:
+                time.sleep(_take_token(upstream, rate))
+        except BaseException:
+            _release(fd)
+            raise
+
+    try:
+        yield
+    finally:
+        _release(fd)
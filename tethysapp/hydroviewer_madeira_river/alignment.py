@@ -0,0 +1,95 @@
+"""
+Alignment of daily series by integer arithmetic on epoch-day offsets.
+
+Every series is held as a start day plus a dense daily array, so the overlap of several series is computed
+from their start and end days and each aligned series is a view (slice) of its array. The rows where any
+series is missing are described by one shared mask.
+"""
+import numpy as np
+import pandas as pd
+
+from .timing import timed_stage
+
+
+def _epoch_days(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    return index.values.astype('datetime64[D]').astype(np.int64)
+
+
+def to_daily_array(series_df):
+    """
+    Start day and dense daily values of the first column of a dataframe.
+    Series that are already contiguous and sorted are used without copying.
+    """
+    values = series_df.iloc[:, 0].values
+    if len(values) == 0:
+        return 0, values.astype(np.float64)
+
+    days = _epoch_days(series_df.index)
+    start = days[0]
+
+    if days[-1] - start + 1 == len(days) and (len(days) < 2 or (np.diff(days) == 1).all()):
+        return start, values
+
+    start = days.min()
+    dense = np.full(days.max() - start + 1, np.nan, dtype=np.result_type(values.dtype, np.float32))
+    dense[days - start] = values
+    return start, dense
+
+
+class AlignedSeries:
+    """
+    Views of several daily series over their common period with a shared validity mask
+    """
+
+    def __init__(self, start_day, arrays):
+        self.start_day = start_day
+        self.arrays = arrays
+
+        mask = np.ones(len(next(iter(arrays.values()))), dtype=bool) if arrays else np.zeros(0, dtype=bool)
+        for values in arrays.values():
+            mask &= np.isfinite(values)
+        self.mask = mask
+
+    def __len__(self):
+        return int(self.mask.sum())
+
+    @property
+    def dates(self):
+        """
+        Dates of the valid rows
+        """
+        days = self.start_day + np.flatnonzero(self.mask)
+        return pd.DatetimeIndex(days.astype('datetime64[D]'))
+
+    def values(self, name):
+        """
+        Valid values of one series
+        """
+        return self.arrays[name][self.mask]
+
+    def to_frame(self, sim_name, obs_name='observed'):
+        """
+        Simulated / Observed dataframe in the layout of hydrostats.data.merge_data
+        """
+        return pd.DataFrame({'Simulated': self.values(sim_name), 'Observed': self.values(obs_name)},
+                            index=self.dates)
+
+
+@timed_stage('merge')
+def align_series(**series):
+    """
+    Align daily dataframes given as keyword arguments (e.g. observed=..., simulated=..., corrected=...)
+    """
+    daily = {name: to_daily_array(series_df) for name, series_df in series.items()}
+
+    start = max(series_start for series_start, values in daily.values())
+    end = min(series_start + len(values) for series_start, values in daily.values())
+    length = max(end - start, 0)
+
+    arrays = {name: values[start - series_start:start - series_start + length]
+              for name, (series_start, values) in daily.items()}
+
+    return AlignedSeries(start, arrays)
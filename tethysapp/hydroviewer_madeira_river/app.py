@@ -1,3 +1,4 @@
+from tethys_sdk.app_settings import CustomSetting
 from tethys_sdk.base import TethysAppBase, url_map_maker
 
 
@@ -92,6 +93,16 @@ class HistoricalValidationToolMadeiraRiver(TethysAppBase):
                 name='get-time-series-bc',
                 url='get-time-series-bc',
                 controller='hydroviewer_madeira_river.controllers.get_time_series_bc'),
+            UrlMap(
+                name='get_ensemble_forecast_bc',
+                url='get-ensemble-forecast-bc',
+                controller='hydroviewer_madeira_river.controllers.get_ensemble_forecast_bc'
+            ),
+            UrlMap(
+                name='get_forecast_verification',
+                url='get-forecast-verification',
+                controller='hydroviewer_madeira_river.controllers.get_forecast_verification'
+            ),
             UrlMap(
                 name='get_observed_discharge_csv',
                 url='get-observed-discharge-csv',
@@ -117,6 +128,112 @@ class HistoricalValidationToolMadeiraRiver(TethysAppBase):
                 url='get-forecast-bc-data-csv',
                 controller='hydroviewer_madeira_river.controllers.get_forecast_bc_data_csv'
             ),
+            UrlMap(
+                name='get_basin_aggregate_csv',
+                url='get-basin-aggregate-csv',
+                controller='hydroviewer_madeira_river.controllers.get_basin_aggregate_csv'
+            ),
+            UrlMap(
+                name='get_validation_leaderboard',
+                url='get-validation-leaderboard',
+                controller='hydroviewer_madeira_river.controllers.get_validation_leaderboard'
+            ),
+            UrlMap(
+                name='get_validation_geojson',
+                url='get-validation-geojson',
+                controller='hydroviewer_madeira_river.controllers.get_validation_geojson'
+            ),
+            UrlMap(
+                name='get_forecast_alerts',
+                url='get-forecast-alerts',
+                controller='hydroviewer_madeira_river.controllers.get_forecast_alerts'
+            ),
+            UrlMap(
+                name='get_station_catalog',
+                url='get-station-catalog',
+                controller='hydroviewer_madeira_river.controllers.get_station_catalog'
+            ),
+            UrlMap(
+                name='get_nearest_station',
+                url='get-nearest-station',
+                controller='hydroviewer_madeira_river.controllers.get_nearest_station'
+            ),
+            UrlMap(
+                name='start_bulk_export',
+                url='start-bulk-export',
+                controller='hydroviewer_madeira_river.controllers.start_bulk_export'
+            ),
+            UrlMap(
+                name='get_bulk_export_status',
+                url='get-bulk-export-status',
+                controller='hydroviewer_madeira_river.controllers.get_bulk_export_status'
+            ),
+            UrlMap(
+                name='get_bulk_export_archive',
+                url='get-bulk-export-archive',
+                controller='hydroviewer_madeira_river.controllers.get_bulk_export_archive'
+            ),
+            UrlMap(
+                name='get_job_result',
+                url='get-job-result',
+                controller='hydroviewer_madeira_river.controllers.get_job_result'
+            ),
+            UrlMap(
+                name='metrics',
+                url='metrics',
+                controller='hydroviewer_madeira_river.controllers.metrics'
+            ),
         )
 
         return url_maps
+
+    def custom_settings(self):
+        """
+        Cache and offline settings
+        """
+        return (
+            CustomSetting(
+                name='cache_backend',
+                type=CustomSetting.TYPE_STRING,
+                description='Cache backend of the fetched and derived series: memory, filesystem, redis or django.',
+                required=False,
+                default='filesystem',
+            ),
+            CustomSetting(
+                name='cache_location',
+                type=CustomSetting.TYPE_STRING,
+                description='Redis server URL (redis backend) or cache alias of the portal settings (django backend).',
+                required=False,
+            ),
+            CustomSetting(
+                name='cache_timeouts',
+                type=CustomSetting.TYPE_STRING,
+                description='Timeout in seconds of each cache namespace, e.g. observed:21600, forecast:10800.',
+                required=False,
+            ),
+            CustomSetting(
+                name='cache_max_entries',
+                type=CustomSetting.TYPE_STRING,
+                description='Maximum number of entries of each cache namespace, e.g. observed:300, simulated:300.',
+                required=False,
+            ),
+            CustomSetting(
+                name='upstream_concurrency',
+                type=CustomSetting.TYPE_STRING,
+                description='Concurrent requests of the workers of a node to each upstream, e.g. ana:4, geoglows:8.',
+                required=False,
+            ),
+            CustomSetting(
+                name='upstream_rates',
+                type=CustomSetting.TYPE_STRING,
+                description='Requests per minute of the workers of a node to each upstream, e.g. ana:120.',
+                required=False,
+            ),
+            CustomSetting(
+                name='offline_mode',
+                type=CustomSetting.TYPE_BOOLEAN,
+                description='Serve only cached data and never call ANA or GEOGloWS.',
+                required=False,
+                default=False,
+            ),
+        )
@@ -0,0 +1,468 @@
+"""
+Graph of the artefacts derived from the series of a station, stored with the fingerprints of their inputs.
+
+    observed  ──┬──> corrected ──┬──> merged ──┬──> metrics
+    simulated ──┤                │             ├──> volume
+                │                └──> pyramid  ├──> climatology
+                │                              └──> scatter
+    forecast  ──┴──> corrected_forecast (with observed and simulated)
+
+Each artefact declares its inputs, and its fingerprint is derived from theirs (see fingerprints), so an artefact
+is rebuilt only when one of its upstream series changed: a new forecast rebuilds the corrected forecast and never
+the historical metrics, and a new observation rebuilds the corrected series and what depends on it while the
+simulation is read from its cache. The artefacts are stored in workspaces/app_workspace/artefacts/<station>/ as
+<name>-<fingerprint>.pkl files, with a manifest of their current fingerprints that is merged under a lock of the
+station, so concurrent builds never pair an artefact with the fingerprint of another one. The artefacts of a period (start and end dates) are built from the sliced series
+and never stored. To drop (and rebuild) everything downstream of a series:
+
+    python -m tethysapp.hydroviewer_madeira_river.artefacts --changed observed --recompute --processes 8
+"""
+import argparse
+import datetime as dt
+import fcntl
+import glob
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from . import fetchers
+from .alignment import align_series
+from .bias_correction import correct_forecast
+from .config import APP_WORKSPACE, DEFAULT_METRICS
+from .fingerprints import derived_fingerprint, get_fingerprint
+from .lazy_imports import lazy_import
+from .periods import slice_period
+from .stations import get_stations
+
+hs = lazy_import('hydrostats')
+hd = lazy_import('hydrostats.data')
+integrate = lazy_import('scipy.integrate')
+sp = lazy_import('scipy.stats')
+
+ARTEFACTS_DIR = os.path.join(APP_WORKSPACE, 'artefacts')
+MANIFEST_FILE = 'manifest.json'
+
+# Changing how an artefact is built changes its fingerprint, so bump this when a builder changes
+BUILDERS_VERSION = 2
+
+# Daily discharge (m3/s) to volume (Mm3)
+VOLUME_FACTOR = 0.0864
+
+# Columns of the merged series, simulated versions first
+MERGED_COLUMNS = ['simulated', 'corrected', 'observed']
+
+# Days per point of the levels of the hydrograph pyramid. The coarser levels keep the days with the lowest and
+# highest flow of each bucket, so the peaks are not lost. The hydrographs of a period are drawn from the finest
+# level that fits in HYDROGRAPH_POINTS within the period.
+PYRAMID_LEVELS = (1, 7, 30)
+
+# Most points per series drawn in a hydrograph
+HYDROGRAPH_POINTS = 5000
+
+# Bins per axis of the scatter density grids
+SCATTER_BINS = 100
+
+
+def merged_frame(merged_df, simulated='simulated'):
+    """
+    Simulated / Observed dataframe in the layout of hydrostats.data.merge_data
+    """
+    return pd.DataFrame({'Simulated': merged_df[simulated].values, 'Observed': merged_df['observed'].values},
+                        index=merged_df.index)
+
+
+def build_corrected(station, observed, simulated):
+    return fetchers.get_corrected_data(simulated, observed, station['station_code'], station['comid'],
+                                       station.get('start'), station.get('end'))
+
+
+def build_merged(station, observed, simulated, corrected):
+    start, end = station.get('start'), station.get('end')
+    aligned = align_series(observed=slice_period(observed, start, end), simulated=slice_period(simulated, start, end),
+                           corrected=corrected)
+    return pd.DataFrame({column: aligned.values(column) for column in MERGED_COLUMNS}, index=aligned.dates)
+
+
+def pyramid_level(series, days):
+    """
+    Days with the lowest and highest flow of every bucket of a number of days
+    """
+    if days == 1:
+        return series
+    buckets = series.index.values.astype('datetime64[D]').astype(np.int64) // days
+    grouped = series.groupby(buckets)
+    return series.loc[pd.Index(grouped.idxmin().values).union(pd.Index(grouped.idxmax().values))]
+
+
+def build_pyramid(station, observed, simulated, corrected):
+    """
+    Levels of the observed, simulated and corrected series of the hydrographs, by days per point
+    """
+    start, end = station.get('start'), station.get('end')
+    pyramid = {}
+    for name, series_df in (('observed', slice_period(observed, start, end)),
+                            ('simulated', slice_period(simulated, start, end)), ('corrected', corrected)):
+        series = series_df.iloc[:, 0].dropna()
+        pyramid[name] = {days: pyramid_level(series, days) for days in PYRAMID_LEVELS}
+    return pyramid
+
+
+def hydrograph_series(pyramid, name, start=None, end=None, max_points=HYDROGRAPH_POINTS):
+    """
+    Finest level of a series of the pyramid with at most max_points points within the period (the coarsest one
+    otherwise), so a short period of a long record is drawn from the daily values
+    """
+    for days in PYRAMID_LEVELS:
+        level = slice_period(pyramid[name][days], start, end)
+        if len(level) <= max_points:
+            return level
+    return level
+
+
+def build_metrics(station, merged):
+    """
+    Default metrics of the original and corrected simulation (one row each)
+    """
+    tables = [hs.make_table(merged_dataframe=merged_frame(merged, simulated), metrics=DEFAULT_METRICS)
+              for simulated in ('simulated', 'corrected')]
+    metrics_df = pd.concat(tables)
+    metrics_df.index = ['original', 'corrected']
+    return metrics_df
+
+
+def build_volume(station, merged):
+    """
+    Cumulative volumes (Mm3) of every series and their totals
+    """
+    return {
+        'cumulative': (merged.astype(np.float64) * VOLUME_FACTOR).cumsum(),
+        'totals': {column: round(float(integrate.simps(merged[column].values)) * VOLUME_FACTOR, 3)
+                   for column in MERGED_COLUMNS},
+    }
+
+
+def build_climatology(station, merged):
+    """
+    Daily and monthly average flows of every series
+    """
+    climatology = {}
+    for period, average in (('daily', hd.daily_average), ('monthly', hd.monthly_average)):
+        original = average(merged_frame(merged, 'simulated'))
+        corrected = average(merged_frame(merged, 'corrected'))
+        climatology[period] = pd.DataFrame({'simulated': original.iloc[:, 0], 'corrected': corrected.iloc[:, 0],
+                                            'observed': original.iloc[:, 1]})
+    return climatology
+
+
+def density_bins(x, y, edges, log=False):
+    """
+    Centers and number of points of the non empty bins of a scatter plot
+    """
+    counts = np.histogram2d(x, y, bins=[edges, edges])[0]
+    if log:
+        centers = np.sqrt(edges[:-1] * edges[1:])
+    else:
+        centers = (edges[:-1] + edges[1:]) / 2
+    columns, rows = np.nonzero(counts)
+    return {'x': centers[columns], 'y': centers[rows], 'count': counts[columns, rows].astype(np.int64)}
+
+
+def build_scatter(station, merged):
+    """
+    Density bins (linear and logarithmic) and regression lines of the original and corrected simulations against
+    the observations, with the range of the 45 degree line
+    """
+    observed = merged['observed'].values.astype(np.float64)
+    simulated = merged['simulated'].values.astype(np.float64)
+    values = merged.values.astype(np.float64)
+
+    linear_edges = np.linspace(values.min(), values.max(), SCATTER_BINS + 1)
+    positive = values[values > 0]
+    log_edges = np.geomspace(positive.min(), positive.max(), SCATTER_BINS + 1) if len(positive) else None
+
+    scatter = {'range': (float(min(observed.min(), simulated.min())), float(max(observed.max(), simulated.max())))}
+    for key, name in (('original', 'simulated'), ('corrected', 'corrected')):
+        x = merged[name].values.astype(np.float64)
+        slope, intercept = sp.linregress(x, observed)[:2]
+        bins = {'slope': float(slope), 'intercept': float(intercept), 'linear': density_bins(x, observed, linear_edges)}
+        if log_edges is not None:
+            both = (x > 0) & (observed > 0)
+            bins['log'] = density_bins(x[both], observed[both], log_edges, log=True)
+        else:
+            bins['log'] = {'x': np.empty(0), 'y': np.empty(0), 'count': np.empty(0, dtype=np.int64)}
+        scatter[key] = bins
+    return scatter
+
+
+def build_corrected_forecast(station, forecast, observed, simulated):
+    mappings = fetchers.get_fdc_mappings(station['station_code'], station['comid'], simulated, observed)
+    return correct_forecast(forecast, mappings)
+
+
+# Series read from the basin store or fetched from the upstream services (through their caches), by artefact name
+SOURCES = {
+    'observed': lambda station: fetchers.get_stored_series('observed', station['station_code']),
+    'simulated': lambda station: fetchers.get_stored_series('simulated', station['comid']),
+    'forecast': lambda station: fetchers.get_forecast_stats(station['comid']),
+}
+
+# Derived artefacts: inputs, builder and whether they are stored in the workspace (the corrected series is
+# already kept by the corrected cache namespace under the same fingerprint)
+ARTEFACTS = {
+    'corrected': {'inputs': ('observed', 'simulated'), 'build': build_corrected, 'stored': False},
+    'merged': {'inputs': ('observed', 'simulated', 'corrected'), 'build': build_merged, 'stored': True},
+    'pyramid': {'inputs': ('observed', 'simulated', 'corrected'), 'build': build_pyramid, 'stored': True},
+    'metrics': {'inputs': ('merged',), 'build': build_metrics, 'stored': True},
+    'volume': {'inputs': ('merged',), 'build': build_volume, 'stored': True},
+    'climatology': {'inputs': ('merged',), 'build': build_climatology, 'stored': True},
+    'scatter': {'inputs': ('merged',), 'build': build_scatter, 'stored': True},
+    'corrected_forecast': {'inputs': ('forecast', 'observed', 'simulated'), 'build': build_corrected_forecast,
+                           'stored': False},
+}
+
+
+def downstream(names):
+    """
+    Artefacts that depend (directly or not) on any of the given artefacts or sources, in build order
+    """
+    affected = set(names)
+    result = []
+    changed = True
+    while changed:
+        changed = False
+        for name, artefact in ARTEFACTS.items():
+            if name not in result and affected.intersection(artefact['inputs']):
+                affected.add(name)
+                result.append(name)
+                changed = True
+    return [name for name in ARTEFACTS if name in result]
+
+
+def _station_dir(station_code):
+    return os.path.join(ARTEFACTS_DIR, str(station_code))
+
+
+def _artefact_file(station_code, name, fingerprint):
+    return os.path.join(_station_dir(station_code), '{0}-{1}.pkl'.format(name, fingerprint))
+
+
+def _remove_artefact_files(station_code, name, keep=None):
+    """
+    Remove the stored versions of an artefact, but the one of the keep fingerprint
+    """
+    for path in glob.glob(_artefact_file(station_code, name, '*')):
+        if keep is None or path != _artefact_file(station_code, name, keep):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+@contextmanager
+def _manifest_lock(station_code):
+    """
+    Exclusive lock of the manifest of a station, released by the system if the process dies
+    """
+    os.makedirs(_station_dir(station_code), exist_ok=True)
+    fd = os.open(os.path.join(_station_dir(station_code), MANIFEST_FILE + '.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def read_manifest(station_code):
+    path = os.path.join(_station_dir(station_code), MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def update_manifest(station_code, entries=None, removed=()):
+    """
+    Merge entries into the manifest of a station and drop the removed artefacts (with their files), under the lock
+    of the station. Returns the merged manifest.
+    """
+    with _manifest_lock(station_code):
+        manifest = read_manifest(station_code)
+        manifest.update(entries or {})
+        for name in removed:
+            manifest.pop(name, None)
+            _remove_artefact_files(station_code, name)
+        for name, entry in (entries or {}).items():
+            _remove_artefact_files(station_code, name, keep=entry['fingerprint'])
+
+        path = os.path.join(_station_dir(station_code), MANIFEST_FILE)
+        fd, tmp_file = tempfile.mkstemp(dir=_station_dir(station_code), suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(tmp_file, path)
+
+    return manifest
+
+
+class StationArtefacts:
+    """
+    Artefacts of one station (or of a period of its series), built on demand from their inputs and read back while
+    their fingerprints hold. With precomputed, the stored artefacts are read back with the fingerprints recorded
+    by their last build (the nightly precompute) without fetching the sources to check them; only the missing ones
+    are built.
+    """
+
+    def __init__(self, station, start=None, end=None, precomputed=False):
+        self.station = dict(station, start=start, end=end)
+        self.station_code = station['station_code']
+        self.stored = start is None and end is None
+        self.precomputed = precomputed
+        self.manifest = read_manifest(self.station_code)
+        self.values = {}
+        self.fingerprints = {}
+        self.built = []
+
+    def fingerprint(self, name):
+        """
+        Fingerprint of a source (fetched to read it) or of a derived artefact (from its inputs, without building it).
+        A loaded artefact has the fingerprint of the manifest entry it was loaded with.
+        """
+        if name not in self.fingerprints:
+            if name in SOURCES:
+                self.fingerprints[name] = get_fingerprint(name, self.get(name))
+            else:
+                self.fingerprints[name] = derived_fingerprint(
+                    name, BUILDERS_VERSION, *[self.fingerprint(source) for source in ARTEFACTS[name]['inputs']])
+        return self.fingerprints[name]
+
+    def is_current(self, name):
+        entry = self.manifest.get(name)
+        if entry is None:
+            return False
+        return self.precomputed or entry['fingerprint'] == self.fingerprint(name)
+
+    def _load(self, name):
+        try:
+            return pd.read_pickle(_artefact_file(self.station_code, name, self.manifest[name]['fingerprint']))
+        except FileNotFoundError:
+            # Replaced by a newer version in the meantime
+            return None
+        except Exception as e:
+            print('Could not read {0} of {1}: {2}'.format(name, self.station_code, str(e)))
+            return None
+
+    def _save(self, name, value):
+        """
+        Store an artefact under its fingerprint, then point the manifest to it
+        """
+        os.makedirs(_station_dir(self.station_code), exist_ok=True)
+        fd, tmp_file = tempfile.mkstemp(dir=_station_dir(self.station_code), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            pd.to_pickle(value, f)
+        os.replace(tmp_file, _artefact_file(self.station_code, name, self.fingerprint(name)))
+
+        self.manifest = update_manifest(self.station_code, {name: {
+            'fingerprint': self.fingerprint(name),
+            'inputs': {source: self.fingerprint(source) for source in ARTEFACTS[name]['inputs']},
+            'built': dt.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        }})
+
+    def get(self, name):
+        """
+        Value of an artefact: fetched for the sources, read from the workspace if its fingerprint is current (or
+        if it was precomputed), otherwise built from its inputs (and stored)
+        """
+        if name in self.values:
+            return self.values[name]
+
+        if name in SOURCES:
+            value = SOURCES[name](self.station)
+        else:
+            artefact = ARTEFACTS[name]
+            stored = artefact['stored'] and self.stored
+            value = None
+            if stored and self.is_current(name):
+                fingerprint = self.manifest[name]['fingerprint']
+                value = self._load(name)
+                if value is not None:
+                    # What is built from a loaded artefact is keyed on the version that was loaded, which is
+                    # not checked against the sources in precomputed mode
+                    self.fingerprints[name] = fingerprint
+            if value is None:
+                value = artefact['build'](self.station, *[self.get(source) for source in artefact['inputs']])
+                self.built.append(name)
+                if stored:
+                    self._save(name, value)
+
+        self.values[name] = value
+        return value
+
+    def invalidate(self, changed):
+        """
+        Drop the stored artefacts downstream of the changed sources or artefacts, returns their names
+        """
+        names = downstream(changed)
+        for name in names:
+            self.values.pop(name, None)
+            self.fingerprints.pop(name, None)
+        self.manifest = update_manifest(self.station_code, removed=names)
+        return names
+
+
+def refresh_station(station, changed=(), recompute=True, names=None):
+    """
+    Invalidate what is downstream of the changed inputs of a station and rebuild the stale stored artefacts
+    (all of them, or the given names). Returns the names of the rebuilt artefacts.
+    """
+    row = {'station_code': station['station_code'], 'built': [], 'error': None}
+    try:
+        artefacts = StationArtefacts(station)
+        if changed:
+            artefacts.invalidate(changed)
+        if recompute:
+            for name in names or [name for name, artefact in ARTEFACTS.items() if artefact['stored']]:
+                artefacts.get(name)
+        row['built'] = artefacts.built
+    except Exception as e:
+        row['error'] = str(e)
+    return row
+
+
+def refresh_stations(processes=None, stations=None, changed=(), recompute=True, names=None):
+    """
+    refresh_station for all the stations on a process pool
+    """
+    if stations is None:
+        stations = get_stations()
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        return list(executor.map(partial(refresh_station, changed=changed, recompute=recompute, names=names),
+                                 stations))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Invalidate and rebuild the derived artefacts of the stations.')
+    parser.add_argument('--stations', nargs='*', help='Station codes (all the stations by default).')
+    parser.add_argument('--changed', nargs='*', default=[], choices=list(SOURCES) + list(ARTEFACTS),
+                        help='Sources or artefacts that changed: everything downstream is dropped.')
+    parser.add_argument('--recompute', action='store_true', help='Rebuild the stale artefacts.')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes.')
+    args = parser.parse_args()
+
+    stations = get_stations()
+    if args.stations:
+        stations = [station for station in stations if str(station['station_code']) in args.stations]
+
+    print('Downstream of {0}: {1}'.format(', '.join(args.changed) or '-', ', '.join(downstream(args.changed)) or '-'))
+    for row in refresh_stations(processes=args.processes, stations=stations, changed=args.changed,
+                                recompute=args.recompute):
+        if row['error']:
+            print('{0}: {1}'.format(row['station_code'], row['error']))
+        else:
+            print('{0}: rebuilt {1}'.format(row['station_code'], ', '.join(row['built']) or 'nothing'))
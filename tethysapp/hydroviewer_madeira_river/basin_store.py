@@ -0,0 +1,174 @@
+"""
+Memory-mapped store of the observed series of every station and the simulated series of every reach.
+
+Both are float32 matrices on a common daily axis (one row per station or reach, NaN where there is no data)
+written as raw files in workspaces/app_workspace/basin_store and opened with numpy.memmap, so reading a
+series is a slice of a row served from the page cache. The index keeps the fingerprint of every series, so the
+series read from the store key the derived artefacts like the fetched ones. The station series tabs and the
+artefacts (hydrographs, precompute) read their series from here and fall back to the fetchers. The store is rebuilt
+on a schedule (e.g. nightly, before the precompute):
+
+    python -m tethysapp.hydroviewer_madeira_river.basin_store --threads 8
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from . import fetchers
+from .alignment import to_daily_array
+from .config import APP_WORKSPACE
+from .stations import get_stations
+
+STORE_DIR = os.path.join(APP_WORKSPACE, 'basin_store')
+INDEX_FILE = os.path.join(STORE_DIR, 'index.json')
+
+COLUMNS = {'observed': 'Observed Streamflow', 'simulated': 'Simulated Streamflow'}
+
+_opened = {'mtime': None, 'index': None, 'rows': None, 'arrays': None}
+
+
+def _download(kind, key):
+    """
+    Start day, daily values and fingerprint of a series, None if it could not be downloaded
+    """
+    try:
+        if kind == 'observed':
+            series_df = fetchers.download_observed_data(key)
+        else:
+            series_df = fetchers.download_simulated_data(key)
+        return to_daily_array(series_df) + (series_df.attrs.get('fingerprint'),)
+    except Exception as e:
+        print('{0} {1}: {2}'.format(kind, key, str(e)))
+        return None
+
+
+def build_store(threads=8, stations=None):
+    """
+    Download the series of all the stations and write the store
+    """
+    if stations is None:
+        stations = get_stations()
+
+    keys = {
+        'observed': sorted({station['station_code'] for station in stations}),
+        'simulated': sorted({station['comid'] for station in stations}),
+    }
+
+    series = {}
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for kind in COLUMNS:
+            series[kind] = list(executor.map(partial(_download, kind), keys[kind]))
+
+    spans = []
+    for kind in COLUMNS:
+        for item in series[kind]:
+            if item is not None and len(item[1]) > 0:
+                spans.append((item[0], item[0] + len(item[1])))
+    if not spans:
+        raise ValueError('No series could be downloaded.')
+
+    # Common daily axis covering all the series
+    start_day = min(span[0] for span in spans)
+    days = max(span[1] for span in spans) - start_day
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    build = dt.datetime.utcnow().strftime('%Y%m%d%H%M%S')
+    index = {'generated': build, 'start_day': int(start_day), 'days': int(days), 'files': {}, 'keys': {},
+             'fingerprints': {}}
+
+    for kind in COLUMNS:
+        file_name = '{0}_{1}.f32'.format(kind, build)
+        matrix = np.memmap(os.path.join(STORE_DIR, file_name), dtype=np.float32, mode='w+',
+                           shape=(max(len(keys[kind]), 1), days))
+        matrix[:] = np.nan
+        for row, item in enumerate(series[kind]):
+            if item is not None:
+                start, values = item[:2]
+                matrix[row, start - start_day:start - start_day + len(values)] = values
+        matrix.flush()
+        del matrix
+
+        index['files'][kind] = file_name
+        index['keys'][kind] = [str(key) for key in keys[kind]]
+        index['fingerprints'][kind] = [item[2] if item is not None else None for item in series[kind]]
+
+    # The index is replaced last, readers keep the files of the previous build until they reopen the store
+    fd, tmp_file = tempfile.mkstemp(dir=STORE_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_file, INDEX_FILE)
+
+    for file_name in os.listdir(STORE_DIR):
+        if file_name.endswith('.f32') and file_name not in index['files'].values():
+            os.remove(os.path.join(STORE_DIR, file_name))
+
+    return index
+
+
+def open_store():
+    """
+    Index and memory maps of the current build, reopened only when the store changes. None if it is not built.
+    """
+    if not os.path.exists(INDEX_FILE):
+        return None
+
+    mtime = os.path.getmtime(INDEX_FILE)
+    if _opened['mtime'] != mtime:
+        with open(INDEX_FILE) as f:
+            index = json.load(f)
+        _opened['arrays'] = {
+            kind: np.memmap(os.path.join(STORE_DIR, index['files'][kind]), dtype=np.float32, mode='r',
+                            shape=(max(len(index['keys'][kind]), 1), index['days']))
+            for kind in COLUMNS
+        }
+        _opened['rows'] = {kind: {key: row for row, key in enumerate(index['keys'][kind])} for kind in COLUMNS}
+        _opened['index'] = index
+        _opened['mtime'] = mtime
+
+    return _opened
+
+
+def read_series(kind, key):
+    """
+    Series of a station (observed) or reach (simulated) as a dataframe over a view of its row, trimmed to the period
+    with data and tagged with its fingerprint. None if it is not in the store.
+    """
+    store = open_store()
+    if store is None:
+        return None
+
+    row = store['rows'][kind].get(str(key))
+    if row is None:
+        return None
+
+    values = store['arrays'][kind][row]
+    valid = np.flatnonzero(np.isfinite(values))
+    if len(valid) == 0:
+        return None
+
+    first, last = valid[0], valid[-1] + 1
+    start_day = store['index']['start_day'] + first
+    index = pd.date_range(pd.Timestamp(start_day, unit='D'), periods=last - first, freq='D', name='Datetime')
+
+    series_df = pd.DataFrame(data=values[first:last, None], index=index, columns=[COLUMNS[kind]], copy=False)
+    fingerprints = store['index'].get('fingerprints', {}).get(kind)
+    if fingerprints and fingerprints[row] is not None:
+        series_df.attrs['fingerprint'] = fingerprints[row]
+    return series_df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the memory-mapped basin time series store.')
+    parser.add_argument('--threads', type=int, default=8, help='Number of download threads.')
+    args = parser.parse_args()
+
+    result = build_store(threads=args.threads)
+    print('Stored {0} stations and {1} reaches over {2} days.'.format(
+        len(result['keys']['observed']), len(result['keys']['simulated']), result['days']))
@@ -0,0 +1,72 @@
+"""
+Flow duration curve (quantile) mapping applied to whole arrays at once.
+"""
+import numpy as np
+import pandas as pd
+
+# Non-exceedance probabilities where the flow duration curves are evaluated
+PROBABILITIES = np.linspace(0, 1, 201)
+
+
+def _interp_extrapolate(x, xp, fp):
+    """
+    np.interp with proportional extrapolation beyond the ends of the curve
+    """
+    result = np.interp(x, xp, fp)
+
+    above = x > xp[-1]
+    if xp[-1] > 0:
+        result[above] = fp[-1] * x[above] / xp[-1]
+
+    below = x < xp[0]
+    if xp[0] > 0:
+        result[below] = fp[0] * x[below] / xp[0]
+
+    return result
+
+
+def apply_mapping(values, simulated_fdc, observed_fdc):
+    """
+    Map simulated flows of any shape onto the observed flow duration curve in one interpolation.
+    NaN values stay NaN.
+    """
+    values = np.asarray(values)
+    flat = values.astype(np.float64).ravel()
+    corrected = np.full(flat.shape, np.nan)
+
+    finite = np.isfinite(flat)
+    if np.isfinite(simulated_fdc).all() and np.isfinite(observed_fdc).all():
+        # Flows beyond the simulated curve keep the ratio to its ends
+        inside = finite & (flat >= simulated_fdc[0]) & (flat <= simulated_fdc[-1])
+        probabilities = np.interp(flat[inside], simulated_fdc, PROBABILITIES)
+        corrected[inside] = np.interp(probabilities, PROBABILITIES, observed_fdc)
+
+        outside = finite & ~inside
+        corrected[outside] = _interp_extrapolate(flat[outside], simulated_fdc, observed_fdc)
+
+    corrected[corrected < 0] = 0
+    return corrected.reshape(values.shape).astype(values.dtype if values.dtype.kind == 'f' else np.float64)
+
+
+def correct_historical(simulated_df, mappings):
+    """
+    Correct a simulated series month by month with the flow duration curves in mappings (month -> curves)
+    """
+    values = simulated_df.iloc[:, 0].values
+    months = simulated_df.index.month.values
+    corrected = np.full(len(values), np.nan)
+
+    for month in np.unique(months):
+        in_month = months == month
+        corrected[in_month] = apply_mapping(values[in_month], *mappings[month])
+
+    return pd.DataFrame(data=corrected, index=simulated_df.index, columns=['Corrected Simulated Streamflow'])
+
+
+def correct_forecast(forecast_df, mappings):
+    """
+    Correct all the columns of a forecast with the flow duration curves of the month of its first time step,
+    as geoglows.bias.correct_forecast does
+    """
+    corrected = apply_mapping(forecast_df.values.astype(np.float64), *mappings[forecast_df.index[0].month])
+    return pd.DataFrame(data=corrected, index=forecast_df.index, columns=forecast_df.columns)
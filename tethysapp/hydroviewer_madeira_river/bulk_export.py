@@ -0,0 +1,357 @@
+"""
+Bulk export of the observed, simulated and corrected series of many stations in one archive.
+
+A job fetches the series of the selected stations (all of them by default) on a process pool and writes them to
+workspaces/app_workspace/bulk_exports/<job_id>/ as a zip of csv files (one per station and series) or as a single
+Parquet file (station_code, comid, series, date, flow). The progress of the job is kept in status.json, which the
+bulk-export-status endpoint serves while the job runs. Jobs are started from the app by signed in users only, at
+most MAX_ACTIVE_JOBS at a time, and a request for the same export as a queued or running job gets that job back.
+They run in their own process:
+
+    python -m tethysapp.hydroviewer_madeira_river.bulk_export --job <job_id>
+
+and a whole basin export can be run directly:
+
+    python -m tethysapp.hydroviewer_madeira_river.bulk_export --format parquet --processes 8
+"""
+import argparse
+import fcntl
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from . import exports, fetchers
+from .config import APP_WORKSPACE
+from .dataset import daily_table
+from .lazy_imports import lazy_import
+from .stations import get_stations
+
+pa = lazy_import('pyarrow')
+pq = lazy_import('pyarrow.parquet')
+
+EXPORTS_DIR = os.path.join(APP_WORKSPACE, 'bulk_exports')
+
+SERIES = ('observed', 'simulated', 'corrected')
+FORMATS = {'zip': 'zip', 'parquet': 'parquet'}
+
+# Finished jobs are removed after a week
+JOB_RETENTION = 7 * 24 * 3600
+
+# Jobs queued or running at the same time, and time without progress after which a job is taken for dead
+MAX_ACTIVE_JOBS = 2
+JOB_STALLED = 30 * 60
+
+JOB_ID_PATTERN = re.compile(r'[0-9a-f]{32}')
+
+
+class ExportLimitError(Exception):
+    pass
+
+
+def python_executable():
+    """
+    Interpreter of the job processes: HYDROVIEWER_PYTHON if set, otherwise the one of the environment of the app.
+    Under uWSGI sys.executable is the uwsgi binary, so the python of sys.prefix is used instead.
+    """
+    configured = os.environ.get('HYDROVIEWER_PYTHON')
+    if configured:
+        return configured
+    if sys.executable and os.path.basename(sys.executable).startswith('python'):
+        return sys.executable
+    for name in ('python3', 'python'):
+        candidate = os.path.join(sys.prefix, 'bin', name)
+        if os.path.exists(candidate):
+            return candidate
+    found = shutil.which('python3') or shutil.which('python')
+    if found is None:
+        raise RuntimeError('No Python interpreter for the export jobs, set HYDROVIEWER_PYTHON.')
+    return found
+
+
+def may_export(request):
+    """
+    Exports run a process pool for minutes, they are started by the signed in users only
+    """
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated
+
+
+def _job_dir(job_id):
+    if not JOB_ID_PATTERN.fullmatch(job_id):
+        raise ValueError('Invalid job id {0}.'.format(job_id))
+    return os.path.join(EXPORTS_DIR, job_id)
+
+
+def archive_path(job_id, export_format):
+    return os.path.join(_job_dir(job_id), 'madeira_{0}.{1}'.format(job_id, FORMATS[export_format]))
+
+
+def read_status(job_id):
+    """
+    Status of a job, None if it does not exist
+    """
+    status_file = os.path.join(_job_dir(job_id), 'status.json')
+    if not os.path.exists(status_file):
+        return None
+    with open(status_file) as f:
+        return json.load(f)
+
+
+def write_status(status):
+    status['updated'] = time.time()
+    status_file = os.path.join(_job_dir(status['job_id']), 'status.json')
+    fd, tmp_file = tempfile.mkstemp(dir=_job_dir(status['job_id']), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(status, f)
+    os.replace(tmp_file, status_file)
+
+
+def remove_expired_jobs():
+    if not os.path.isdir(EXPORTS_DIR):
+        return
+    for job_id in os.listdir(EXPORTS_DIR):
+        if not JOB_ID_PATTERN.fullmatch(job_id):
+            continue
+        job_dir = os.path.join(EXPORTS_DIR, job_id)
+        if time.time() - os.path.getmtime(job_dir) > JOB_RETENTION:
+            shutil.rmtree(job_dir, ignore_errors=True)
+
+
+def active_jobs():
+    """
+    Status of the jobs queued or running, without the ones that stopped making progress
+    """
+    if not os.path.isdir(EXPORTS_DIR):
+        return []
+    jobs = []
+    for job_id in os.listdir(EXPORTS_DIR):
+        try:
+            status = read_status(job_id)
+        except (ValueError, OSError):
+            continue
+        if status is not None and status['status'] in ('queued', 'running') and (
+                time.time() - status.get('updated', 0) < JOB_STALLED):
+            jobs.append(status)
+    return jobs
+
+
+def _same_export(status, station_codes, export_format, series):
+    return (status['format'] == export_format and sorted(status['series']) == sorted(series) and
+            sorted(status['station_codes'] or []) == sorted(station_codes or []))
+
+
+def create_job(station_codes=None, export_format='zip', series=SERIES):
+    """
+    Register a new export job of the given stations (all of them if None), returns its status
+    """
+    if export_format not in FORMATS:
+        raise ValueError('Unknown export format {0}.'.format(export_format))
+    for name in series:
+        if name not in SERIES:
+            raise ValueError('Unknown series {0}.'.format(name))
+
+    remove_expired_jobs()
+
+    job_id = uuid.uuid4().hex
+    os.makedirs(_job_dir(job_id))
+    status = {
+        'job_id': job_id,
+        'status': 'queued',
+        'format': export_format,
+        'series': list(series),
+        'station_codes': list(station_codes) if station_codes else None,
+        'total': None,
+        'completed': 0,
+        'errors': [],
+        'archive': None,
+        'created': time.time(),
+    }
+    write_status(status)
+    return status
+
+
+def start_job(station_codes=None, export_format='zip', series=SERIES, processes=None):
+    """
+    Create a job and run it in a separate process, so it outlives the request that started it.
+    Returns the queued or running job of the same export if there is one, and raises ExportLimitError when
+    MAX_ACTIVE_JOBS are already queued or running.
+    """
+    command = [python_executable(), '-m', 'tethysapp.hydroviewer_madeira_river.bulk_export']
+
+    os.makedirs(EXPORTS_DIR, exist_ok=True)
+    fd = os.open(os.path.join(EXPORTS_DIR, 'jobs.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        jobs = active_jobs()
+        for status in jobs:
+            if _same_export(status, station_codes, export_format, series):
+                return status
+        if len(jobs) >= MAX_ACTIVE_JOBS:
+            raise ExportLimitError('{0} export jobs are already running, try again later.'.format(len(jobs)))
+        status = create_job(station_codes, export_format, series)
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+    command += ['--job', status['job_id']]
+    if processes:
+        command += ['--processes', str(processes)]
+    subprocess.Popen(command, start_new_session=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return status
+
+
+def fetch_station(station, series):
+    """
+    Series of a station (run in the worker processes), with the error message if they could not be fetched
+    """
+    try:
+        frames = {}
+        observed_df = None
+        simulated_df = None
+        if 'observed' in series or 'corrected' in series:
+            observed_df = fetchers.get_observed_data(station['station_code'])
+        if 'simulated' in series or 'corrected' in series:
+            simulated_df = fetchers.get_simulated_data(station['comid'])
+
+        if 'observed' in series:
+            frames['observed'] = observed_df
+        if 'simulated' in series:
+            frames['simulated'] = simulated_df
+        if 'corrected' in series:
+            frames['corrected'] = fetchers.get_corrected_data(simulated_df, observed_df, station['station_code'],
+                                                              station['comid'])
+        return station, frames, None
+
+    except Exception as e:
+        return station, {}, '{0}: {1}'.format(station['station_code'], str(e))
+
+
+class ZipArchive:
+    """
+    One csv file per station and series, with the columns of the single station downloads
+    """
+
+    def __init__(self, path):
+        self.archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.stations = []
+
+    def add(self, station, series, series_df):
+        if series == 'corrected':
+            chunks = exports.csv_chunks(series_df)
+        else:
+            chunks = exports.csv_chunks(series_df, index_label=exports.DISCHARGE_INDEX_LABEL,
+                                        columns=exports.DISCHARGE_COLUMNS)
+        name = '{0}/{1}_discharge_{0}.csv'.format(station['station_code'], series)
+        with self.archive.open(name, 'w') as entry:
+            for chunk in chunks:
+                entry.write(chunk.encode('utf-8'))
+        if station not in self.stations:
+            self.stations.append(station)
+
+    def close(self):
+        stations = pd.DataFrame(self.stations, columns=['station_code', 'station_name', 'comid', 'river', 'lat',
+                                                        'lon'])
+        self.archive.writestr('stations.csv', stations.to_csv(index=False))
+        self.archive.close()
+
+
+class ParquetArchive:
+    """
+    A single Parquet file, one row group per station and series
+    """
+
+    def __init__(self, path):
+        self.schema = pa.schema([('station_code', pa.string()), ('comid', pa.int64()), ('series', pa.string()),
+                                 ('date', pa.timestamp('ns')), ('flow', pa.float64())])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def add(self, station, series, series_df):
+        table = daily_table(series_df, station)
+        table.insert(2, 'series', series)
+        self.writer.write_table(pa.Table.from_pandas(table, schema=self.schema, preserve_index=False))
+
+    def close(self):
+        self.writer.close()
+
+
+ARCHIVES = {'zip': ZipArchive, 'parquet': ParquetArchive}
+
+
+def run_job(job_id, processes=None):
+    """
+    Fetch the series of the job on a process pool and write them to its archive as they arrive
+    """
+    status = read_status(job_id)
+    if status is None:
+        raise ValueError('Unknown job {0}.'.format(job_id))
+
+    path = archive_path(job_id, status['format'])
+    tmp_file = path + '.tmp'
+    archive = None
+
+    try:
+        stations = get_stations()
+        if status['station_codes']:
+            station_codes = set(status['station_codes'])
+            stations = [station for station in stations if station['station_code'] in station_codes]
+
+        status.update({'status': 'running', 'total': len(stations)})
+        write_status(status)
+
+        archive = ARCHIVES[status['format']](tmp_file)
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(fetch_station, station, status['series']) for station in stations]
+            for future in as_completed(futures):
+                station, frames, error = future.result()
+                if error is not None:
+                    status['errors'].append(error)
+                else:
+                    for series in status['series']:
+                        archive.add(station, series, frames[series])
+                status['completed'] += 1
+                write_status(status)
+
+        archive.close()
+        archive = None
+        os.replace(tmp_file, path)
+        status.update({'status': 'done', 'archive': os.path.basename(path)})
+
+    except Exception as e:
+        if archive is not None:
+            archive.close()
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        status.update({'status': 'failed', 'error': str(e)})
+
+    write_status(status)
+    return status
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the series of many Madeira stations in one archive.')
+    parser.add_argument('--job', help='Run a job created by the app.')
+    parser.add_argument('--stations', nargs='*', help='Station codes to export (default: all the stations).')
+    parser.add_argument('--series', nargs='*', choices=SERIES, default=list(SERIES), help='Series to export.')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='zip', help='Archive format.')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes.')
+    args = parser.parse_args()
+
+    job_id = args.job or create_job(args.stations, args.format, args.series)['job_id']
+    result = run_job(job_id, processes=args.processes)
+    for failed in result['errors']:
+        print(failed)
+    if result['status'] == 'done':
+        print('Archive written to {0} ({1} stations failed).'.format(archive_path(job_id, result['format']),
+                                                                    len(result['errors'])))
+    else:
+        print('Export failed: {0}'.format(result.get('error')))
@@ -0,0 +1,258 @@
+"""
+Cache of the fetched and derived series, shared by all the controllers and batch jobs.
+
+Every namespace (observed, simulated, forecast, corrected, jobs, stations) is a Django cache instance with its own
+timeout and maximum number of entries. The backend is chosen with the app custom settings:
+
+    memory      per process memory (LocMemCache)
+    filesystem  pickled files in the app workspace (FileBasedCache), shared by the workers of a node
+    redis       a Redis server given by cache_location (RedisCache), shared by the workers of all the nodes.
+                The size of this backend is limited by the maxmemory policy of the server.
+    django      the cache alias of the portal settings given by cache_location
+
+Entries are kept STALE_TIMEOUT seconds past the timeout of their namespace. A stale entry is served right away,
+marked with its age, and refreshed in the background. In offline mode the upstream services are never called and
+only cached entries are served.
+"""
+import functools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+
+from .config import APP_WORKSPACE
+
+CACHE_DIR = os.path.join(APP_WORKSPACE, 'cache')
+
+BACKENDS = {
+    'memory': 'django.core.cache.backends.locmem.LocMemCache',
+    'filesystem': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+
+# Timeout (seconds) and maximum number of entries of each namespace
+DEFAULT_TIMEOUTS = {
+    'observed': 6 * 3600,
+    'simulated': 7 * 86400,
+    'forecast': 3 * 3600,
+    'corrected': 30 * 86400,
+    'jobs': 3600,
+    'stations': 86400,
+}
+DEFAULT_MAX_ENTRIES = {
+    'observed': 300,
+    'simulated': 300,
+    'forecast': 300,
+    'corrected': 300,
+    'jobs': 300,
+    'stations': 10,
+}
+
+# Time stale entries are kept (and served) after the timeout of their namespace
+STALE_TIMEOUT = 30 * 86400
+
+REFRESH_THREADS = 4
+
+# Interval between two refreshes of the same entry, so a failing upstream is not called on every request
+REFRESH_RETRY = 300
+
+_caches = {}
+_settings = {}
+
+_refresh_executor = ThreadPoolExecutor(max_workers=REFRESH_THREADS)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+# Last refresh of each entry, by namespace and key
+_refreshed = {}
+
+# Ages of the stale entries served to the request being handled
+_stale_served = ContextVar('hydroviewer_stale_served', default=None)
+
+
+class OfflineError(Exception):
+    pass
+
+
+def parse_namespace_values(text, defaults):
+    """
+    Read a 'namespace:value, namespace:value' setting on top of the defaults
+    """
+    values = dict(defaults)
+    for item in (text or '').split(','):
+        if ':' not in item:
+            continue
+        namespace, value = item.split(':', 1)
+        values[namespace.strip()] = int(value)
+    return values
+
+
+def cache_settings():
+    """
+    Cache custom settings of the app. Batch jobs run outside of the portal use the defaults.
+    """
+    if not _settings:
+        settings = {'backend': 'memory', 'location': '', 'timeouts': '', 'max_entries': '',
+                    'offline': os.environ.get('HYDROVIEWER_OFFLINE') == '1'}
+        try:
+            from .app import HistoricalValidationToolMadeiraRiver as app
+            settings['backend'] = app.get_custom_setting('cache_backend') or settings['backend']
+            settings['location'] = app.get_custom_setting('cache_location') or ''
+            settings['timeouts'] = app.get_custom_setting('cache_timeouts') or ''
+            settings['max_entries'] = app.get_custom_setting('cache_max_entries') or ''
+            settings['offline'] = settings['offline'] or bool(app.get_custom_setting('offline_mode'))
+        except Exception as e:
+            print('Using the default cache settings: {0}'.format(str(e)))
+
+        settings['timeouts'] = parse_namespace_values(settings['timeouts'], DEFAULT_TIMEOUTS)
+        settings['max_entries'] = parse_namespace_values(settings['max_entries'], DEFAULT_MAX_ENTRIES)
+        _settings.update(settings)
+
+    return _settings
+
+
+def get_cache(namespace):
+    """
+    Django cache instance of a namespace
+    """
+    if namespace not in _caches:
+        settings = cache_settings()
+        backend = settings['backend']
+
+        if backend == 'django':
+            from django.core.cache import caches
+            _caches[namespace] = caches[settings['location'] or 'default']
+            return _caches[namespace]
+
+        if backend not in BACKENDS:
+            raise ValueError('Unknown cache backend {0}.'.format(backend))
+
+        if backend == 'memory':
+            location = 'hydroviewer_madeira_river_{0}'.format(namespace)
+        elif backend == 'filesystem':
+            location = os.path.join(CACHE_DIR, namespace)
+        else:
+            location = settings['location'] or 'redis://127.0.0.1:6379'
+
+        from django.utils.module_loading import import_string
+        cache_class = import_string(BACKENDS[backend])
+        _caches[namespace] = cache_class(location, {
+            'TIMEOUT': settings['timeouts'].get(namespace, 3600) + STALE_TIMEOUT,
+            'KEY_PREFIX': 'hydroviewer_madeira_river:{0}'.format(namespace),
+            'max_entries': settings['max_entries'].get(namespace, 300),
+        })
+
+    return _caches[namespace]
+
+
+def is_shared(namespace):
+    """
+    Whether the entries of a namespace are seen by all the workers (not with a per process memory cache)
+    """
+    try:
+        cache_class = type(get_cache(namespace)).__name__
+    except Exception as e:
+        print('Cache unavailable ({0}): {1}'.format(namespace, str(e)))
+        return False
+    return cache_class not in ('LocMemCache', 'DummyCache')
+
+
+def _store(namespace, key, value):
+    timeout = cache_settings()['timeouts'].get(namespace, 3600) + STALE_TIMEOUT
+    get_cache(namespace).set(key, (time.time(), value), timeout=timeout)
+
+
+def _refresh(namespace, key, compute):
+    try:
+        _store(namespace, key, compute())
+    except Exception as e:
+        print('Could not refresh {0} {1}: {2}'.format(namespace, key, str(e)))
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard((namespace, key))
+
+
+def _schedule_refresh(namespace, key, compute):
+    """
+    Refresh an entry in the background, once at a time per entry and at most once every REFRESH_RETRY seconds
+    """
+    with _refreshing_lock:
+        now = time.time()
+        if (namespace, key) in _refreshing or now - _refreshed.get((namespace, key), 0) < REFRESH_RETRY:
+            return
+        _refreshing.add((namespace, key))
+        _refreshed[(namespace, key)] = now
+    _refresh_executor.submit(_refresh, namespace, key, compute)
+
+
+def get_with_age(namespace, key, compute):
+    """
+    Cached value of key in a namespace and its age in seconds.
+    Missing entries are computed and stored; stale entries are returned and refreshed in the background.
+    Cache failures fall back to computing the value.
+    """
+    settings = cache_settings()
+    cache_key = str(key)
+
+    try:
+        entry = get_cache(namespace).get(cache_key)
+    except Exception as e:
+        print('Cache unavailable ({0}): {1}'.format(namespace, str(e)))
+        entry = None
+
+    if isinstance(entry, tuple) and len(entry) == 2:
+        stored, value = entry
+        age = time.time() - stored
+        if age > settings['timeouts'].get(namespace, 3600):
+            mark_stale(namespace, cache_key, age)
+            if not settings['offline']:
+                _schedule_refresh(namespace, cache_key, compute)
+        return value, age
+
+    if settings['offline']:
+        raise OfflineError('{0} {1} is not cached and the app is in offline mode.'.format(namespace, cache_key))
+
+    value = compute()
+    try:
+        _store(namespace, cache_key, value)
+    except Exception as e:
+        print('Cache unavailable ({0}): {1}'.format(namespace, str(e)))
+
+    return value, 0.0
+
+
+def mark_stale(namespace, key, age):
+    """
+    Mark the response of the request being handled as built from a stale entry of the given age
+    """
+    served = _stale_served.get()
+    if served is not None:
+        served['{0} {1}'.format(namespace, key)] = age
+
+
+def get_or_set(namespace, key, compute):
+    """
+    Cached value of key in a namespace, see get_with_age
+    """
+    return get_with_age(namespace, key, compute)[0]
+
+
+def marks_age(controller):
+    """
+    Decorator of the controllers: marks the responses built from stale entries with their age
+    (Age and Warning headers)
+    """
+    @functools.wraps(controller)
+    def wrapper(request, *args, **kwargs):
+        token = _stale_served.set({})
+        try:
+            response = controller(request, *args, **kwargs)
+            served = _stale_served.get()
+            if served:
+                response['Age'] = str(int(max(served.values())))
+                response['Warning'] = '110 - "Response is Stale"'
+            return response
+        finally:
+            _stale_served.reset(token)
+    return wrapper
@@ -0,0 +1,156 @@
+"""
+Station catalog of the app, cached from the geoserver layer, with a grid index to find the station nearest to a point.
+
+The home page is bootstrapped with the catalog as compact GeoJSON, so the map resolves the clicks on stations
+without asking the geoserver, and get-nearest-station answers the same lookup for other clients.
+"""
+import math
+import time
+
+from . import cache
+from .stations import get_stations
+
+# Size (degrees) of the cells of the grid index
+CELL_SIZE = 0.5
+
+EARTH_RADIUS = 6371.0
+KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180.0
+
+# Decimals of the coordinates of the GeoJSON bootstrap (about 1 m)
+COORDINATE_DECIMALS = 5
+
+# Seconds the catalog, its index and its GeoJSON are kept in memory before they are read again from the cache
+INDEX_TIMEOUT = 300
+
+_index = {}
+
+
+def haversine(lon1, lat1, lon2, lat2):
+    """
+    Great circle distance in km
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    a = (math.sin((phi2 - phi1) / 2) ** 2 +
+         math.cos(phi1) * math.cos(phi2) * math.sin(math.radians(lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS * math.asin(min(math.sqrt(a), 1.0))
+
+
+class GridIndex:
+    """
+    Stations bucketed in CELL_SIZE cells, searched ring by ring around a point
+    """
+
+    def __init__(self, stations, cell_size=CELL_SIZE):
+        self.stations = stations
+        self.cell_size = cell_size
+        self.cells = {}
+        for i, station in enumerate(stations):
+            self.cells.setdefault(self._cell(station['lon'], station['lat']), []).append(i)
+
+        if self.cells:
+            columns = [cell[0] for cell in self.cells]
+            rows = [cell[1] for cell in self.cells]
+            self.extent = (min(columns), min(rows), max(columns), max(rows))
+            # Shortest km per degree of longitude over the stations, for the lower bound of the ring distances
+            max_lat = max(abs(station['lat']) for station in stations)
+            self.min_km_per_cell = cell_size * KM_PER_DEGREE * math.cos(math.radians(min(max_lat + cell_size, 90)))
+
+    def _cell(self, lon, lat):
+        return int(math.floor(lon / self.cell_size)), int(math.floor(lat / self.cell_size))
+
+    def _ring(self, column, row, radius):
+        if radius == 0:
+            yield column, row
+            return
+        for i in range(-radius, radius + 1):
+            yield column + i, row - radius
+            yield column + i, row + radius
+        for j in range(-radius + 1, radius):
+            yield column - radius, row + j
+            yield column + radius, row + j
+
+    def nearest(self, lon, lat, max_distance=None):
+        """
+        Nearest station to a point and its distance in km, (None, None) if there is none within max_distance km
+        """
+        if not self.cells:
+            return None, None
+
+        column, row = self._cell(lon, lat)
+        # Rings beyond the farthest cell of the grid are empty
+        max_radius = max(abs(column - self.extent[0]), abs(column - self.extent[2]),
+                         abs(row - self.extent[1]), abs(row - self.extent[3]))
+
+        best, best_distance = None, float('inf')
+        for radius in range(max_radius + 1):
+            # Every station of this ring and the next ones is at least this far
+            ring_distance = max(radius - 1, 0) * self.min_km_per_cell
+            if ring_distance > best_distance or (max_distance is not None and ring_distance > max_distance):
+                break
+            for cell in self._ring(column, row, radius):
+                for i in self.cells.get(cell, ()):
+                    station = self.stations[i]
+                    distance = haversine(lon, lat, station['lon'], station['lat'])
+                    if distance < best_distance:
+                        best, best_distance = station, distance
+
+        if best is None or (max_distance is not None and best_distance > max_distance):
+            return None, None
+        return best, best_distance
+
+
+def get_catalog():
+    """
+    Stations of the Madeira layer (code, name, comid, river, coordinates), cached like the series
+    """
+    return cache.get_or_set('stations', 'catalog', get_stations)
+
+
+def get_index():
+    """
+    Grid index of the cached catalog
+    """
+    if not _index or time.time() - _index['loaded'] > INDEX_TIMEOUT:
+        stations = get_catalog()
+        _index.update({'index': GridIndex(stations), 'stations': stations, 'geojson': None, 'loaded': time.time()})
+    return _index['index']
+
+
+def nearest_station(lon, lat, max_distance=None):
+    return get_index().nearest(lon, lat, max_distance=max_distance)
+
+
+def station_feature(station):
+    """
+    GeoJSON point of a station with the attributes of the geoserver layer
+    """
+    return {
+        'type': 'Feature',
+        'geometry': {
+            'type': 'Point',
+            'coordinates': [round(station['lon'], COORDINATE_DECIMALS), round(station['lat'], COORDINATE_DECIMALS)],
+        },
+        'properties': {
+            'CodEstacao': station['station_code'],
+            'NomeEstaca': station['station_name'],
+            'new_COMID': station['comid'],
+            'NomeRio': station['river'],
+        },
+    }
+
+
+def catalog_geojson():
+    """
+    The catalog as a GeoJSON feature collection with its bounding box
+    """
+    get_index()
+    if _index['geojson'] is None:
+        stations = _index['stations']
+        collection = {'type': 'FeatureCollection', 'features': [station_feature(station) for station in stations]}
+        if stations:
+            collection['bbox'] = [min(station['lon'] for station in stations),
+                                  min(station['lat'] for station in stations),
+                                  max(station['lon'] for station in stations),
+                                  max(station['lat'] for station in stations)]
+        _index['geojson'] = collection
+    return _index['geojson']
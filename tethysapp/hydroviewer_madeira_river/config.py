@@ -0,0 +1,18 @@
+import os
+
+# Location of the app workspace used to store precomputed products
+APP_WORKSPACE = os.path.join(os.path.dirname(__file__), 'workspaces', 'app_workspace')
+
+# ANA Hidro web service (observed discharge) and GEOGloWS REST API. The environment variables point the app to
+# other servers, e.g. the stand-ins of the load test
+ANA_SERIES_URL = os.environ.get('HYDROVIEWER_ANA_URL',
+                                'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica')
+GEOGLOWS_ENDPOINT = os.environ.get('HYDROVIEWER_GEOGLOWS_URL', 'https://geoglows.ecmwf.int/api/')
+
+# Geoserver resource with the Madeira river stations and drainage lines
+GEOSERVER_WORKSPACE = 'HS-7178e909b4824df29a87930f51ccaa9b'
+GEOSERVER_WFS_URL = 'https://geoserver.hydroshare.org/geoserver/{0}/wfs'.format(GEOSERVER_WORKSPACE)
+STATIONS_LAYER = '{0}:madeira_stations'.format(GEOSERVER_WORKSPACE)
+
+# Metrics shown by default in the Metrics Report tab
+DEFAULT_METRICS = ['ME', 'RMSE', 'NRMSE (Mean)', 'MAPE', 'NSE', 'KGE (2009)', 'KGE (2012)']
@@ -1,40 +1,91 @@
 import datetime as dt
-import io
+import json
+import os
+import tempfile
 import traceback
-from csv import writer as csv_writer
-
-import calendar
-import numpy as np
-from bs4 import BeautifulSoup
-import geoglows
-import hydrostats as hs
-import hydrostats.data as hd
+
 import pandas as pd
-import plotly.graph_objs as go
-import requests
-import scipy.stats as sp
-from scipy import integrate
-from HydroErr.HydroErr import metric_names, metric_abbr
-from django.http import HttpResponse, JsonResponse
-from django.shortcuts import render
+from django.http import FileResponse, HttpResponse, JsonResponse
+from django.shortcuts import render as django_render
 from tethys_sdk.gizmos import PlotlyView
 
+from . import bulk_export, cache, exports, fetchers, jobs, profiling, timing
+from .artefacts import StationArtefacts, hydrograph_series, merged_frame
+from .bias_correction import correct_forecast
+from .catalog import catalog_geojson, nearest_station, station_feature
+from .ensembles import (correct_ensembles, ensemble_percentiles, exceedance_probability,
+                        observed_thresholds, BAND_PERCENTILES)
+from .forecast_archive import verify_forecasts
+from .thresholds import alerts_geojson, load_alerts, station_return_periods
+from .leaderboard import leaderboard_geojson, leaderboard_table, load_leaderboard
+from .dataset import basin_aggregate
+from .periods import get_period, period_label
+from .config import APP_WORKSPACE, DEFAULT_METRICS
+from .lazy_imports import lazy_import
+
+geoglows = lazy_import('geoglows')
+hs = lazy_import('hydrostats')
+go = lazy_import('plotly.graph_objs')
+
+render = timing.timed_stage('render')(django_render)
+
+# HydroErr metric names and abbreviations, written once so the home page does not import HydroErr
+METRICS_FILE = os.path.join(APP_WORKSPACE, 'metric_names.json')
+
+# Optional parameters of hydrostats.make_table sent with the default metrics table, read from the precomputed metrics
+DEFAULT_METRIC_PARAMETERS = {'mase_m': 1, 'dmod_j': 1, 'nse_mod_j': 1, 'h6_mhe_k': 1, 'h6_ahe_k': 1, 'h6_rmshe_k': 1,
+                             'lm_x_bar_p': None, 'd1_p_x_bar_p': None}
+
+
+def get_metric_loop_list():
+    """
+    Metric names and abbreviations of HydroErr (delete METRICS_FILE after upgrading HydroErr)
+    """
+    if os.path.exists(METRICS_FILE):
+        with open(METRICS_FILE) as f:
+            return [tuple(metric) for metric in json.load(f)]
+
+    hydroerr = lazy_import('HydroErr.HydroErr')
+    metric_loop_list = list(zip(hydroerr.metric_names, hydroerr.metric_abbr))
+
+    os.makedirs(APP_WORKSPACE, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=APP_WORKSPACE, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(metric_loop_list, f)
+    os.replace(tmp_file, METRICS_FILE)
+
+    return metric_loop_list
 
+
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def home(request):
     """
     Controller for the app home page.
     """
 
     # List of Metrics to include in context
-    metric_loop_list = list(zip(metric_names, metric_abbr))
+    metric_loop_list = get_metric_loop_list()
+
+    # Stations bootstrapped in the page, the map falls back to the geoserver without them
+    try:
+        station_catalog = catalog_geojson()
+    except Exception as e:
+        print(str(e))
+        station_catalog = None
 
     context = {
-        "metric_loop_list": metric_loop_list
+        "metric_loop_list": metric_loop_list,
+        "station_catalog": station_catalog,
     }
 
     return render(request, 'hydroviewer_madeira_river/home.html', context)
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_discharge_data(request):
     """
     Get observed data from csv files in Hydroshare
@@ -46,361 +97,11 @@ def get_discharge_data(request):
 
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
         '''Get Observed Data'''
 
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
+        observed_df = fetchers.get_stored_series('observed', codEstacion, start, end)
 
         observed_Q = go.Scatter(
             x=observed_df.index,
@@ -413,7 +114,8 @@ def get_discharge_data(request):
                            xaxis=dict(title='Dates', ), yaxis=dict(title='Discharge (m<sup>3</sup>/s)',
                                                                    autorange=True), showlegend=False)
 
-        chart_obj = PlotlyView(go.Figure(data=[observed_Q], layout=layout))
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(go.Figure(data=[observed_Q], layout=layout))
 
         context = {
             'gizmo_object': chart_obj,
@@ -426,6 +128,9 @@ def get_discharge_data(request):
         return JsonResponse({'error': 'No observed data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_simulated_data(request):
     """
     Get simulated data from api
@@ -436,15 +141,10 @@ def get_simulated_data(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
         # Get Simulated Data
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
+        simulated_df = fetchers.get_stored_series('simulated', comid, start, end)
 
         # ----------------------------------------------
         # Chart Section
@@ -462,7 +162,8 @@ def get_simulated_data(request):
             xaxis=dict(title='Date', ), yaxis=dict(title='Discharge (m<sup>3</sup>/s)'),
         )
 
-        chart_obj = PlotlyView(go.Figure(data=[simulated_Q], layout=layout))
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(go.Figure(data=[simulated_Q], layout=layout))
 
         context = {
             'gizmo_object': chart_obj,
@@ -475,6 +176,9 @@ def get_simulated_data(request):
         return JsonResponse({'error': 'No simulated data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_simulated_bc_data(request):
     """
     Calculate corrected simulated data
@@ -485,379 +189,19 @@ def get_simulated_bc_data(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
         '''Get Simulated Data'''
 
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
-
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
+        simulated_df = fetchers.get_simulated_data(comid)
 
         '''Get Observed Data'''
 
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
+        observed_df = fetchers.get_observed_data(codEstacion)
 
         '''Correct the Bias in Sumulation'''
 
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
+        corrected_df = fetchers.get_corrected_data(simulated_df, observed_df, codEstacion, comid, start, end)
 
         # ----------------------------------------------
         # Chart Section
@@ -875,7 +219,8 @@ def get_simulated_bc_data(request):
             xaxis=dict(title='Date', ), yaxis=dict(title='Discharge (m<sup>3</sup>/s)'),
         )
 
-        chart_obj = PlotlyView(go.Figure(data=[corrected_Q], layout=layout))
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(go.Figure(data=[corrected_Q], layout=layout))
 
         context = {
             'gizmo_object': chart_obj,
@@ -888,6 +233,9 @@ def get_simulated_bc_data(request):
         return JsonResponse({'error': 'No simulated data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_hydrographs(request):
     """
     Get observed data from csv files in Hydroshare
@@ -901,391 +249,29 @@ def get_hydrographs(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
-        '''Get Simulated Data'''
-
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
+        '''Get Hydrograph Pyramid'''
 
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
-
-        '''Get Observed Data'''
-
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
-
-        '''Correct the Bias in Sumulation'''
-
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
+        # The pyramid of the whole record is precomputed, its levels are sliced to the period
+        artefacts = StationArtefacts({'station_code': codEstacion, 'comid': comid}, precomputed=True)
+        pyramid = artefacts.get('pyramid')
+        observed_series = hydrograph_series(pyramid, 'observed', start, end)
+        simulated_series = hydrograph_series(pyramid, 'simulated', start, end)
+        corrected_series = hydrograph_series(pyramid, 'corrected', start, end)
 
         '''Plotting Data'''
-        observed_Q = go.Scatter(x=observed_df.index, y=observed_df.iloc[:, 0].values, name='Observed', )
-        simulated_Q = go.Scatter(x=simulated_df.index, y=simulated_df.iloc[:, 0].values, name='Simulated', )
-        corrected_Q = go.Scatter(x=corrected_df.index, y=corrected_df.iloc[:, 0].values, name='Corrected Simulated', )
+        observed_Q = go.Scatter(x=observed_series.index, y=observed_series.values, name='Observed', )
+        simulated_Q = go.Scatter(x=simulated_series.index, y=simulated_series.values, name='Simulated', )
+        corrected_Q = go.Scatter(x=corrected_series.index, y=corrected_series.values, name='Corrected Simulated', )
 
         layout = go.Layout(
             title='Observed & Simulated Streamflow at <br> {0} - {1}'.format(codEstacion, nomEstacion),
             xaxis=dict(title='Dates', ), yaxis=dict(title='Discharge (m<sup>3</sup>/s)', autorange=True),
             showlegend=True)
 
-        chart_obj = PlotlyView(go.Figure(data=[observed_Q, simulated_Q, corrected_Q], layout=layout))
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(go.Figure(data=[observed_Q, simulated_Q, corrected_Q], layout=layout))
 
         context = {
             'gizmo_object': chart_obj,
@@ -1298,6 +284,9 @@ def get_hydrographs(request):
         return JsonResponse({'error': 'No data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_dailyAverages(request):
     """
     Get observed data from csv files in Hydroshare
@@ -1309,394 +298,20 @@ def get_dailyAverages(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
-        '''Get Simulated Data'''
-
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
+        '''Get Climatology'''
 
-
-        '''Get Observed Data'''
-
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
-
-        '''Correct the Bias in Sumulation'''
-
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
-
-        '''Merge Data'''
-
-        merged_df = hd.merge_data(sim_df=simulated_df, obs_df=observed_df)
-
-        merged_df2 = hd.merge_data(sim_df=corrected_df, obs_df=observed_df)
+        artefacts = StationArtefacts({'station_code': codEstacion, 'comid': comid}, start, end, precomputed=True)
+        daily_avg = artefacts.get('climatology')['daily']
 
         '''Plotting Data'''
 
-        daily_avg = hd.daily_average(merged_df)
-
-        daily_avg2 = hd.daily_average(merged_df2)
+        daily_avg_obs_Q = go.Scatter(x=daily_avg.index, y=daily_avg['observed'].values, name='Observed', )
 
-        daily_avg_obs_Q = go.Scatter(x=daily_avg.index, y=daily_avg.iloc[:, 1].values, name='Observed', )
+        daily_avg_sim_Q = go.Scatter(x=daily_avg.index, y=daily_avg['simulated'].values, name='Simulated', )
 
-        daily_avg_sim_Q = go.Scatter(x=daily_avg.index, y=daily_avg.iloc[:, 0].values, name='Simulated', )
-
-        daily_avg_corr_sim_Q = go.Scatter(x=daily_avg2.index, y=daily_avg2.iloc[:, 0].values,
+        daily_avg_corr_sim_Q = go.Scatter(x=daily_avg.index, y=daily_avg['corrected'].values,
                                           name='Corrected Simulated', )
 
         layout = go.Layout(
@@ -1704,7 +319,9 @@ def get_dailyAverages(request):
             xaxis=dict(title='Days', ), yaxis=dict(title='Discharge (m<sup>3</sup>/s)', autorange=True),
             showlegend=True)
 
-        chart_obj = PlotlyView(go.Figure(data=[daily_avg_obs_Q, daily_avg_sim_Q, daily_avg_corr_sim_Q], layout=layout))
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(
+                go.Figure(data=[daily_avg_obs_Q, daily_avg_sim_Q, daily_avg_corr_sim_Q], layout=layout))
 
         context = {
             'gizmo_object': chart_obj,
@@ -1717,6 +334,9 @@ def get_dailyAverages(request):
         return JsonResponse({'error': 'No data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_monthlyAverages(request):
     """
     Get observed data from csv files in Hydroshare
@@ -1730,398 +350,20 @@ def get_monthlyAverages(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
-        '''Get Simulated Data'''
-
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
-
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
-
-        '''Get Observed Data'''
-
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
-
-
-        '''Correct the Bias in Sumulation'''
-
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
+        '''Get Climatology'''
 
-        '''Merge Data'''
-
-        merged_df = hd.merge_data(sim_df=simulated_df, obs_df=observed_df)
-
-        merged_df2 = hd.merge_data(sim_df=corrected_df, obs_df=observed_df)
+        artefacts = StationArtefacts({'station_code': codEstacion, 'comid': comid}, start, end, precomputed=True)
+        monthly_avg = artefacts.get('climatology')['monthly']
 
         '''Plotting Data'''
 
-        monthly_avg = hd.monthly_average(merged_df)
-
-        monthly_avg2 = hd.monthly_average(merged_df2)
+        monthly_avg_obs_Q = go.Scatter(x=monthly_avg.index, y=monthly_avg['observed'].values, name='Observed', )
 
-        monthly_avg_obs_Q = go.Scatter(x=monthly_avg.index, y=monthly_avg.iloc[:, 1].values, name='Observed', )
+        monthly_avg_sim_Q = go.Scatter(x=monthly_avg.index, y=monthly_avg['simulated'].values, name='Simulated', )
 
-        monthly_avg_sim_Q = go.Scatter(x=monthly_avg.index, y=monthly_avg.iloc[:, 0].values, name='Simulated', )
-
-        monthly_avg_corr_sim_Q = go.Scatter(x=monthly_avg2.index, y=monthly_avg2.iloc[:, 0].values,
+        monthly_avg_corr_sim_Q = go.Scatter(x=monthly_avg.index, y=monthly_avg['corrected'].values,
                                             name='Corrected Simulated', )
 
         layout = go.Layout(
@@ -2129,8 +371,9 @@ def get_monthlyAverages(request):
             xaxis=dict(title='Months', ), yaxis=dict(title='Discharge (m<sup>3</sup>/s)', autorange=True),
             showlegend=True)
 
-        chart_obj = PlotlyView(
-            go.Figure(data=[monthly_avg_obs_Q, monthly_avg_sim_Q, monthly_avg_corr_sim_Q], layout=layout))
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(
+                go.Figure(data=[monthly_avg_obs_Q, monthly_avg_sim_Q, monthly_avg_corr_sim_Q], layout=layout))
 
         context = {
             'gizmo_object': chart_obj,
@@ -2143,6 +386,9 @@ def get_monthlyAverages(request):
         return JsonResponse({'error': 'No data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_scatterPlot(request):
     """
     Get observed data from csv files in Hydroshare
@@ -2156,409 +402,36 @@ def get_scatterPlot(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
-        '''Get Simulated Data'''
-
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
-
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
-
-        '''Get Observed Data'''
-
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
-
-        '''Correct the Bias in Sumulation'''
-
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
-
-        '''Merge Data'''
+        '''Get Scatter Bins'''
 
-        merged_df = hd.merge_data(sim_df=simulated_df, obs_df=observed_df)
-
-        merged_df2 = hd.merge_data(sim_df=corrected_df, obs_df=observed_df)
+        artefacts = StationArtefacts({'station_code': codEstacion, 'comid': comid}, start, end, precomputed=True)
+        scatter = artefacts.get('scatter')
+        original_bins = scatter['original']['linear']
+        corrected_bins = scatter['corrected']['linear']
 
         '''Plotting Data'''
 
         scatter_data = go.Scatter(
-            x=merged_df.iloc[:, 0].values,
-            y=merged_df.iloc[:, 1].values,
+            x=original_bins['x'],
+            y=original_bins['y'],
             mode='markers',
             name='original',
+            text=['{0} days'.format(count) for count in original_bins['count']],
             marker=dict(color='#ef553b')
         )
 
         scatter_data2 = go.Scatter(
-            x=merged_df2.iloc[:, 0].values,
-            y=merged_df2.iloc[:, 1].values,
+            x=corrected_bins['x'],
+            y=corrected_bins['y'],
             mode='markers',
             name='corrected',
+            text=['{0} days'.format(count) for count in corrected_bins['count']],
             marker=dict(color='#00cc96')
         )
 
-        min_value = min(min(merged_df.iloc[:, 1].values), min(merged_df.iloc[:, 0].values))
-        max_value = max(max(merged_df.iloc[:, 1].values), max(merged_df.iloc[:, 0].values))
-
-        min_value2 = min(min(merged_df2.iloc[:, 1].values), min(merged_df2.iloc[:, 0].values))
-        max_value2 = max(max(merged_df2.iloc[:, 1].values), max(merged_df2.iloc[:, 0].values))
+        min_value, max_value = scatter['range']
 
         line_45 = go.Scatter(
             x=[min_value, max_value],
@@ -2568,11 +441,9 @@ def get_scatterPlot(request):
             line=dict(color='black')
         )
 
-        slope, intercept, r_value, p_value, std_err = sp.linregress(merged_df.iloc[:, 0].values,
-                                                                    merged_df.iloc[:, 1].values)
+        slope, intercept = scatter['original']['slope'], scatter['original']['intercept']
 
-        slope2, intercept2, r_value2, p_value2, std_err2 = sp.linregress(merged_df2.iloc[:, 0].values,
-                                                                         merged_df2.iloc[:, 1].values)
+        slope2, intercept2 = scatter['corrected']['slope'], scatter['corrected']['intercept']
 
         line_adjusted = go.Scatter(
             x=[min_value, max_value],
@@ -2594,8 +465,9 @@ def get_scatterPlot(request):
                            xaxis=dict(title='Simulated', ), yaxis=dict(title='Observed', autorange=True),
                            showlegend=True)
 
-        chart_obj = PlotlyView(
-            go.Figure(data=[scatter_data, scatter_data2, line_45, line_adjusted, line_adjusted2], layout=layout))
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(
+                go.Figure(data=[scatter_data, scatter_data2, line_45, line_adjusted, line_adjusted2], layout=layout))
 
         context = {
             'gizmo_object': chart_obj,
@@ -2608,6 +480,9 @@ def get_scatterPlot(request):
         return JsonResponse({'error': 'No data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_scatterPlotLogScale(request):
     """
     Get observed data from csv files in Hydroshare
@@ -2621,406 +496,36 @@ def get_scatterPlotLogScale(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
-        '''Get Simulated Data'''
-
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
-
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
+        '''Get Scatter Bins'''
 
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
-
-        '''Get Observed Data'''
-
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
-
-        '''Correct the Bias in Sumulation'''
-
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
-
-        '''Merge Data'''
-
-        merged_df = hd.merge_data(sim_df=simulated_df, obs_df=observed_df)
-
-        merged_df2 = hd.merge_data(sim_df=corrected_df, obs_df=observed_df)
+        artefacts = StationArtefacts({'station_code': codEstacion, 'comid': comid}, start, end, precomputed=True)
+        scatter = artefacts.get('scatter')
+        original_bins = scatter['original']['log']
+        corrected_bins = scatter['corrected']['log']
 
         '''Plotting Data'''
 
         scatter_data = go.Scatter(
-            x=merged_df.iloc[:, 0].values,
-            y=merged_df.iloc[:, 1].values,
+            x=original_bins['x'],
+            y=original_bins['y'],
             mode='markers',
             name='original',
+            text=['{0} days'.format(count) for count in original_bins['count']],
             marker=dict(color='#ef553b')
         )
 
         scatter_data2 = go.Scatter(
-            x=merged_df2.iloc[:, 0].values,
-            y=merged_df2.iloc[:, 1].values,
+            x=corrected_bins['x'],
+            y=corrected_bins['y'],
             mode='markers',
             name='corrected',
+            text=['{0} days'.format(count) for count in corrected_bins['count']],
             marker=dict(color='#00cc96')
         )
 
-        min_value = min(min(merged_df.iloc[:, 1].values), min(merged_df.iloc[:, 0].values))
-        max_value = max(max(merged_df.iloc[:, 1].values), max(merged_df.iloc[:, 0].values))
+        min_value, max_value = scatter['range']
 
         line_45 = go.Scatter(
             x=[min_value, max_value],
@@ -3034,7 +539,8 @@ def get_scatterPlotLogScale(request):
                            xaxis=dict(title='Simulated', type='log', ), yaxis=dict(title='Observed', type='log',
                                                                                    autorange=True), showlegend=True)
 
-        chart_obj = PlotlyView(go.Figure(data=[scatter_data, scatter_data2, line_45], layout=layout))
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(go.Figure(data=[scatter_data, scatter_data2, line_45], layout=layout))
 
         context = {
             'gizmo_object': chart_obj,
@@ -3047,6 +553,9 @@ def get_scatterPlotLogScale(request):
         return JsonResponse({'error': 'No data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_volumeAnalysis(request):
     """
     Get observed data from csv files in Hydroshare
@@ -3060,427 +569,34 @@ def get_volumeAnalysis(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
-        '''Get Simulated Data'''
-
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
-
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
-
-        '''Get Observed Data'''
-
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
-
-        '''Correct the Bias in Sumulation'''
-
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
-
-        '''Merge Data'''
+        '''Get Volumes'''
 
-        merged_df = hd.merge_data(sim_df=simulated_df, obs_df=observed_df)
-
-        merged_df2 = hd.merge_data(sim_df=corrected_df, obs_df=observed_df)
+        artefacts = StationArtefacts({'station_code': codEstacion, 'comid': comid}, start, end, precomputed=True)
+        volume = artefacts.get('volume')['cumulative']
 
         '''Plotting Data'''
 
-        sim_array = merged_df.iloc[:, 0].values
-        obs_array = merged_df.iloc[:, 1].values
-        corr_array = merged_df2.iloc[:, 0].values
-
-        sim_volume_dt = sim_array * 0.0864
-        obs_volume_dt = obs_array * 0.0864
-        corr_volume_dt = corr_array * 0.0864
-
-        sim_volume_cum = []
-        obs_volume_cum = []
-        corr_volume_cum = []
-        sum_sim = 0
-        sum_obs = 0
-        sum_corr = 0
+        sim_volume_cum = volume['simulated'].values
+        obs_volume_cum = volume['observed'].values
+        corr_volume_cum = volume['corrected'].values
 
-        for i in sim_volume_dt:
-            sum_sim = sum_sim + i
-            sim_volume_cum.append(sum_sim)
+        dates = volume.index
 
-        for j in obs_volume_dt:
-            sum_obs = sum_obs + j
-            obs_volume_cum.append(sum_obs)
+        observed_volume = go.Scatter(x=dates, y=obs_volume_cum, name='Observed', )
 
-        for k in corr_volume_dt:
-            sum_corr = sum_corr + k
-            corr_volume_cum.append(sum_corr)
+        simulated_volume = go.Scatter(x=dates, y=sim_volume_cum, name='Simulated', )
 
-        observed_volume = go.Scatter(x=merged_df.index, y=obs_volume_cum, name='Observed', )
-
-        simulated_volume = go.Scatter(x=merged_df.index, y=sim_volume_cum, name='Simulated', )
-
-        corrected_volume = go.Scatter(x=merged_df2.index, y=corr_volume_cum, name='Corrected Simulated', )
+        corrected_volume = go.Scatter(x=dates, y=corr_volume_cum, name='Corrected Simulated', )
 
         layout = go.Layout(
             title='Observed & Simulated Volume at<br> {0} - {1}'.format(codEstacion, nomEstacion),
             xaxis=dict(title='Dates', ), yaxis=dict(title='Volume (Mm<sup>3</sup>)', autorange=True),
             showlegend=True)
 
-        chart_obj = PlotlyView(go.Figure(data=[observed_volume, simulated_volume, corrected_volume], layout=layout))
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(go.Figure(data=[observed_volume, simulated_volume, corrected_volume], layout=layout))
 
         context = {
             'gizmo_object': chart_obj,
@@ -3493,6 +609,9 @@ def get_volumeAnalysis(request):
         return JsonResponse({'error': 'No data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def volume_table_ajax(request):
     """Calculates the volumes of the simulated and observed streamflow"""
 
@@ -3504,395 +623,16 @@ def volume_table_ajax(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
-        '''Get Simulated Data'''
-
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
-
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
+        '''Get Volumes'''
 
-        '''Get Observed Data'''
-
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
-
-        '''Correct the Bias in Sumulation'''
-
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
-
-        '''Merge Data'''
+        artefacts = StationArtefacts({'station_code': codEstacion, 'comid': comid}, start, end, precomputed=True)
+        totals = artefacts.get('volume')['totals']
 
-        merged_df = hd.merge_data(sim_df=simulated_df, obs_df=observed_df)
-
-        merged_df2 = hd.merge_data(sim_df=corrected_df, obs_df=observed_df)
-
-        '''Plotting Data'''
-
-        sim_array = merged_df.iloc[:, 0].values
-        obs_array = merged_df.iloc[:, 1].values
-        corr_array = merged_df2.iloc[:, 0].values
-
-        sim_volume = round((integrate.simps(sim_array)) * 0.0864, 3)
-        obs_volume = round((integrate.simps(obs_array)) * 0.0864, 3)
-        corr_volume = round((integrate.simps(corr_array)) * 0.0864, 3)
+        sim_volume = totals['simulated']
+        obs_volume = totals['observed']
+        corr_volume = totals['corrected']
 
         resp = {
             "sim_volume": sim_volume,
@@ -3907,6 +647,10 @@ def volume_table_ajax(request):
         return JsonResponse({'error': 'No data found for the selected station.'})
 
 
+@timing.timed
+@profiling.profiled
+@jobs.background
+@cache.marks_age
 def make_table_ajax(request):
     get_data = request.GET
 
@@ -3916,6 +660,7 @@ def make_table_ajax(request):
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
         # Indexing the metrics to get the abbreviations
         selected_metric_abbr = get_data.getlist("metrics[]", None)
@@ -3982,423 +727,59 @@ def make_table_ajax(request):
             d1_p_x_bar_p = None
             extra_param_dict['d1_p_x_bar_p'] = d1_p_x_bar_p
 
-        '''Get Simulated Data'''
+        artefacts = StationArtefacts({'station_code': codEstacion, 'comid': comid}, start, end, precomputed=True)
 
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
+        if selected_metric_abbr == DEFAULT_METRICS and extra_param_dict == DEFAULT_METRIC_PARAMETERS:
 
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
+            '''Get Default Metrics'''
 
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
+            metrics_df = artefacts.get('metrics')
+            table = metrics_df.loc[['original']].rename(index={'original': 'Full Time Series'})
+            table2 = metrics_df.loc[['corrected']].rename(index={'corrected': 'Full Time Series'})
 
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
-
-        '''Get Observed Data'''
-
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
-
-        '''Correct the Bias in Sumulation'''
-
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
-
-        '''Merge Data'''
-        merged_df = hd.merge_data(sim_df=simulated_df, obs_df=observed_df)
-
-        merged_df2 = hd.merge_data(sim_df=corrected_df, obs_df=observed_df)
-
-        '''Plotting Data'''
+        else:
 
-        # Creating the Table Based on User Input
-        table = hs.make_table(
-            merged_dataframe=merged_df,
-            metrics=selected_metric_abbr,
-            # remove_neg=remove_neg,
-            # remove_zero=remove_zero,
-            mase_m=extra_param_dict['mase_m'],
-            dmod_j=extra_param_dict['dmod_j'],
-            nse_mod_j=extra_param_dict['nse_mod_j'],
-            h6_mhe_k=extra_param_dict['h6_mhe_k'],
-            h6_ahe_k=extra_param_dict['h6_ahe_k'],
-            h6_rmshe_k=extra_param_dict['h6_rmshe_k'],
-            d1_p_obs_bar_p=extra_param_dict['d1_p_x_bar_p'],
-            lm_x_obs_bar_p=extra_param_dict['lm_x_bar_p'],
-            # seasonal_periods=all_date_range_list
-        )
-        table_html = table.transpose()
-        table_html = table_html.to_html(classes="table table-hover table-striped").replace('border="1"', 'border="0"')
-
-        # Creating the Table Based on User Input
-        table2 = hs.make_table(
-            merged_dataframe=merged_df2,
-            metrics=selected_metric_abbr,
-            # remove_neg=remove_neg,
-            # remove_zero=remove_zero,
-            mase_m=extra_param_dict['mase_m'],
-            dmod_j=extra_param_dict['dmod_j'],
-            nse_mod_j=extra_param_dict['nse_mod_j'],
-            h6_mhe_k=extra_param_dict['h6_mhe_k'],
-            h6_ahe_k=extra_param_dict['h6_ahe_k'],
-            h6_rmshe_k=extra_param_dict['h6_rmshe_k'],
-            d1_p_obs_bar_p=extra_param_dict['d1_p_x_bar_p'],
-            lm_x_obs_bar_p=extra_param_dict['lm_x_bar_p'],
-            # seasonal_periods=all_date_range_list
-        )
-        table_html2 = table2.transpose()
-        table_html2 = table_html2.to_html(classes="table table-hover table-striped").replace('border="1"', 'border="0"')
+            '''Merge Data'''
+
+            merged = artefacts.get('merged')
+
+            merged_df = merged_frame(merged, 'simulated')
+
+            merged_df2 = merged_frame(merged, 'corrected')
+
+            # Creating the Table Based on User Input
+            table = hs.make_table(
+                merged_dataframe=merged_df,
+                metrics=selected_metric_abbr,
+                # remove_neg=remove_neg,
+                # remove_zero=remove_zero,
+                mase_m=extra_param_dict['mase_m'],
+                dmod_j=extra_param_dict['dmod_j'],
+                nse_mod_j=extra_param_dict['nse_mod_j'],
+                h6_mhe_k=extra_param_dict['h6_mhe_k'],
+                h6_ahe_k=extra_param_dict['h6_ahe_k'],
+                h6_rmshe_k=extra_param_dict['h6_rmshe_k'],
+                d1_p_obs_bar_p=extra_param_dict['d1_p_x_bar_p'],
+                lm_x_obs_bar_p=extra_param_dict['lm_x_bar_p'],
+                # seasonal_periods=all_date_range_list
+            )
+
+            # Creating the Table Based on User Input
+            table2 = hs.make_table(
+                merged_dataframe=merged_df2,
+                metrics=selected_metric_abbr,
+                # remove_neg=remove_neg,
+                # remove_zero=remove_zero,
+                mase_m=extra_param_dict['mase_m'],
+                dmod_j=extra_param_dict['dmod_j'],
+                nse_mod_j=extra_param_dict['nse_mod_j'],
+                h6_mhe_k=extra_param_dict['h6_mhe_k'],
+                h6_ahe_k=extra_param_dict['h6_ahe_k'],
+                h6_rmshe_k=extra_param_dict['h6_rmshe_k'],
+                d1_p_obs_bar_p=extra_param_dict['d1_p_x_bar_p'],
+                lm_x_obs_bar_p=extra_param_dict['lm_x_bar_p'],
+                # seasonal_periods=all_date_range_list
+            )
 
         table2 = table2.rename(index={'Full Time Series': 'Corrected Full Time Series'})
         table = table.rename(index={'Full Time Series': 'Original Full Time Series'})
@@ -4427,6 +808,9 @@ def get_units_title(unit_type):
     return units_title
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_time_series(request):
     get_data = request.GET
     try:
@@ -4439,368 +823,18 @@ def get_time_series(request):
         nomEstacion = get_data['stationname']
 
         '''Get Forecasts'''
-        forecast_df = geoglows.streamflow.forecast_stats(comid, return_format='csv')
-        # Removing Negative Values
-        forecast_df[forecast_df < 0] = 0
+        forecast_df = fetchers.get_forecast_stats(comid)
+
         # Getting forecast record
         #forecast_record = geoglows.streamflow.forecast_records(comid, return_format='csv')
         #forecast_ensembles = geoglows.streamflow.forecast_ensembles(comid)
         #hydroviewer_figure = geoglows.plots.hydroviewer(forecast_record, forecast_df, forecast_ensembles)
-        hydroviewer_figure = geoglows.plots.forecast_stats(stats=forecast_df, titles={'Station': nomEstacion + '-' + str(codEstacion), 'Reach ID': comid})
+        rperiods = station_return_periods(codEstacion)
+        with timing.stage('figure'):
+            hydroviewer_figure = geoglows.plots.forecast_stats(stats=forecast_df, rperiods=rperiods, titles={'Station': nomEstacion + '-' + str(codEstacion), 'Reach ID': comid})
 
         '''Getting real time observed data'''
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_rt = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_rt.set_index('Datetime', inplace=True)
-        observed_rt = observed_rt.replace(r'^\s*$', np.NaN, regex=True)
-        observed_rt["Observed Streamflow"] = pd.to_numeric(observed_rt["Observed Streamflow"], downcast="float")
-
-        observed_rt[observed_rt < 0] = 0
-
-        observed_rt.index = observed_rt.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_rt.index = pd.to_datetime(observed_rt.index)
+        observed_rt = fetchers.get_observed_data(codEstacion)
 
         observed_rt = observed_rt.dropna()
         observed_rt = observed_rt.groupby(observed_rt.index.strftime("%Y/%m/%d")).mean()
@@ -4832,6 +866,10 @@ def get_time_series(request):
         return JsonResponse({'error': 'No data found for the selected reach.'})
 
 
+@timing.timed
+@profiling.profiled
+@jobs.background
+@cache.marks_age
 def get_time_series_bc(request):
     get_data = request.GET
     try:
@@ -4845,745 +883,33 @@ def get_time_series_bc(request):
 
         '''Get Simulated Data'''
 
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
-
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
-
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        simulated_df.index = pd.to_datetime(simulated_df.index)
-
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
+        simulated_df = fetchers.get_simulated_data(comid)
 
         '''Get Observed Data'''
 
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
+        observed_df = fetchers.get_observed_data(codEstacion)
 
         '''Get Forecasts'''
 
-        forecast_df = geoglows.streamflow.forecast_stats(comid, return_format='csv')
-
-        # Removing Negative Values
-        forecast_df[forecast_df < 0] = 0
+        forecast_df = fetchers.get_forecast_stats(comid)
 
         # Getting forecast record
         #forecast_record = geoglows.streamflow.forecast_records(comid, return_format='csv')
         #forecast_ensembles = geoglows.streamflow.forecast_ensembles(comid)
 
         '''Correct Forecast'''
-        fixed_stats = geoglows.bias.correct_forecast(forecast_df, simulated_df, observed_df)
+        mappings = fetchers.get_fdc_mappings(codEstacion, comid, simulated_df, observed_df)
+        fixed_stats = correct_forecast(forecast_df, mappings)
         #fixed_records = geoglows.bias.correct_forecast(forecast_record, simulated_df, observed_df, use_month=-1)
         #fixed_ensembles = geoglows.bias.correct_forecast(forecast_ensembles, simulated_df, observed_df)
 
         #hydroviewer_figure = geoglows.plots.hydroviewer(fixed_records, fixed_stats, fixed_ensembles)
-        hydroviewer_figure = geoglows.plots.forecast_stats(stats=fixed_stats, titles={'Station': nomEstacion + '-' + str(codEstacion), 'Reach ID': comid})
+        rperiods = station_return_periods(codEstacion, corrected=True)
+        with timing.stage('figure'):
+            hydroviewer_figure = geoglows.plots.forecast_stats(stats=fixed_stats, rperiods=rperiods, titles={'Station': nomEstacion + '-' + str(codEstacion), 'Reach ID': comid})
 
         '''Getting real time observed data'''
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_rt = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_rt.set_index('Datetime', inplace=True)
-        observed_rt = observed_rt.replace(r'^\s*$', np.NaN, regex=True)
-        observed_rt["Observed Streamflow"] = pd.to_numeric(observed_rt["Observed Streamflow"], downcast="float")
-
-        observed_rt[observed_rt < 0] = 0
-
-        observed_rt.index = observed_rt.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_rt.index = pd.to_datetime(observed_rt.index)
+        observed_rt = observed_df.copy()
 
         observed_rt = observed_rt.dropna()
         observed_rt = observed_rt.groupby(observed_rt.index.strftime("%Y/%m/%d")).mean()
@@ -5615,831 +941,218 @@ def get_time_series_bc(request):
         return JsonResponse({'error': 'No data found for the selected reach.'})
 
 
-def get_observed_discharge_csv(request):
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_ensemble_forecast_bc(request):
     """
-    Get observed data from csv files in Hydroshare
+    Bias corrected ensemble forecast with percentile bands and threshold exceedance probabilities
     """
 
     get_data = request.GET
 
     try:
+        comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
 
+        '''Get Simulated Data'''
+
+        simulated_df = fetchers.get_simulated_data(comid)
+
         '''Get Observed Data'''
 
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
-
-        pairs = [list(a) for a in zip(observed_df.index, observed_df.iloc[:,0])]
-
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename=observed_discharge_{0}.csv'.format(codEstacion)
-
-        writer = csv_writer(response)
-        writer.writerow(['datetime', 'flow (m3/s)'])
-
-        for row_data in pairs:
-            writer.writerow(row_data)
-
-        return response
+        observed_df = fetchers.get_observed_data(codEstacion)
+
+        '''Get Ensembles'''
+
+        times, members, high_res = fetchers.get_forecast_ensembles(comid)
+
+        '''Correct Ensembles'''
+
+        mappings = fetchers.get_fdc_mappings(codEstacion, comid, simulated_df, observed_df)
+        corrected_members = correct_ensembles(times, members, mappings)
+        corrected_high_res = correct_ensembles(times, high_res, mappings)
+
+        bands = dict(zip(BAND_PERCENTILES, ensemble_percentiles(corrected_members)))
+
+        thresholds = observed_thresholds(observed_df)
+        exceedance = exceedance_probability(corrected_members, list(thresholds.values()))
+
+        '''Plotting Data'''
+
+        data = [
+            go.Scatter(x=times, y=bands[90], name='90th Percentile', line=dict(color='#a6bddb', width=0)),
+            go.Scatter(x=times, y=bands[10], name='10th - 90th Percentile', fill='tonexty',
+                       line=dict(color='#a6bddb', width=0)),
+            go.Scatter(x=times, y=bands[75], name='75th Percentile', line=dict(color='#3690c0', width=0)),
+            go.Scatter(x=times, y=bands[25], name='25th - 75th Percentile', fill='tonexty',
+                       line=dict(color='#3690c0', width=0)),
+            go.Scatter(x=times, y=bands[50], name='Median', line=dict(color='#034e7b')),
+            go.Scatter(x=times, y=corrected_high_res, name='High Resolution', line=dict(color='black')),
+        ]
+
+        for i, name in enumerate(thresholds):
+            data.append(go.Scatter(x=times, y=exceedance[i] * 100, yaxis='y2', line=dict(dash='dot'),
+                                   name='P(Q > {0}: {1:.1f} m<sup>3</sup>/s)'.format(name, thresholds[name])))
+
+        layout = go.Layout(
+            title='Corrected Ensemble Forecast at <br> {0} - {1}'.format(codEstacion, nomEstacion),
+            xaxis=dict(title='Date', ),
+            yaxis=dict(title='Discharge (m<sup>3</sup>/s)', autorange=True),
+            yaxis2=dict(title='Exceedance Probability (%)', overlaying='y', side='right', range=[0, 100]),
+            showlegend=True)
+
+        with timing.stage('figure'):
+            chart_obj = PlotlyView(go.Figure(data=data, layout=layout))
+
+        context = {
+            'gizmo_object': chart_obj,
+        }
+
+        return render(request, 'hydroviewer_madeira_river/gizmo_ajax.html', context)
 
     except Exception as e:
         print(str(e))
-        return JsonResponse({'error': 'An unknown error occurred while retrieving the Discharge Data.'})
+        return JsonResponse({'error': 'No data found for the selected reach.'})
 
 
-def get_simulated_discharge_csv(request):
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_forecast_verification(request):
     """
-    Get historic simulations from ERA Interim
+    Lead-time resolved skill of the archived forecasts against the observed data
     """
 
+    get_data = request.GET
+
     try:
-        get_data = request.GET
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
-        nomEstacion = get_data['stationname']
 
-        '''Get Simulated Data'''
+        observed_df = fetchers.get_observed_data(codEstacion)
 
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
+        skill = verify_forecasts(comid, observed_df)
 
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
+        if len(skill.index) == 0:
+            return JsonResponse({'error': 'There are no archived forecasts with observations for the selected reach.'})
 
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
+        table_html = skill.to_html(classes="table table-hover table-striped", table_id="forecast_verification",
+                                   float_format='{0:.3f}'.format).replace('border="1"', 'border="0"')
 
-        simulated_df.index = pd.to_datetime(simulated_df.index)
+        return HttpResponse(table_html)
 
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'No data found for the selected reach.'})
 
-        pairs = [list(a) for a in zip(simulated_df.index, simulated_df.iloc[:, 0])]
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename=simulated_discharge_{0}.csv'.format(codEstacion)
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_observed_discharge_csv(request):
+    """
+    Get observed data from csv files in Hydroshare
+    """
 
-        writer = csv_writer(response)
-        writer.writerow(['datetime', 'flow (m3/s)'])
+    get_data = request.GET
 
-        for row_data in pairs:
-            writer.writerow(row_data)
+    try:
+        codEstacion = get_data['stationcode']
+        nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
+
+        '''Get Observed Data'''
 
-        return response
+        observed_df = fetchers.get_stored_series('observed', codEstacion, start, end)
+
+        basename = 'observed_discharge_{0}{1}'.format(codEstacion, period_label(start, end))
+        return exports.export_response(observed_df, basename,
+                                       get_data.get('format', 'csv'), index_label=exports.DISCHARGE_INDEX_LABEL,
+                                       columns=exports.DISCHARGE_COLUMNS,
+                                       attributes={'station_id': codEstacion, 'station_name': nomEstacion,
+                                                   'source': 'ANA Hidroweb'})
 
     except Exception as e:
         print(str(e))
         return JsonResponse({'error': 'An unknown error occurred while retrieving the Discharge Data.'})
 
 
-def get_simulated_bc_discharge_csv(request):
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_simulated_discharge_csv(request):
     """
     Get historic simulations from ERA Interim
     """
 
-    get_data = request.GET
-
     try:
+        get_data = request.GET
         comid = get_data['streamcomid']
         codEstacion = get_data['stationcode']
         nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
         '''Get Simulated Data'''
 
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
+        simulated_df = fetchers.get_stored_series('simulated', comid, start, end)
+
+        basename = 'simulated_discharge_{0}{1}'.format(codEstacion, period_label(start, end))
+        return exports.export_response(simulated_df, basename,
+                                       get_data.get('format', 'csv'), index_label=exports.DISCHARGE_INDEX_LABEL,
+                                       columns=exports.DISCHARGE_COLUMNS,
+                                       attributes={'station_id': codEstacion, 'station_name': nomEstacion,
+                                                   'comid': comid, 'source': 'GEOGloWS ECMWF Streamflow'})
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'An unknown error occurred while retrieving the Discharge Data.'})
 
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
 
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_simulated_bc_discharge_csv(request):
+    """
+    Get historic simulations from ERA Interim
+    """
 
-        simulated_df.index = pd.to_datetime(simulated_df.index)
+    get_data = request.GET
 
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
+    try:
+        comid = get_data['streamcomid']
+        codEstacion = get_data['stationcode']
+        nomEstacion = get_data['stationname']
+        start, end = get_period(get_data)
 
-        '''Get Observed Data'''
+        '''Get Simulated Data'''
 
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
+        simulated_df = fetchers.get_simulated_data(comid)
 
-        '''Correct the Bias in Sumulation'''
+        '''Get Observed Data'''
 
-        corrected_df = geoglows.bias.correct_historical(simulated_df, observed_df)
+        observed_df = fetchers.get_observed_data(codEstacion)
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename=corrected_simulated_discharge_{0}.csv'.format(
-            codEstacion)
+        '''Correct the Bias in Sumulation'''
 
-        corrected_df.to_csv(encoding='utf-8', header=True, path_or_buf=response)
+        corrected_df = fetchers.get_corrected_data(simulated_df, observed_df, codEstacion, comid, start, end)
 
-        return response
+        basename = 'corrected_simulated_discharge_{0}{1}'.format(codEstacion, period_label(start, end))
+        return exports.export_response(corrected_df, basename,
+                                       get_data.get('format', 'csv'),
+                                       attributes={'station_id': codEstacion, 'station_name': nomEstacion,
+                                                   'comid': comid, 'source': 'GEOGloWS ECMWF Streamflow',
+                                                   'comment': 'Bias corrected with the ANA observations'})
 
     except Exception as e:
         print(str(e))
         return JsonResponse({'error': 'An unknown error occurred while retrieving the Discharge Data.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_forecast_data_csv(request):
     """""
     Returns Forecast data as csv
@@ -6456,24 +1169,23 @@ def get_forecast_data_csv(request):
         nomEstacion = get_data['stationname']
 
         '''Get Forecasts'''
-        forecast_df = geoglows.streamflow.forecast_stats(comid, return_format='csv')
-
-        # Removing Negative Values
-        forecast_df[forecast_df < 0] = 0
+        forecast_df = fetchers.get_forecast_stats(comid)
 
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename=streamflow_forecast_{0}_{1}_{2}.csv'.format(watershed,
-                                                                                                            subbasin,
-                                                                                                            comid)
-        forecast_df.to_csv(encoding='utf-8', header=True, path_or_buf=response)
-
-        return response
+        return exports.export_response(forecast_df, 'streamflow_forecast_{0}_{1}_{2}'.format(watershed, subbasin,
+                                                                                              comid),
+                                       get_data.get('format', 'csv'),
+                                       attributes={'station_id': codEstacion, 'station_name': nomEstacion,
+                                                   'comid': comid, 'source': 'GEOGloWS ECMWF Streamflow'},
+                                       date_format=None)
 
     except Exception as e:
         print(str(e))
         return JsonResponse({'error': 'No forecast data found.'})
 
 
+@timing.timed
+@profiling.profiled
+@cache.marks_age
 def get_forecast_bc_data_csv(request):
     """""
     Returns Forecast data as csv
@@ -6491,391 +1203,292 @@ def get_forecast_bc_data_csv(request):
 
         '''Get Simulated Data'''
 
-        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing='era_5', return_format='csv')
+        simulated_df = fetchers.get_simulated_data(comid)
 
-        # Removing Negative Values
-        simulated_df[simulated_df < 0] = 0
+        '''Get Observed Data'''
 
-        simulated_df.index = simulated_df.index.to_series().dt.strftime("%Y-%m-%d")
+        observed_df = fetchers.get_observed_data(codEstacion)
 
-        simulated_df.index = pd.to_datetime(simulated_df.index)
+        '''Get Forecasts'''
+        forecast_df = fetchers.get_forecast_stats(comid)
 
-        simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
-                                    columns=['Simulated Streamflow'])
+        '''Correct Forecast'''
+        mappings = fetchers.get_fdc_mappings(codEstacion, comid, simulated_df, observed_df)
+        fixed_stats = correct_forecast(forecast_df, mappings)
 
-        '''Get Observed Data'''
+        return exports.export_response(fixed_stats, 'corrected_streamflow_forecast_{0}_{1}_{2}'.format(
+            watershed, subbasin, comid), get_data.get('format', 'csv'),
+            attributes={'station_id': codEstacion, 'station_name': nomEstacion, 'comid': comid,
+                        'source': 'GEOGloWS ECMWF Streamflow',
+                        'comment': 'Bias corrected with the ANA observations'}, date_format=None)
 
-        now = dt.datetime.now()
-        YYYY = str(now.year)
-        MM = str(now.month)
-        DD = now.day
-
-        url = 'http://telemetriaws1.ana.gov.br/ServiceANA.asmx/HidroSerieHistorica?codEstacao={0}&DataInicio=01/01/1900&DataFim={1}/{2}/{3}&tipoDados=3&nivelConsistencia=1'.format(
-            codEstacion, DD, MM, YYYY)
-
-        response = requests.get(url, verify=False)
-
-        soup = BeautifulSoup(response.content, "xml")
-        times = soup.find_all('DataHora')
-        valuesDay01 = soup.find_all('Vazao01')
-        valuesDay02 = soup.find_all('Vazao02')
-        valuesDay03 = soup.find_all('Vazao03')
-        valuesDay04 = soup.find_all('Vazao04')
-        valuesDay05 = soup.find_all('Vazao05')
-        valuesDay06 = soup.find_all('Vazao06')
-        valuesDay07 = soup.find_all('Vazao07')
-        valuesDay08 = soup.find_all('Vazao08')
-        valuesDay09 = soup.find_all('Vazao09')
-        valuesDay10 = soup.find_all('Vazao10')
-        valuesDay11 = soup.find_all('Vazao11')
-        valuesDay12 = soup.find_all('Vazao12')
-        valuesDay13 = soup.find_all('Vazao13')
-        valuesDay14 = soup.find_all('Vazao14')
-        valuesDay15 = soup.find_all('Vazao15')
-        valuesDay16 = soup.find_all('Vazao16')
-        valuesDay17 = soup.find_all('Vazao17')
-        valuesDay18 = soup.find_all('Vazao18')
-        valuesDay19 = soup.find_all('Vazao19')
-        valuesDay20 = soup.find_all('Vazao20')
-        valuesDay21 = soup.find_all('Vazao21')
-        valuesDay22 = soup.find_all('Vazao22')
-        valuesDay23 = soup.find_all('Vazao23')
-        valuesDay24 = soup.find_all('Vazao24')
-        valuesDay25 = soup.find_all('Vazao25')
-        valuesDay26 = soup.find_all('Vazao26')
-        valuesDay27 = soup.find_all('Vazao27')
-        valuesDay28 = soup.find_all('Vazao28')
-        valuesDay29 = soup.find_all('Vazao29')
-        valuesDay30 = soup.find_all('Vazao30')
-        valuesDay31 = soup.find_all('Vazao31')
-
-        monthly__time = []
-        values01 = []
-        values02 = []
-        values03 = []
-        values04 = []
-        values05 = []
-        values06 = []
-        values07 = []
-        values08 = []
-        values09 = []
-        values10 = []
-        values11 = []
-        values12 = []
-        values13 = []
-        values14 = []
-        values15 = []
-        values16 = []
-        values17 = []
-        values18 = []
-        values19 = []
-        values20 = []
-        values21 = []
-        values22 = []
-        values23 = []
-        values24 = []
-        values25 = []
-        values26 = []
-        values27 = []
-        values28 = []
-        values29 = []
-        values30 = []
-        values31 = []
-
-        for i in range(0, len(times)):
-            monthlyTime = times[i].next
-            monthly__time.append(monthlyTime)
-            value01 = valuesDay01[i].next
-            values01.append(value01)
-            value02 = valuesDay02[i].next
-            values02.append(value02)
-            value03 = valuesDay03[i].next
-            values03.append(value03)
-            value04 = valuesDay04[i].next
-            values04.append(value04)
-            value05 = valuesDay05[i].next
-            values05.append(value05)
-            value06 = valuesDay06[i].next
-            values06.append(value06)
-            value07 = valuesDay07[i].next
-            values07.append(value07)
-            value08 = valuesDay08[i].next
-            values08.append(value08)
-            value09 = valuesDay09[i].next
-            values09.append(value09)
-            value10 = valuesDay10[i].next
-            values10.append(value10)
-            value11 = valuesDay11[i].next
-            values11.append(value11)
-            value12 = valuesDay12[i].next
-            values12.append(value12)
-            value13 = valuesDay13[i].next
-            values13.append(value13)
-            value14 = valuesDay14[i].next
-            values14.append(value14)
-            value15 = valuesDay15[i].next
-            values15.append(value15)
-            value16 = valuesDay16[i].next
-            values16.append(value16)
-            value17 = valuesDay17[i].next
-            values17.append(value17)
-            value18 = valuesDay18[i].next
-            values18.append(value18)
-            value19 = valuesDay19[i].next
-            values19.append(value19)
-            value20 = valuesDay20[i].next
-            values20.append(value20)
-            value21 = valuesDay21[i].next
-            values21.append(value21)
-            value22 = valuesDay22[i].next
-            values22.append(value22)
-            value23 = valuesDay23[i].next
-            values23.append(value23)
-            value24 = valuesDay24[i].next
-            values24.append(value24)
-            value25 = valuesDay25[i].next
-            values25.append(value25)
-            value26 = valuesDay26[i].next
-            values26.append(value26)
-            value27 = valuesDay27[i].next
-            values27.append(value27)
-            value28 = valuesDay28[i].next
-            values28.append(value28)
-            value29 = valuesDay29[i].next
-            values29.append(value29)
-            value30 = valuesDay30[i].next
-            values30.append(value30)
-            value31 = valuesDay31[i].next
-            values31.append(value31)
-
-        daily_time = []
-        monthly_time = []
-
-        for i in range(0, len(monthly__time)):
-            year = int(monthly__time[i][0:4])
-            month = int(monthly__time[i][5:7])
-            day = int(monthly__time[i][8:10])
-            if day != 1:
-                day = 1
-            hh = int(monthly__time[i][11:13])
-            mm = int(monthly__time[i][14:16])
-            ss = int(monthly__time[i][17:19])
-            monthlyTime = dt.datetime(year, month, day, hh, mm)
-            monthly_time.append(monthlyTime)
-            if month == 1:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 2:
-                if calendar.isleap(year):
-                    for j in range(0, 29):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-                else:
-                    for j in range(0, 28):
-                        date = dt.datetime(year, month, j + 1, hh, mm)
-                        daily_time.append(date)
-            elif month == 3:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 4:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 5:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 6:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 7:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 8:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 9:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 10:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 11:
-                for j in range(0, 30):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-            elif month == 12:
-                for j in range(0, 31):
-                    date = dt.datetime(year, month, j + 1, hh, mm)
-                    daily_time.append(date)
-
-        dischargeValues = []
-
-        for date in daily_time:
-            if date.day == 1:
-                discharge = values01[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 2:
-                discharge = values02[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 1, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 3:
-                discharge = values03[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 2, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 4:
-                discharge = values04[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 3, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 5:
-                discharge = values05[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 4, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 6:
-                discharge = values06[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 5, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 7:
-                discharge = values07[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 6, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 8:
-                discharge = values08[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 7, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 9:
-                discharge = values09[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 8, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 10:
-                discharge = values10[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 9, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 11:
-                discharge = values11[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 10, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 12:
-                discharge = values12[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 11, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 13:
-                discharge = values13[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 12, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 14:
-                discharge = values14[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 13, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 15:
-                discharge = values15[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 14, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 16:
-                discharge = values16[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 15, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 17:
-                discharge = values17[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 16, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 18:
-                discharge = values18[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 17, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 19:
-                discharge = values19[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 18, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 20:
-                discharge = values20[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 19, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 21:
-                discharge = values21[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 20, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 22:
-                discharge = values22[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 21, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 23:
-                discharge = values23[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 22, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 24:
-                discharge = values24[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 23, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 25:
-                discharge = values25[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 24, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 26:
-                discharge = values26[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 25, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 27:
-                discharge = values27[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 26, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 28:
-                discharge = values28[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 27, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 29:
-                discharge = values29[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 28, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 30:
-                discharge = values30[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 29, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-            elif date.day == 31:
-                discharge = values31[
-                    monthly_time.index(dt.datetime(date.year, date.month, date.day - 30, date.hour, date.minute))]
-                dischargeValues.append(str(discharge))
-
-        pairs = [list(a) for a in zip(daily_time, dischargeValues)]
-        pairs = sorted(pairs, key=lambda x: x[0])
-
-        observed_df = pd.DataFrame(pairs, columns=['Datetime', 'Observed Streamflow'])
-        observed_df.set_index('Datetime', inplace=True)
-        observed_df = observed_df.replace(r'^\s*$', np.NaN, regex=True)
-        observed_df["Observed Streamflow"] = pd.to_numeric(observed_df["Observed Streamflow"], downcast="float")
-
-        observed_df[observed_df < 0] = 0
-
-        observed_df.index = observed_df.index.to_series().dt.strftime("%Y-%m-%d")
-
-        observed_df.index = pd.to_datetime(observed_df.index)
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'No forecast data found.'})
 
-        '''Get Forecasts'''
-        forecast_df = geoglows.streamflow.forecast_stats(comid, return_format='csv')
 
-        # Removing Negative Values
-        forecast_df[forecast_df < 0] = 0
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_basin_aggregate_csv(request):
+    """
+    Returns a basin-wide aggregate of the Parquet dataset as csv (or Parquet)
+    """
 
-        '''Correct Forecast'''
-        fixed_stats = geoglows.bias.correct_forecast(forecast_df, simulated_df, observed_df)
+    get_data = request.GET
 
-        response = HttpResponse(content_type='text/csv')
-        response[
-            'Content-Disposition'] = 'attachment; filename=corrected_streamflow_forecast_{0}_{1}_{2}.csv'.format(
-            watershed, subbasin, comid)
+    try:
+        aggregate = get_data.get('aggregate', 'annual_means')
+        series = get_data.get('series', 'observed')
+        min_days = int(get_data.get('min_days', 300))
 
-        fixed_stats.to_csv(encoding='utf-8', header=True, path_or_buf=response)
+        table = basin_aggregate(aggregate, series=series, min_days=min_days)
 
-        return response
+        return exports.export_response(table, 'madeira_{0}_{1}'.format(aggregate, series),
+                                       get_data.get('format', 'csv'), index=False)
 
     except Exception as e:
         print(str(e))
-        return JsonResponse({'error': 'No forecast data found.'})
+        return JsonResponse({'error': 'The basin aggregate could not be computed.'})
+
+
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_validation_leaderboard(request):
+    """
+    Returns the precomputed basin-wide validation leaderboard as a table
+    """
+
+    get_data = request.GET
+
+    try:
+        leaderboard = load_leaderboard()
+
+        if leaderboard is None:
+            return JsonResponse({'error': 'The validation leaderboard has not been computed yet.'})
+
+        sort_by = get_data.get('sort', 'KGE (2012)')
+        ascending = get_data.get('order', 'asc') != 'desc'
+
+        table = leaderboard_table(leaderboard, sort_by=sort_by, ascending=ascending)
+
+        table_html = table.to_html(classes="table table-hover table-striped", table_id="leaderboard",
+                                   index=False, na_rep='-', float_format='{0:.3f}'.format)
+        table_html = table_html.replace('border="1"', 'border="0"')
+
+        return HttpResponse('<p>Computed on {0}</p>{1}'.format(leaderboard['generated'], table_html))
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'An unknown error occurred while retrieving the validation leaderboard.'})
+
+
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_validation_geojson(request):
+    """
+    Returns the stations as GeoJSON coloured by the selected efficiency metric
+    """
+
+    get_data = request.GET
+
+    try:
+        leaderboard = load_leaderboard()
+
+        if leaderboard is None:
+            return JsonResponse({'error': 'The validation leaderboard has not been computed yet.'})
+
+        metric = get_data.get('metric', 'KGE (2012)')
+        corrected = get_data.get('corrected', 'false') == 'true'
+
+        return JsonResponse(leaderboard_geojson(leaderboard, metric=metric, corrected=corrected))
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'An unknown error occurred while retrieving the validation layer.'})
+
+
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_forecast_alerts(request):
+    """
+    Returns the exceedance alerts of the last forecast cycle for all the stations as GeoJSON
+    """
+
+    get_data = request.GET
+
+    try:
+        alerts = load_alerts()
+
+        if alerts is None:
+            return JsonResponse({'error': 'The forecast alerts have not been computed yet.'})
+
+        corrected = get_data.get('corrected', 'false') == 'true'
+
+        return JsonResponse(alerts_geojson(alerts, corrected=corrected))
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'An unknown error occurred while retrieving the forecast alerts.'})
+
+
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_station_catalog(request):
+    """
+    Returns the stations of the app as GeoJSON
+    """
+
+    try:
+        return JsonResponse(catalog_geojson())
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'An unknown error occurred while retrieving the stations.'})
+
+
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_nearest_station(request):
+    """
+    Returns the station nearest to a point (lon, lat) as a GeoJSON feature, within max_distance km if given
+    """
+
+    get_data = request.GET
+
+    try:
+        lon = float(get_data['lon'])
+        lat = float(get_data['lat'])
+        max_distance = float(get_data['max_distance']) if 'max_distance' in get_data else None
+
+        station, distance = nearest_station(lon, lat, max_distance=max_distance)
+
+        if station is None:
+            return JsonResponse({'error': 'No station was found near the point.'})
+
+        feature = station_feature(station)
+        feature['properties']['distance_km'] = round(distance, 3)
+
+        return JsonResponse(feature)
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'An unknown error occurred while finding the nearest station.'})
+
+
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def start_bulk_export(request):
+    """
+    Starts an export job of the series of many stations, returns its status
+    """
+
+    get_data = request.GET
+
+    if not bulk_export.may_export(request):
+        return JsonResponse({'error': 'Sign in to export the series of many stations.'}, status=403)
+
+    try:
+        station_codes = [code for code in get_data.get('stations', '').split(',') if code] or None
+        export_format = get_data.get('format', 'zip')
+        series = [name for name in get_data.get('series', '').split(',') if name] or bulk_export.SERIES
+
+        return JsonResponse(bulk_export.start_job(station_codes, export_format, series))
+
+    except bulk_export.ExportLimitError as e:
+        return JsonResponse({'error': str(e)}, status=429)
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'The export job could not be started.'})
+
+
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_bulk_export_status(request):
+    """
+    Returns the progress of an export job
+    """
+
+    get_data = request.GET
+
+    try:
+        status = bulk_export.read_status(get_data['job'])
+
+        if status is None:
+            return JsonResponse({'error': 'Unknown export job.'})
+
+        return JsonResponse(status)
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'An unknown error occurred while retrieving the export job.'})
+
+
+@timing.timed
+@profiling.profiled
+@cache.marks_age
+def get_bulk_export_archive(request):
+    """
+    Returns the archive of a finished export job
+    """
+
+    get_data = request.GET
+
+    try:
+        job_id = get_data['job']
+        status = bulk_export.read_status(job_id)
+
+        if status is None or status['status'] != 'done':
+            return JsonResponse({'error': 'The export job has not finished.'})
+
+        return FileResponse(open(bulk_export.archive_path(job_id, status['format']), 'rb'), as_attachment=True,
+                            filename=status['archive'])
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'An unknown error occurred while retrieving the export archive.'})
+
+
+@timing.timed
+@profiling.profiled
+def get_job_result(request):
+    """
+    Returns the response of a background job once it is done, or its status after waiting up to wait seconds
+    """
+
+    get_data = request.GET
+
+    try:
+        job = get_data['job']
+        entry = jobs.wait(job, float(get_data.get('wait', 0)))
+
+        if entry is None:
+            return JsonResponse({'error': 'Unknown job.'})
+
+        if entry['status'] == 'done':
+            return jobs.job_response(entry)
+
+        if entry['status'] == 'failed':
+            return JsonResponse({'error': 'The job failed: {0}'.format(entry['error'])})
+
+        return JsonResponse({'job': job, 'status': entry['status']}, status=202)
+
+    except Exception as e:
+        print(str(e))
+        return JsonResponse({'error': 'An unknown error occurred while retrieving the job.'})
+
+
+def metrics(request):
+    """
+    Prometheus metrics of the request stages
+    """
+    content, content_type = timing.metrics_text()
+    return HttpResponse(content, content_type=content_type)
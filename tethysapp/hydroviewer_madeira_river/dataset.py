@@ -0,0 +1,226 @@
+"""
+Partitioned Parquet dataset of the Madeira basin series with a DuckDB query layer.
+
+Each series is written under workspaces/app_workspace/basin_dataset/<series>/station_code=<code>/, one file per
+station (observed, simulated, corrected) or per forecast issue (forecast), and basin-wide aggregates are SQL
+queries over all the files. Refresh the dataset (e.g. nightly, after the forecast cycle):
+
+    python -m tethysapp.hydroviewer_madeira_river.dataset --processes 8
+"""
+import argparse
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import fetchers
+from .config import APP_WORKSPACE
+from .lazy_imports import lazy_import
+from .stations import get_stations
+
+duckdb = lazy_import('duckdb')
+
+DATASET_DIR = os.path.join(APP_WORKSPACE, 'basin_dataset')
+
+SERIES = ('observed', 'simulated', 'corrected', 'forecast')
+
+# Forecast statistic columns -> dataset columns
+FORECAST_COLUMNS = {
+    'flow_max_m^3/s': 'flow_max',
+    'flow_75%_m^3/s': 'flow_75',
+    'flow_avg_m^3/s': 'flow_avg',
+    'flow_25%_m^3/s': 'flow_25',
+    'flow_min_m^3/s': 'flow_min',
+    'high_res_m^3/s': 'high_res',
+}
+
+AGGREGATES = ('annual_means', 'anomalies', 'stations')
+
+
+def _partition_dir(series, station_code):
+    return os.path.join(DATASET_DIR, series, 'station_code={0}'.format(station_code))
+
+
+def _write_parquet(table, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    table.to_parquet(tmp_file, index=False)
+    os.replace(tmp_file, path)
+
+
+def _naive_index(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index
+
+
+def daily_table(series_df, station):
+    """
+    Rows (station_code, comid, date, flow) of a daily series, as written to the dataset and the bulk exports
+    """
+    table = pd.DataFrame({
+        'station_code': station['station_code'],
+        'comid': np.int64(station['comid']),
+        'date': _naive_index(series_df.index),
+        'flow': series_df.iloc[:, 0].values.astype(np.float64),
+    })
+    return table.dropna(subset=['flow'])
+
+
+def write_station(station):
+    """
+    Write the observed, simulated and corrected series and the current forecast of a station
+    """
+    try:
+        simulated_df = fetchers.get_simulated_data(station['comid'])
+        observed_df = fetchers.get_observed_data(station['station_code'])
+        corrected_df = fetchers.get_corrected_data(simulated_df, observed_df, station['station_code'],
+                                                  station['comid'])
+
+        for series, series_df in (('observed', observed_df), ('simulated', simulated_df),
+                                  ('corrected', corrected_df)):
+            _write_parquet(daily_table(series_df, station),
+                           os.path.join(_partition_dir(series, station['station_code']), 'data.parquet'))
+
+        forecast_df = fetchers.get_forecast_stats(station['comid'])
+        valid_time = _naive_index(forecast_df.index)
+
+        forecast = pd.DataFrame({
+            'station_code': station['station_code'],
+            'comid': np.int64(station['comid']),
+            'issue_time': valid_time[0],
+            'valid_time': valid_time,
+        })
+        for column, name in FORECAST_COLUMNS.items():
+            forecast[name] = forecast_df[column].values if column in forecast_df.columns else np.nan
+
+        _write_parquet(forecast, os.path.join(_partition_dir('forecast', station['station_code']),
+                                              '{0}.parquet'.format(valid_time[0].strftime('%Y%m%d%H'))))
+        return None
+
+    except Exception as e:
+        return '{0}: {1}'.format(station['station_code'], str(e))
+
+
+def build_dataset(processes=None, stations=None):
+    """
+    Write the series of all the stations in parallel, returns the errors
+    """
+    if stations is None:
+        stations = get_stations()
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        errors = [error for error in executor.map(write_station, stations) if error is not None]
+
+    return errors
+
+
+def connect():
+    """
+    In-memory DuckDB connection with one view per series of the dataset
+    """
+    connection = duckdb.connect()
+    for series in SERIES:
+        files = os.path.join(DATASET_DIR, series, '*', '*.parquet')
+        if os.path.isdir(os.path.join(DATASET_DIR, series)):
+            connection.execute("CREATE VIEW {0} AS SELECT * FROM read_parquet('{1}', hive_partitioning = false)"
+                               .format(series, files.replace("'", "''")))
+    return connection
+
+
+def query(sql, parameters=None):
+    """
+    Run a SQL query over the observed, simulated, corrected and forecast views
+    """
+    connection = connect()
+    try:
+        return connection.execute(sql, parameters or []).df()
+    finally:
+        connection.close()
+
+
+def _check_series(series):
+    if series not in SERIES[:3]:
+        raise ValueError('Unknown series {0}.'.format(series))
+
+
+def annual_means(series='observed', min_days=300):
+    """
+    Annual mean flow of every station, years with at least min_days of data
+    """
+    _check_series(series)
+    return query("""
+        SELECT station_code, any_value(comid) AS comid, year(date) AS year, avg(flow) AS mean_flow,
+               count(flow) AS days
+        FROM {0}
+        GROUP BY station_code, year(date)
+        HAVING count(flow) >= ?
+        ORDER BY station_code, year
+    """.format(series), [int(min_days)])
+
+
+def annual_anomalies(series='observed', min_days=300):
+    """
+    Anomaly of the annual mean flow of every station relative to its mean annual flow,
+    also standardized by the deviation of its annual means
+    """
+    _check_series(series)
+    return query("""
+        WITH annual AS (
+            SELECT station_code, year(date) AS year, avg(flow) AS mean_flow
+            FROM {0}
+            GROUP BY station_code, year(date)
+            HAVING count(flow) >= ?
+        )
+        SELECT station_code, year, mean_flow,
+               mean_flow - avg(mean_flow) OVER stations AS anomaly,
+               (mean_flow - avg(mean_flow) OVER stations) / stddev_samp(mean_flow) OVER stations
+                   AS standardized_anomaly
+        FROM annual
+        WINDOW stations AS (PARTITION BY station_code)
+        ORDER BY station_code, year
+    """.format(series), [int(min_days)])
+
+
+def station_statistics(series='observed'):
+    """
+    Record length and flow statistics of every station, to compare the stations of the basin
+    """
+    _check_series(series)
+    return query("""
+        SELECT station_code, any_value(comid) AS comid, min(date) AS first_date, max(date) AS last_date,
+               count(flow) AS days, avg(flow) AS mean_flow, stddev_samp(flow) AS std_flow,
+               stddev_samp(flow) / nullif(avg(flow), 0) AS cv, min(flow) AS min_flow,
+               quantile_cont(flow, 0.5) AS median_flow, max(flow) AS max_flow
+        FROM {0}
+        GROUP BY station_code
+        ORDER BY station_code
+    """.format(series))
+
+
+def basin_aggregate(aggregate, series='observed', min_days=300):
+    """
+    One of the AGGREGATES of a series
+    """
+    if aggregate == 'annual_means':
+        return annual_means(series, min_days)
+    if aggregate == 'anomalies':
+        return annual_anomalies(series, min_days)
+    if aggregate == 'stations':
+        return station_statistics(series)
+    raise ValueError('Unknown aggregate {0}.'.format(aggregate))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write the Parquet dataset of the Madeira basin.')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes.')
+    args = parser.parse_args()
+
+    failed = build_dataset(processes=args.processes)
+    for error in failed:
+        print(error)
+    print('Dataset written to {0} ({1} stations failed).'.format(DATASET_DIR, len(failed)))
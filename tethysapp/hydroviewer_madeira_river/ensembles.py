@@ -0,0 +1,50 @@
+"""
+Ensemble forecast statistics computed along the member axis of a (member x time) array.
+"""
+import numpy as np
+
+from .bias_correction import apply_mapping
+
+# Percentiles shown as forecast bands
+BAND_PERCENTILES = [10, 25, 50, 75, 90]
+
+# Observed flows exceeded 10%, 5% and 1% of the time, used as exceedance thresholds
+THRESHOLD_PERCENTILES = {'Q10': 90, 'Q5': 95, 'Q1': 99}
+
+
+def correct_ensembles(times, members, mappings):
+    """
+    Bias correct all the members in one interpolation over the flow duration curves of the
+    month of the first forecast time, as geoglows.bias.correct_forecast does
+    """
+    return apply_mapping(members, *mappings[times[0].month])
+
+
+def ensemble_percentiles(members, percentiles=BAND_PERCENTILES):
+    """
+    Percentiles across the members for every time step (percentile x time)
+    """
+    with np.errstate(invalid='ignore'):
+        return np.nanpercentile(members, percentiles, axis=0)
+
+
+def exceedance_probability(members, thresholds):
+    """
+    Fraction of the members above each threshold for every time step (threshold x time).
+    Time steps without any member value are NaN.
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    valid = np.isfinite(members)
+    above = members[None, :, :] > thresholds[:, None, None]
+    counts = valid.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, above.sum(axis=1) / counts, np.nan)
+
+
+def observed_thresholds(observed_df):
+    """
+    High flow thresholds from the observed flow duration curve
+    """
+    observed = observed_df.iloc[:, 0].dropna().values
+    values = np.percentile(observed, list(THRESHOLD_PERCENTILES.values()))
+    return dict(zip(THRESHOLD_PERCENTILES.keys(), values))
@@ -0,0 +1,153 @@
+"""
+Downloads of the series: streamed CSV (plain or gzip) formatted in chunks of rows, Parquet and CF NetCDF.
+"""
+import io
+import re
+import zlib
+
+import pandas as pd
+from django.http import HttpResponse, StreamingHttpResponse
+
+from .lazy_imports import lazy_import
+
+xr = lazy_import('xarray')
+
+CHUNK_ROWS = 20000
+
+FORMATS = {
+    'csv': ('csv', 'text/csv'),
+    'csv.gz': ('csv.gz', 'application/gzip'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'netcdf': ('nc', 'application/x-netcdf'),
+}
+
+# CF attributes of the discharge variables
+DISCHARGE_ATTRIBUTES = {
+    'units': 'm3 s-1',
+    'standard_name': 'water_volume_transport_in_river_channel',
+}
+
+# Timestamps of the csv downloads of the historical series. The forecast downloads keep the pandas format with the
+# UTC offset (date_format=None), as they always had.
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Column names of the observed and simulated discharge downloads
+DISCHARGE_INDEX_LABEL = 'datetime'
+DISCHARGE_COLUMNS = ['flow (m3/s)']
+
+
+def csv_chunks(frame, index=True, index_label=None, columns=None, date_format=DATE_FORMAT):
+    """
+    CSV text of a dataframe, CHUNK_ROWS rows at a time (the header comes with the first chunk).
+    columns renames the columns in the header. Missing values are empty fields.
+    """
+    yield frame.iloc[:0].to_csv(index=index, index_label=index_label, header=columns or True)
+    for start in range(0, len(frame), CHUNK_ROWS):
+        yield frame.iloc[start:start + CHUNK_ROWS].to_csv(index=index, header=False, date_format=date_format)
+
+
+def csv_response(frame, filename, index=True, index_label=None, columns=None, date_format=DATE_FORMAT):
+    """
+    Download of a dataframe as csv, streamed while it is formatted
+    """
+    response = StreamingHttpResponse(csv_chunks(frame, index=index, index_label=index_label, columns=columns,
+                                                date_format=date_format), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename={0}'.format(filename)
+    return response
+
+
+def gzip_chunks(chunks):
+    """
+    Gzip stream of text chunks
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode('utf-8'))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _naive_utc(index):
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index
+
+
+def _variable_name(column):
+    name = re.sub(r'[^A-Za-z0-9_]+', '_', str(column)).strip('_').lower()
+    return name or 'flow'
+
+
+def parquet_bytes(frame, index=True, index_label=None, columns=None):
+    """
+    Parquet file of a dataframe, with the header of the csv downloads
+    """
+    table = frame.copy(deep=False)
+    if columns:
+        table.columns = columns
+    if index:
+        table.index = frame.index.rename(index_label or frame.index.name or 'datetime')
+    buffer = io.BytesIO()
+    table.to_parquet(buffer, index=index)
+    return buffer.getvalue()
+
+
+def netcdf_bytes(frame, attributes=None):
+    """
+    CF-1.8 timeSeries NetCDF of the columns of a dataframe (one variable per column)
+    """
+    attributes = attributes or {}
+    data_vars = {}
+    for column in frame.columns:
+        variable_attributes = dict(DISCHARGE_ATTRIBUTES)
+        variable_attributes['long_name'] = str(column)
+        data_vars[_variable_name(column)] = (('time',), frame[column].values.astype('float32'), variable_attributes)
+
+    dataset = xr.Dataset(data_vars=data_vars, coords={'time': _naive_utc(frame.index).values})
+    dataset['time'].attrs.update({'standard_name': 'time', 'long_name': 'time', 'axis': 'T'})
+
+    if 'station_id' in attributes:
+        dataset['station_id'] = ((), str(attributes['station_id']), {'cf_role': 'timeseries_id',
+                                                                      'long_name': 'station code'})
+    dataset.attrs.update({'Conventions': 'CF-1.8', 'featureType': 'timeSeries'})
+    dataset.attrs.update({key: str(value) for key, value in attributes.items() if key != 'station_id'})
+
+    encoding = {'time': {'units': 'days since 1970-01-01 00:00:00', 'calendar': 'standard', 'dtype': 'float64'}}
+    encoding.update({name: {'_FillValue': float('nan')} for name in data_vars})
+    return dataset.to_netcdf(encoding=encoding)
+
+
+def export_response(frame, basename, export_format='csv', index=True, index_label=None, columns=None,
+                    attributes=None, date_format=DATE_FORMAT):
+    """
+    Download of a dataframe in one of the FORMATS. attributes are the global attributes of the NetCDF files,
+    date_format the format of the timestamps of the csv files (None for the pandas default).
+    """
+    if export_format not in FORMATS:
+        raise ValueError('Unknown export format {0}.'.format(export_format))
+
+    if export_format == 'netcdf' and not index:
+        raise ValueError('The NetCDF downloads are time series.')
+
+    extension, content_type = FORMATS[export_format]
+    filename = '{0}.{1}'.format(basename, extension)
+
+    if export_format == 'csv':
+        return csv_response(frame, filename, index=index, index_label=index_label, columns=columns,
+                            date_format=date_format)
+
+    if export_format == 'csv.gz':
+        response = StreamingHttpResponse(gzip_chunks(csv_chunks(frame, index=index, index_label=index_label,
+                                                                columns=columns, date_format=date_format)),
+                                         content_type=content_type)
+    elif export_format == 'parquet':
+        response = HttpResponse(parquet_bytes(frame, index=index, index_label=index_label, columns=columns),
+                                content_type=content_type)
+    else:
+        response = HttpResponse(netcdf_bytes(frame, attributes=attributes), content_type=content_type)
+
+    response['Content-Disposition'] = 'attachment; filename={0}'.format(filename)
+    return response
+
@@ -0,0 +1,229 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+
+from . import admission, basin_store, cache, shared_arrays, timing
+from .bias_correction import correct_historical
+from .config import ANA_SERIES_URL, GEOGLOWS_ENDPOINT
+from .fingerprints import (ANA_CONSISTENCY_LEVEL, GEOGLOWS_DATASET, derived_fingerprint, forecast_fingerprint,
+                           get_fingerprint, observed_fingerprint, simulated_fingerprint, tag)
+from .lazy_imports import lazy_import
+from .periods import slice_period
+from .sketches import fdc_mappings, update_station_sketches
+
+bs4 = lazy_import('bs4')
+geoglows = lazy_import('geoglows')
+requests = lazy_import('requests')
+
+
+def _shared(namespace, key, compute, fingerprint=None):
+    """
+    Series mapped from the shared memory of the node, then from the cache, then computed.
+    A derived series is cached under the fingerprint of its inputs.
+    """
+    max_age = cache.cache_settings()['timeouts'].get(namespace)
+    cache_key = key if fingerprint is None else '{0}_{1}'.format(key, fingerprint)
+    return shared_arrays.get_or_publish(namespace, key, lambda: cache.get_with_age(namespace, cache_key, compute),
+                                        max_age=max_age, fingerprint=fingerprint)
+
+
+def _tag_text(tag):
+    """
+    Text of an XML tag, empty if the tag is missing
+    """
+    if tag is None:
+        return ''
+    return tag.text.strip()
+
+
+def parse_ana_discharge(content):
+    """
+    Parse the HidroSerieHistorica response into a daily observed streamflow dataframe.
+    Each record holds one month of data (Vazao01 ... Vazao31).
+    """
+    soup = bs4.BeautifulSoup(content, "xml")
+
+    months = []
+    rows = []
+    for date_tag in soup.find_all('DataHora'):
+        record = date_tag.parent
+        months.append(_tag_text(date_tag)[0:7])
+        rows.append([_tag_text(record.find('Vazao{0:02d}'.format(day))) for day in range(1, 32)])
+
+    if len(months) == 0:
+        return pd.DataFrame(columns=['Observed Streamflow'], index=pd.DatetimeIndex([], name='Datetime'),
+                            dtype=np.float32)
+
+    month_start = pd.Series(pd.to_datetime(months, format='%Y-%m'))
+    values = pd.DataFrame(rows).apply(pd.to_numeric, errors='coerce').values
+
+    # The first record of a month wins, as in the original service reading
+    first = ~month_start.duplicated().values
+    month_start = month_start[first]
+    values = values[first]
+
+    dates = month_start.values[:, None] + np.arange(31) * np.timedelta64(1, 'D')
+    valid = np.arange(1, 32)[None, :] <= month_start.dt.days_in_month.values[:, None]
+
+    observed_df = pd.DataFrame(data=values[valid].astype(np.float32), columns=['Observed Streamflow'],
+                               index=pd.DatetimeIndex(dates[valid], name='Datetime'))
+    observed_df = observed_df.sort_index()
+
+    # Removing Negative Values
+    observed_df[observed_df < 0] = 0
+
+    return observed_df
+
+
+def get_observed_data(station_code, start=None, end=None):
+    """
+    Get the daily observed discharge of an ANA station (the whole record, or its period from start to end)
+    """
+    return slice_period(_shared('observed', station_code, lambda: download_observed_data(station_code)), start, end)
+
+
+def download_observed_data(station_code):
+    now = dt.datetime.now()
+    params = {
+        'codEstacao': station_code,
+        'DataInicio': '01/01/1900',
+        'DataFim': '{0}/{1}/{2}'.format(now.day, now.month, now.year),
+        'tipoDados': 3,
+        'nivelConsistencia': ANA_CONSISTENCY_LEVEL,
+    }
+
+    with admission.admit('ana'), timing.stage('ana', upstream='ana'):
+        response = requests.get(ANA_SERIES_URL, params=params, verify=False)
+
+    with timing.stage('parse', upstream='ana'):
+        observed_df = parse_ana_discharge(response.content)
+
+    return tag(observed_df, observed_fingerprint(observed_df))
+
+
+def get_simulated_data(comid, start=None, end=None):
+    """
+    Get the ERA5 historical simulation of a GEOGloWS reach (the whole record, or its period from start to end)
+    """
+    return slice_period(_shared('simulated', comid, lambda: download_simulated_data(comid)), start, end)
+
+
+def download_simulated_data(comid):
+    with admission.admit('geoglows'), timing.stage('geoglows', upstream='geoglows'):
+        simulated_df = geoglows.streamflow.historic_simulation(comid, forcing=GEOGLOWS_DATASET, return_format='csv',
+                                                               endpoint=GEOGLOWS_ENDPOINT)
+
+    # Removing Negative Values
+    simulated_df[simulated_df < 0] = 0
+
+    simulated_df.index = pd.to_datetime(simulated_df.index.strftime("%Y-%m-%d"))
+
+    simulated_df = pd.DataFrame(data=simulated_df.iloc[:, 0].values, index=simulated_df.index,
+                                columns=['Simulated Streamflow'])
+
+    return tag(simulated_df, simulated_fingerprint(simulated_df))
+
+
+def get_stored_series(kind, key, start=None, end=None):
+    """
+    Observed (station) or simulated (reach) series read from the memory-mapped basin store,
+    fetched as usual if the store is not built or does not hold it
+    """
+    try:
+        series_df = basin_store.read_series(kind, key)
+    except Exception as e:
+        print(str(e))
+        series_df = None
+
+    if series_df is None:
+        return get_observed_data(key, start, end) if kind == 'observed' else get_simulated_data(key, start, end)
+
+    return slice_period(series_df, start, end)
+
+
+def get_fdc_mappings(station_code, comid, simulated_df, observed_df):
+    """
+    Monthly flow duration curves of a station, updated with the values added since the last request
+    """
+    with timing.stage('bias_correction'):
+        sketches = update_station_sketches(station_code, comid, simulated_df, observed_df)
+        return fdc_mappings(sketches)
+
+
+def corrected_fingerprint(simulated_df, observed_df):
+    """
+    Fingerprint of the corrected simulation, from the fingerprints of the simulated and observed series
+    """
+    return derived_fingerprint('corrected', get_fingerprint('simulated', simulated_df),
+                               get_fingerprint('observed', observed_df))
+
+
+def get_corrected_data(simulated_df, observed_df, station_code, comid, start=None, end=None):
+    """
+    Correct the bias in the simulation using the observed data (whole records).
+    For a period, the shared corrected series is sliced if it is there, otherwise only the period is corrected.
+    """
+    key = '{0}_{1}'.format(station_code, comid)
+    fingerprint = corrected_fingerprint(simulated_df, observed_df)
+
+    if start is None and end is None:
+        return _shared('corrected', key, lambda: tag(timed_correction(
+            simulated_df, get_fdc_mappings(station_code, comid, simulated_df, observed_df)), fingerprint),
+            fingerprint=fingerprint)
+
+    corrected_df = shared_arrays.read_series('corrected', key, fingerprint=fingerprint)
+    if corrected_df is not None:
+        return slice_period(corrected_df, start, end)
+
+    # The curves are built from the whole records, only their application is limited to the period
+    return timed_correction(slice_period(simulated_df, start, end),
+                            get_fdc_mappings(station_code, comid, simulated_df, observed_df))
+
+
+timed_correction = timing.timed_stage('bias_correction')(correct_historical)
+
+
+def get_forecast_stats(comid):
+    """
+    Get the forecast statistics of a GEOGloWS reach
+    """
+    return cache.get_or_set('forecast', 'stats-{0}'.format(comid), lambda: download_forecast_stats(comid))
+
+
+def download_forecast_stats(comid):
+    with admission.admit('geoglows'), timing.stage('geoglows', upstream='geoglows'):
+        forecast_df = geoglows.streamflow.forecast_stats(comid, return_format='csv', endpoint=GEOGLOWS_ENDPOINT)
+
+    # Removing Negative Values
+    forecast_df[forecast_df < 0] = 0
+
+    return tag(forecast_df, forecast_fingerprint(forecast_df.index))
+
+
+def get_forecast_ensembles(comid):
+    """
+    Get the ensemble forecast of a GEOGloWS reach as a float32 (member x time) array.
+    Returns the forecast times, the 51 ensemble members and the high resolution member (52).
+    """
+    return cache.get_or_set('forecast', 'ensembles-{0}'.format(comid), lambda: download_forecast_ensembles(comid))
+
+
+def download_forecast_ensembles(comid):
+    with admission.admit('geoglows'), timing.stage('geoglows', upstream='geoglows'):
+        ensembles_df = geoglows.streamflow.forecast_ensembles(comid, return_format='csv', endpoint=GEOGLOWS_ENDPOINT)
+
+    values = ensembles_df.values.T.astype(np.float32)
+
+    # Removing Negative Values
+    values[values < 0] = 0
+
+    high_res = [i for i, column in enumerate(ensembles_df.columns) if column.startswith('ensemble_52')]
+    members = [i for i in range(len(ensembles_df.columns)) if i not in high_res]
+
+    if high_res:
+        high_res_values = values[high_res[0]]
+    else:
+        high_res_values = np.full(values.shape[1], np.nan, dtype=np.float32)
+
+    return ensembles_df.index, np.ascontiguousarray(values[members]), high_res_values
@@ -0,0 +1,121 @@
+"""
+Content fingerprints of the fetched sources, and the keys of the derived artefacts built from them.
+
+Every fetched series carries the fingerprint of its content in its attrs (kept by the cache and the shared memory
+segments):
+
+    observed   hash of the ANA series of a station and its consistency level
+    simulated  GEOGloWS dataset (ERA5 forcing) and hash of the simulation of a reach
+    forecast   issue time of the forecast of a reach
+
+A fingerprint only depends on the content, so the same series read from the cache, the shared memory or the basin
+store has the same fingerprint. The derived artefacts (corrected series, flow duration sketches) are keyed on the
+fingerprints of their inputs: they can be cached for long and are rebuilt as soon as ANA or GEOGloWS revise the data.
+"""
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Hex digits of the fingerprints (64 bits, also stored in the header of the shared memory segments)
+FINGERPRINT_SIZE = 16
+
+# ANA consistency level of the observed series (1 raw, 2 consisted) and GEOGloWS historical dataset
+ANA_CONSISTENCY_LEVEL = 1
+GEOGLOWS_DATASET = 'era_5'
+
+
+def _digest(*parts):
+    sha = hashlib.sha1()
+    for part in parts:
+        sha.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        sha.update(b'\x00')
+    return sha.hexdigest()[:FINGERPRINT_SIZE]
+
+
+def values_hash(days, values):
+    """
+    Hash of the epoch days and float32 values with data of a daily series
+    """
+    values = np.asarray(values, dtype=np.float32)
+    valid = np.isfinite(values)
+    days = np.asarray(days, dtype=np.int64)
+    return _digest(np.ascontiguousarray(days[valid]).tobytes(), np.ascontiguousarray(values[valid]).tobytes())
+
+
+def series_hash(series_df):
+    """
+    Hash of the first column of a daily series
+    """
+    return values_hash(series_df.index.values.astype('datetime64[D]').astype(np.int64), series_df.iloc[:, 0].values)
+
+
+def observed_fingerprint(series_df, level=ANA_CONSISTENCY_LEVEL):
+    return _digest('ana', level, series_hash(series_df))
+
+
+def simulated_fingerprint(series_df, dataset=GEOGLOWS_DATASET):
+    return _digest('geoglows', dataset, series_hash(series_df))
+
+
+def forecast_issue_time(index):
+    """
+    Issue time of a forecast (its first valid time, UTC)
+    """
+    issue_time = pd.Timestamp(index[0])
+    if issue_time.tz is not None:
+        issue_time = issue_time.tz_convert('UTC').tz_localize(None)
+    return issue_time
+
+
+def forecast_fingerprint(index):
+    return _digest('forecast', forecast_issue_time(index).isoformat())
+
+
+SOURCE_FINGERPRINTS = {
+    'observed': observed_fingerprint,
+    'simulated': simulated_fingerprint,
+    'forecast': lambda forecast_df: forecast_fingerprint(forecast_df.index),
+}
+
+
+def tag(series_df, fingerprint):
+    """
+    Attach a fingerprint to a series
+    """
+    series_df.attrs['fingerprint'] = fingerprint
+    return series_df
+
+
+def get_fingerprint(kind, series_df):
+    """
+    Fingerprint carried by a series, computed from its content if it has none (e.g. a series of the basin store)
+    """
+    fingerprint = series_df.attrs.get('fingerprint')
+    if fingerprint is None:
+        fingerprint = SOURCE_FINGERPRINTS[kind](series_df)
+        tag(series_df, fingerprint)
+    return fingerprint
+
+
+def derived_fingerprint(artefact, *fingerprints):
+    """
+    Fingerprint of an artefact derived from inputs with the given fingerprints
+    """
+    return _digest(artefact, *fingerprints)
+
+
+def to_int64(fingerprint):
+    """
+    A fingerprint as a signed 64 bit integer
+    """
+    return int(np.array([int(fingerprint, 16)], dtype=np.uint64).view(np.int64)[0])
+
+
+def from_int64(value):
+    """
+    Fingerprint of a signed 64 bit integer, None for 0
+    """
+    if value == 0:
+        return None
+    return '{0:0{1}x}'.format(int(np.array([value], dtype=np.int64).view(np.uint64)[0]), FINGERPRINT_SIZE)
@@ -0,0 +1,258 @@
+"""
+Append-only archive of the GEOGloWS forecasts issued for each reach.
+
+Every column is a raw binary file under workspaces/app_workspace/forecast_archive/<comid>/, so archiving
+a new forecast only appends its rows at the end of each column file. The forecasts are only archived by this
+command (not by the requests), under an exclusive lock of the reach. Run daily to accumulate forecasts:
+
+    python -m tethysapp.hydroviewer_madeira_river.forecast_archive
+"""
+import argparse
+import fcntl
+import os
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from . import fetchers
+from .config import APP_WORKSPACE
+from .stations import get_stations
+
+ARCHIVE_DIR = os.path.join(APP_WORKSPACE, 'forecast_archive')
+
+SECONDS_PER_DAY = 86400
+
+# Archive column -> forecast_stats column
+FLOW_COLUMNS = {
+    'flow_max': 'flow_max_m^3/s',
+    'flow_75': 'flow_75%_m^3/s',
+    'flow_avg': 'flow_avg_m^3/s',
+    'flow_25': 'flow_25%_m^3/s',
+    'flow_min': 'flow_min_m^3/s',
+    'high_res': 'high_res_m^3/s',
+}
+
+COLUMN_DTYPES = {'issue_time': np.int64, 'valid_time': np.int64}
+COLUMN_DTYPES.update({column: np.float32 for column in FLOW_COLUMNS})
+
+
+def _reach_dir(comid):
+    return os.path.join(ARCHIVE_DIR, str(int(comid)))
+
+
+def _column_file(comid, column):
+    return os.path.join(_reach_dir(comid), '{0}.bin'.format(column))
+
+
+@contextmanager
+def _reach_lock(comid):
+    """
+    Exclusive lock of the archive of a reach, released by the system if the process dies
+    """
+    os.makedirs(_reach_dir(comid), exist_ok=True)
+    fd = os.open(os.path.join(_reach_dir(comid), 'archive.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def _epoch_seconds(index):
+    """
+    Seconds since epoch (UTC) of a datetime index
+    """
+    index = pd.DatetimeIndex(index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.values.astype('datetime64[s]').astype(np.int64)
+
+
+def last_issue_time(comid):
+    """
+    Issue time (epoch seconds) of the last archived forecast, None if the reach has no archive
+    """
+    path = _column_file(comid, 'issue_time')
+    if not os.path.exists(path) or os.path.getsize(path) < 8:
+        return None
+
+    with open(path, 'rb') as f:
+        f.seek(-8, os.SEEK_END)
+        return int(np.frombuffer(f.read(8), dtype=np.int64)[0])
+
+
+def _truncate_incomplete_rows(comid):
+    """
+    Drop the rows left in some columns by an interrupted append
+    """
+    issue_file = _column_file(comid, 'issue_time')
+    rows = os.path.getsize(issue_file) // 8 if os.path.exists(issue_file) else 0
+
+    for column, dtype in COLUMN_DTYPES.items():
+        path = _column_file(comid, column)
+        size = rows * np.dtype(dtype).itemsize
+        if os.path.exists(path) and os.path.getsize(path) > size:
+            os.truncate(path, size)
+
+
+def append_forecast(comid, forecast_df):
+    """
+    Append a forecast_stats dataframe to the archive of a reach.
+    Only the new rows are written; a forecast that is already archived is skipped.
+    """
+    valid_time = _epoch_seconds(forecast_df.index)
+    issue_time = int(valid_time[0])
+
+    columns = {
+        'issue_time': np.full(len(valid_time), issue_time, dtype=np.int64),
+        'valid_time': valid_time,
+    }
+    for column, source in FLOW_COLUMNS.items():
+        if source in forecast_df.columns:
+            columns[column] = forecast_df[source].values.astype(np.float32)
+        else:
+            columns[column] = np.full(len(valid_time), np.nan, dtype=np.float32)
+
+    # The check, the truncation and the append are done under the lock, so two writers cannot append the same
+    # forecast twice or truncate the columns the other one is appending
+    with _reach_lock(comid):
+        last_issue = last_issue_time(comid)
+        if last_issue is not None and issue_time <= last_issue:
+            return 0
+
+        _truncate_incomplete_rows(comid)
+
+        # issue_time is written last: it marks the rows as complete for last_issue_time and read_archive
+        for column in list(FLOW_COLUMNS) + ['valid_time', 'issue_time']:
+            with open(_column_file(comid, column), 'ab') as f:
+                columns[column].tofile(f)
+
+    return len(valid_time)
+
+
+def read_archive(comid):
+    """
+    Read the archive of a reach as a dictionary of column arrays
+    """
+    columns = {}
+    for column, dtype in COLUMN_DTYPES.items():
+        path = _column_file(comid, column)
+        columns[column] = np.fromfile(path, dtype=dtype) if os.path.exists(path) else np.empty(0, dtype=dtype)
+
+    # An interrupted append can leave some columns longer than issue_time
+    rows = min(len(values) for values in columns.values())
+    return {column: values[:rows] for column, values in columns.items()}
+
+
+def _daily_forecasts(archive):
+    """
+    Average the archived forecasts to daily values per issue and valid day
+    """
+    issue_day = archive['issue_time'] // SECONDS_PER_DAY
+    valid_day = archive['valid_time'] // SECONDS_PER_DAY
+
+    keys, inverse = np.unique(np.stack([issue_day, valid_day], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    daily = {'issue_day': keys[:, 0], 'valid_day': keys[:, 1]}
+    for column in ('flow_25', 'flow_avg', 'flow_75', 'high_res'):
+        values = archive[column].astype(np.float64)
+        finite = np.isfinite(values)
+        sums = np.bincount(inverse, weights=np.where(finite, values, 0), minlength=len(keys))
+        counts = np.bincount(inverse, weights=finite, minlength=len(keys))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            daily[column] = sums / counts
+
+    return daily
+
+
+def _observed_lookup(observed_df, days):
+    """
+    Observed values for an array of epoch days, NaN where there is no observation
+    """
+    observed = observed_df.iloc[:, 0].dropna()
+    values = np.full(len(days), np.nan)
+    if len(observed.index) == 0:
+        return values
+
+    obs_days = _epoch_seconds(observed.index) // SECONDS_PER_DAY
+    start = obs_days.min()
+    dense = np.full(obs_days.max() - start + 1, np.nan)
+    dense[obs_days - start] = observed.values
+
+    offsets = days - start
+    inside = (offsets >= 0) & (offsets < len(dense))
+    values[inside] = dense[offsets[inside]]
+    return values
+
+
+def _pinball(forecast, observed, tau):
+    error = observed - forecast
+    return np.maximum(tau * error, (tau - 1) * error)
+
+
+def verify_forecasts(comid, observed_df):
+    """
+    Lead-time resolved skill of the archived forecasts against the observations.
+    The CRPS is approximated by the quantile score of the archived 25%, average (median proxy) and 75% flows.
+    """
+    archive = read_archive(comid)
+    if len(archive['issue_time']) == 0:
+        return pd.DataFrame(columns=['Forecasts', 'Bias', 'MAE', 'CRPS'])
+
+    daily = _daily_forecasts(archive)
+    observed = _observed_lookup(observed_df, daily['valid_day'])
+
+    lead = daily['valid_day'] - daily['issue_day']
+    mask = (lead >= 1) & np.isfinite(observed)
+    for column in ('flow_25', 'flow_avg', 'flow_75'):
+        mask &= np.isfinite(daily[column])
+
+    lead = lead[mask]
+    observed = observed[mask]
+    error = daily['flow_avg'][mask] - observed
+    crps = 2 * (_pinball(daily['flow_25'][mask], observed, 0.25) +
+                _pinball(daily['flow_avg'][mask], observed, 0.5) +
+                _pinball(daily['flow_75'][mask], observed, 0.75)) / 3
+
+    if len(lead) == 0:
+        return pd.DataFrame(columns=['Forecasts', 'Bias', 'MAE', 'CRPS'])
+
+    leads = np.arange(1, lead.max() + 1)
+    counts = np.bincount(lead, minlength=leads[-1] + 1)[1:]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        skill = pd.DataFrame({
+            'Forecasts': counts,
+            'Bias': np.bincount(lead, weights=error, minlength=leads[-1] + 1)[1:] / counts,
+            'MAE': np.bincount(lead, weights=np.abs(error), minlength=leads[-1] + 1)[1:] / counts,
+            'CRPS': np.bincount(lead, weights=crps, minlength=leads[-1] + 1)[1:] / counts,
+        }, index=pd.Index(leads, name='Lead Time (days)'))
+
+    return skill[skill['Forecasts'] > 0]
+
+
+def archive_stations(stations=None):
+    """
+    Archive the current forecast of every station reach
+    """
+    if stations is None:
+        stations = get_stations()
+
+    archived = 0
+    for station in stations:
+        try:
+            forecast_df = fetchers.get_forecast_stats(station['comid'])
+            archived += append_forecast(station['comid'], forecast_df)
+        except Exception as e:
+            print('{0}: {1}'.format(station['comid'], str(e)))
+
+    return archived
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Archive the current GEOGloWS forecasts of the Madeira stations.')
+    parser.parse_args()
+
+    print('Archived {0} forecast rows.'.format(archive_stations()))
@@ -0,0 +1,200 @@
+"""
+Background jobs for the controllers that can run longer than the proxy timeouts.
+
+A controller decorated with background runs as a job when the request has async=true: the request is put on a
+local queue served by JOB_THREADS threads of the worker, and the client gets the id of the job right away. The
+job status and the response of the controller are kept in the jobs cache namespace, so any worker can answer the
+polls. This needs a shared cache backend (filesystem, redis or a shared django cache): with the per process memory
+backend a poll reaching another worker would not find the job, so the requests run synchronously instead:
+
+    get-job-result/?job=<job_id>&wait=<seconds>
+
+returns the response of the controller once the job is done, or its status (queued, running, failed) after
+waiting up to wait seconds for it to finish. A controller that answers with an error ({'error': ...} or an error
+status) fails its job, and a job that has not reported for JOB_TIMEOUT seconds is reported as failed. The same
+request submitted again while its job is queued, running or done gets the same job; a failed job is run again.
+"""
+import functools
+import hashlib
+import json
+import queue
+import threading
+import time
+
+from django.http import HttpResponse, JsonResponse
+
+from . import admission, cache
+
+JOB_THREADS = 2
+
+# A job that has not reported for this long is considered lost (e.g. its worker was restarted) and is resubmitted
+JOB_TIMEOUT = 15 * 60
+
+# Longest long-poll of get-job-result, and the polling interval of the cache while waiting
+MAX_WAIT = 30
+POLL_INTERVAL = 0.25
+
+# Query parameters that do not change the response of a controller
+IGNORED_PARAMETERS = ('async', 'profile', '_')
+
+# Response headers kept with the result of a job
+KEPT_HEADERS = ('Content-Type', 'Age', 'Warning')
+
+_queue = queue.Queue()
+_threads = []
+_threads_lock = threading.Lock()
+
+# Jobs queued or running in this process, with the event set when they finish
+_pending = {}
+
+
+def job_id(name, parameters):
+    """
+    Id of the job of a controller and its query parameters
+    """
+    items = sorted((key, value) for key, value in parameters if key not in IGNORED_PARAMETERS)
+    return hashlib.sha1(repr((name, items)).encode('utf-8')).hexdigest()
+
+
+def _store(job, entry):
+    entry['updated'] = time.time()
+    timeout = cache.cache_settings()['timeouts'].get('jobs', 3600)
+    cache.get_cache('jobs').set(job, entry, timeout=timeout)
+
+
+def get_job(job):
+    """
+    Status of a job: status (queued, running, done, failed), updated and, once done, the response
+    """
+    try:
+        return cache.get_cache('jobs').get(job)
+    except Exception as e:
+        print('Cache unavailable (jobs): {0}'.format(str(e)))
+        return None
+
+
+def _error_message(response):
+    """
+    Error reported by a controller response (error status or JSON with an error), None for a result
+    """
+    if response.status_code >= 400:
+        return 'HTTP {0}'.format(response.status_code)
+    if not response.get('Content-Type', '').startswith('application/json'):
+        return None
+    try:
+        content = json.loads(response.content)
+    except ValueError:
+        return None
+    return content.get('error') if isinstance(content, dict) else None
+
+
+def _run(job, controller, request):
+    _store(job, {'status': 'running'})
+    try:
+        # A user is waiting for the job, its upstream requests go ahead of the background work
+        with admission.priority(admission.INTERACTIVE):
+            response = controller(request)
+        error = _error_message(response)
+        if error is not None:
+            _store(job, {'status': 'failed', 'error': error})
+            return
+        _store(job, {
+            'status': 'done',
+            'status_code': response.status_code,
+            'headers': {header: response[header] for header in KEPT_HEADERS if response.has_header(header)},
+            'content': response.content,
+        })
+    except Exception as e:
+        print('Job {0} failed: {1}'.format(job, str(e)))
+        _store(job, {'status': 'failed', 'error': str(e)})
+
+
+def _worker():
+    from django.db import close_old_connections
+
+    while True:
+        job, controller, request = _queue.get()
+        try:
+            _run(job, controller, request)
+        finally:
+            close_old_connections()
+            _pending.pop(job).set()
+            _queue.task_done()
+
+
+def _start_threads():
+    with _threads_lock:
+        while len(_threads) < JOB_THREADS:
+            thread = threading.Thread(target=_worker, daemon=True, name='hydroviewer-job-{0}'.format(len(_threads)))
+            thread.start()
+            _threads.append(thread)
+
+
+def submit(name, controller, request):
+    """
+    Queue a controller request as a job unless the same job is already queued, running or done; returns its id
+    and status
+    """
+    job = job_id(name, request.GET.lists())
+    entry = get_job(job)
+
+    if entry is not None and (entry['status'] == 'done' or
+                              (entry['status'] in ('queued', 'running') and
+                               time.time() - entry['updated'] < JOB_TIMEOUT)):
+        return job, entry
+
+    if job in _pending:
+        return job, {'status': 'queued'}
+
+    _start_threads()
+    entry = {'status': 'queued'}
+    _store(job, entry)
+    _pending[job] = threading.Event()
+    _queue.put((job, controller, request))
+    return job, entry
+
+
+def wait(job, timeout):
+    """
+    Status of a job after waiting up to timeout seconds for it to finish
+    """
+    deadline = time.time() + min(max(timeout, 0), MAX_WAIT)
+    while True:
+        entry = get_job(job)
+        if entry is not None and entry['status'] in ('queued', 'running') and job not in _pending and (
+                time.time() - entry['updated'] >= JOB_TIMEOUT):
+            return {'status': 'failed', 'error': 'the job was lost', 'updated': entry['updated']}
+        if entry is None or entry['status'] in ('done', 'failed') or time.time() >= deadline:
+            return entry
+        # Jobs of this process signal when they finish, the others are polled in the cache
+        event = _pending.get(job)
+        if event is not None:
+            event.wait(max(deadline - time.time(), 0))
+        else:
+            time.sleep(POLL_INTERVAL)
+
+
+def job_response(entry):
+    """
+    The response of a finished job
+    """
+    response = HttpResponse(entry['content'], status=entry['status_code'])
+    for header, value in entry['headers'].items():
+        response[header] = value
+    return response
+
+
+def background(controller):
+    """
+    Decorator of the controllers: runs the request as a background job when it has async=true
+    """
+    name = '{0}.{1}'.format(controller.__module__, controller.__name__)
+
+    @functools.wraps(controller)
+    def wrapper(request, *args, **kwargs):
+        if request.GET.get('async') != 'true' or not cache.is_shared('jobs'):
+            return controller(request, *args, **kwargs)
+
+        job, entry = submit(name, controller, request)
+        return JsonResponse({'job': job, 'status': entry['status']}, status=202)
+    return wrapper
@@ -0,0 +1,90 @@
+"""
+Modules imported on first use, so the workers do not load the scientific stack before it is needed.
+
+The import cost of each heavy module (measured in a fresh interpreter with -X importtime) is reported by:
+
+    python -m tethysapp.hydroviewer_madeira_river.lazy_imports
+"""
+import argparse
+import importlib
+import subprocess
+import sys
+import types
+
+HEAVY_MODULES = [
+    'numpy',
+    'pandas',
+    'requests',
+    'bs4',
+    'scipy.stats',
+    'scipy.integrate',
+    'plotly.graph_objs',
+    'HydroErr.HydroErr',
+    'hydrostats',
+    'hydrostats.data',
+    'geoglows',
+    'duckdb',
+    'xarray',
+    'prometheus_client',
+]
+
+
+class LazyModule(types.ModuleType):
+    """
+    Placeholder of a module that imports it on the first attribute access
+    """
+
+    def __getattr__(self, attribute):
+        module = importlib.import_module(self.__name__)
+        # Later accesses are plain attribute lookups
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attribute)
+
+
+def lazy_import(name):
+    """
+    The module if it is already imported, a LazyModule otherwise
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def import_time(name):
+    """
+    Cumulative import time of a module (seconds) in a fresh interpreter
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import {0}'.format(name)],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        raise ImportError(result.stderr.strip().splitlines()[-1])
+
+    # Lines are "import time: self [us] | cumulative | imported package", the module itself comes last
+    for line in reversed(result.stderr.splitlines()):
+        fields = [field.strip() for field in line.split('|')]
+        if len(fields) == 3 and fields[2].strip() == name:
+            return int(fields[1]) / 1e6
+    return float('nan')
+
+
+def benchmark(modules=None):
+    """
+    Import time of each module, None for the modules that are not installed
+    """
+    times = {}
+    for name in modules or HEAVY_MODULES:
+        try:
+            times[name] = import_time(name)
+        except ImportError as e:
+            print('{0}: {1}'.format(name, str(e)))
+            times[name] = None
+    return times
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report the import time of the heavy modules of the app.')
+    parser.add_argument('modules', nargs='*', help='Modules to measure (default: all the heavy modules).')
+    args = parser.parse_args()
+
+    for module_name, seconds in sorted(benchmark(args.modules).items(), key=lambda item: -(item[1] or 0)):
+        print('{0:<20} {1}'.format(module_name, 'not installed' if seconds is None else '{0:.3f} s'.format(seconds)))
@@ -0,0 +1,176 @@
+"""
+Basin-wide validation leaderboard.
+
+Reads the default metrics artefact of every station of the Madeira layer (rebuilt only for the stations whose
+series changed, see artefacts) on a process pool and stores the results in the app workspace:
+
+    python -m tethysapp.hydroviewer_madeira_river.leaderboard --processes 8
+"""
+import argparse
+import datetime as dt
+import json
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .artefacts import StationArtefacts
+from .config import APP_WORKSPACE, DEFAULT_METRICS
+from .stations import get_stations
+
+LEADERBOARD_FILE = os.path.join(APP_WORKSPACE, 'validation_leaderboard.json')
+
+# Colour classes for efficiency scores (NSE / KGE), best first
+METRIC_COLORS = [
+    (0.75, '#1a9641'),
+    (0.65, '#a6d96a'),
+    (0.5, '#fdae61'),
+    (-math.inf, '#d7191c'),
+]
+NO_DATA_COLOR = '#969696'
+
+
+def _table_values(table):
+    """
+    Metric values of a hydrostats table as a JSON friendly dictionary
+    """
+    values = {}
+    for metric, value in table.iloc[0].items():
+        value = float(value)
+        values[metric] = value if math.isfinite(value) else None
+    return values
+
+
+def evaluate_station(station):
+    """
+    Compute the default metrics of the original and corrected simulation of a station
+    """
+    row = dict(station)
+    row.update({'overlap_days': 0, 'original': {}, 'corrected': {}, 'error': None})
+
+    try:
+        # Only the stations whose series changed since the last run are evaluated again
+        artefacts = StationArtefacts(station)
+        metrics_df = artefacts.get('metrics')
+
+        row['overlap_days'] = len(artefacts.get('merged'))
+        row['original'] = _table_values(metrics_df.loc[['original']])
+        row['corrected'] = _table_values(metrics_df.loc[['corrected']])
+
+    except Exception as e:
+        row['error'] = str(e)
+
+    return row
+
+
+def build_leaderboard(processes=None, stations=None):
+    """
+    Evaluate all the stations in parallel and store the leaderboard in the app workspace
+    """
+    if stations is None:
+        stations = get_stations()
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        rows = list(executor.map(evaluate_station, stations))
+
+    leaderboard = {
+        'generated': dt.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'metrics': DEFAULT_METRICS,
+        'stations': rows,
+    }
+
+    # Write to a temporary file first so readers never see a partial leaderboard
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(LEADERBOARD_FILE), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(leaderboard, f)
+    os.replace(tmp_file, LEADERBOARD_FILE)
+
+    return leaderboard
+
+
+def load_leaderboard():
+    """
+    Read the precomputed leaderboard, None if it has not been computed yet
+    """
+    if not os.path.exists(LEADERBOARD_FILE):
+        return None
+
+    with open(LEADERBOARD_FILE) as f:
+        return json.load(f)
+
+
+def leaderboard_table(leaderboard, sort_by='KGE (2012)', ascending=True):
+    """
+    Flatten the leaderboard into a dataframe with one row per station, worst stations first by default
+    """
+    records = []
+    for row in leaderboard['stations']:
+        record = {
+            'Station Code': row['station_code'],
+            'Station Name': row['station_name'],
+            'COMID': row['comid'],
+            'River': row['river'],
+            'Overlap Days': row['overlap_days'],
+        }
+        for metric in leaderboard['metrics']:
+            record[metric] = row['original'].get(metric)
+            record['{0} (Corrected)'.format(metric)] = row['corrected'].get(metric)
+        records.append(record)
+
+    table = pd.DataFrame(records)
+
+    if sort_by in table.columns:
+        table = table.sort_values(by=sort_by, ascending=ascending, na_position='last')
+
+    return table
+
+
+def metric_color(value):
+    """
+    Colour class of an efficiency score
+    """
+    if value is None:
+        return NO_DATA_COLOR
+    for lower_bound, color in METRIC_COLORS:
+        if value >= lower_bound:
+            return color
+
+
+def leaderboard_geojson(leaderboard, metric='KGE (2012)', corrected=False):
+    """
+    GeoJSON layer of the stations coloured by an efficiency score
+    """
+    scores = 'corrected' if corrected else 'original'
+    features = []
+
+    for row in leaderboard['stations']:
+        value = row[scores].get(metric)
+        properties = {
+            'station_code': row['station_code'],
+            'station_name': row['station_name'],
+            'comid': row['comid'],
+            'river': row['river'],
+            'metric': metric,
+            'value': value,
+            'color': metric_color(value),
+            'error': row['error'],
+        }
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [row['lon'], row['lat']]},
+            'properties': properties,
+        })
+
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compute the basin-wide validation leaderboard.')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes.')
+    args = parser.parse_args()
+
+    result = build_leaderboard(processes=args.processes)
+    failed = [row['station_code'] for row in result['stations'] if row['error']]
+    print('Evaluated {0} stations ({1} failed).'.format(len(result['stations']), len(failed)))
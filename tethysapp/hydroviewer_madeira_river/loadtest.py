@@ -0,0 +1,435 @@
+"""
+Load test of the app: virtual users clicking stations on the map.
+
+Every click replays the requests home.js sends when a station is selected (CLICK_REQUESTS), at most
+BROWSER_CONNECTIONS at a time like a browser, and follows the background jobs until their results are ready. The
+app is wired to local stand-ins of ANA and GEOGloWS that answer with synthetic series after a random latency, so
+the test measures the app and not the upstream services:
+
+    python -m tethysapp.hydroviewer_madeira_river.loadtest upstreams --port 8900 --ana-latency 1.5
+
+    HYDROVIEWER_ANA_URL=http://127.0.0.1:8900/ana/HidroSerieHistorica \\
+    HYDROVIEWER_GEOGLOWS_URL=http://127.0.0.1:8900/geoglows/ tethys manage start
+
+    python -m tethysapp.hydroviewer_madeira_river.loadtest run \\
+        --app http://127.0.0.1:8000/apps/hydroviewer-madeira-river/ --users 1 10 25 50 --duration 120 --workers uwsgi
+
+For each number of users it reports the throughput, the latency percentiles of every endpoint and of whole clicks,
+the error rates and the memory (RSS) of the app workers.
+"""
+import argparse
+import datetime as dt
+import json
+import math
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from .config import DEFAULT_METRICS
+from .lazy_imports import lazy_import
+
+requests = lazy_import('requests')
+
+# Requests of a station click (public/js/home.js), with their parameters besides the station ones
+CLICK_REQUESTS = [
+    ('get-discharge-data', {}),
+    ('get-simulated-data', {}),
+    ('get-simulated-bc-data', {}),
+    ('get-hydrographs', {}),
+    ('get-dailyAverages', {}),
+    ('get-monthlyAverages', {}),
+    ('get-scatterPlot', {}),
+    ('get-scatterPlotLogScale', {}),
+    ('get-volumeAnalysis', {}),
+    ('volume-table-ajax/', {}),
+    ('get-time-series/', {}),
+    ('get-time-series-bc/', {'async': 'true'}),
+    ('make-table-ajax', {'async': 'true', 'metrics[]': DEFAULT_METRICS, 'mase_m': 1, 'dmod_j': 1, 'nse_mod_j': 1,
+                         'h6_k_MHE': 1, 'h6_k_AHE': 1, 'h6_k_RMSHE': 1, 'lm_x_bar': 1, 'd1_p_x_bar': 1}),
+]
+
+# Parallel requests of a browser to the same host
+BROWSER_CONNECTIONS = 6
+
+JOB_POLL_WAIT = 25
+REQUEST_TIMEOUT = 300
+PERCENTILES = (50, 90, 95, 99)
+
+# Synthetic records of the stand-ins
+ANA_FIRST_YEAR = 1970
+SIMULATION_FIRST_DATE = dt.date(1979, 1, 1)
+FORECAST_DAYS = 15
+ENSEMBLE_MEMBERS = 52
+
+
+def _latency(median):
+    """
+    Lognormal latency around a median, as observed for the upstream services
+    """
+    if median <= 0:
+        return 0
+    return random.lognormvariate(math.log(median), 0.5)
+
+
+def _seasonal_flow(seed, day_of_year, rng):
+    mean = 2000 + seed % 20000
+    return max(mean * (1 + 0.8 * math.cos(2 * math.pi * (day_of_year - 75) / 365.25)) * rng.lognormvariate(0, 0.2),
+               0)
+
+
+def ana_series_xml(station_code):
+    """
+    HidroSerieHistorica response of a station: one record per month with the daily discharge (Vazao01 ... Vazao31)
+    """
+    seed = int(''.join(c for c in str(station_code) if c.isdigit()) or 0)
+    rng = random.Random(seed)
+    today = dt.date.today()
+    records = []
+    for year in range(ANA_FIRST_YEAR, today.year + 1):
+        for month in range(1, 13):
+            if (year, month) > (today.year, today.month):
+                break
+            values = []
+            for day in range(1, 32):
+                try:
+                    date = dt.date(year, month, day)
+                except ValueError:
+                    values.append('<Vazao{0:02d}/>'.format(day))
+                    continue
+                values.append('<Vazao{0:02d}>{1:.2f}</Vazao{0:02d}>'.format(
+                    day, _seasonal_flow(seed, date.timetuple().tm_yday, rng)))
+            records.append('<SerieHistorica><EstacaoCodigo>{0}</EstacaoCodigo><NivelConsistencia>1'
+                           '</NivelConsistencia><DataHora>{1}-{2:02d}-01 00:00:00</DataHora>{3}</SerieHistorica>'
+                           .format(station_code, year, month, ''.join(values)))
+    return ('<?xml version="1.0" encoding="utf-8"?><DataTable><DocumentElement>{0}</DocumentElement></DataTable>'
+            .format(''.join(records)))
+
+
+def geoglows_csv(method, reach_id):
+    """
+    HistoricSimulation, ForecastStats or ForecastEnsembles csv response of a reach
+    """
+    seed = int(reach_id) if str(reach_id).isdigit() else 0
+    rng = random.Random(seed)
+
+    if method == 'HistoricSimulation':
+        lines = ['datetime,streamflow_m^3/s']
+        date = SIMULATION_FIRST_DATE
+        while date < dt.date.today():
+            lines.append('{0},{1:.3f}'.format(date.isoformat(), _seasonal_flow(seed, date.timetuple().tm_yday, rng)))
+            date += dt.timedelta(days=1)
+        return '\n'.join(lines)
+
+    start = dt.datetime.combine(dt.date.today(), dt.time())
+    times = [start + dt.timedelta(hours=3 * step) for step in range(FORECAST_DAYS * 8)]
+    flows = [_seasonal_flow(seed, time_step.timetuple().tm_yday, rng) for time_step in times]
+
+    if method == 'ForecastStats':
+        lines = ['datetime,flow_max_m^3/s,flow_75%_m^3/s,flow_avg_m^3/s,flow_25%_m^3/s,flow_min_m^3/s,high_res_m^3/s']
+        for time_step, flow in zip(times, flows):
+            lines.append('{0},{1:.3f},{2:.3f},{3:.3f},{4:.3f},{5:.3f},{6:.3f}'.format(
+                time_step.strftime('%Y-%m-%d %H:%M:%S'), flow * 1.3, flow * 1.1, flow, flow * 0.9, flow * 0.7, flow))
+        return '\n'.join(lines)
+
+    lines = ['datetime,' + ','.join('ensemble_{0:02d}_m^3/s'.format(member)
+                                    for member in range(1, ENSEMBLE_MEMBERS + 1))]
+    for time_step, flow in zip(times, flows):
+        lines.append(time_step.strftime('%Y-%m-%d %H:%M:%S') + ',' + ','.join(
+            '{0:.3f}'.format(flow * rng.lognormvariate(0, 0.15)) for _ in range(ENSEMBLE_MEMBERS)))
+    return '\n'.join(lines)
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """
+    Stand-in of the ANA (/ana/HidroSerieHistorica) and GEOGloWS (/geoglows/<method>/) services
+    """
+    ana_latency = 1.0
+    geoglows_latency = 0.5
+    responses = {}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = url.path.rstrip('/')
+
+        if path.endswith('/HidroSerieHistorica'):
+            key = ('ana', query.get('codEstacao', [''])[0])
+            latency = self.ana_latency
+            content_type = 'text/xml; charset=utf-8'
+        elif path.split('/')[-1] in ('HistoricSimulation', 'ForecastStats', 'ForecastEnsembles'):
+            key = (path.split('/')[-1], query.get('reach_id', [''])[0])
+            latency = self.geoglows_latency
+            content_type = 'text/csv'
+        else:
+            self.send_error(404)
+            return
+
+        if key not in self.responses:
+            self.responses[key] = (ana_series_xml(key[1]) if key[0] == 'ana' else
+                                   geoglows_csv(key[0], key[1])).encode('utf-8')
+        content = self.responses[key]
+
+        time.sleep(_latency(latency))
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_upstreams(port, ana_latency, geoglows_latency):
+    UpstreamHandler.ana_latency = ana_latency
+    UpstreamHandler.geoglows_latency = geoglows_latency
+    server = ThreadingHTTPServer(('127.0.0.1', port), UpstreamHandler)
+    server.daemon_threads = True
+    print('ANA:      http://127.0.0.1:{0}/ana/HidroSerieHistorica'.format(port))
+    print('GEOGloWS: http://127.0.0.1:{0}/geoglows/'.format(port))
+    server.serve_forever()
+
+
+def worker_memory(pattern):
+    """
+    Total resident memory (MiB) of the processes whose command line contains pattern
+    """
+    total = 0
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit() or int(pid) == os.getpid():
+            continue
+        try:
+            with open('/proc/{0}/cmdline'.format(pid), 'rb') as f:
+                command = f.read().replace(b'\x00', b' ').decode('utf-8', 'replace')
+            if pattern not in command:
+                continue
+            with open('/proc/{0}/status'.format(pid)) as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total += int(line.split()[1])
+        except (OSError, ValueError):
+            continue
+    return total / 1024.0
+
+
+class Recorder:
+    """
+    Latencies and errors of the requests and clicks of a run
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.clicks = []
+
+    def request(self, endpoint, seconds, error):
+        with self.lock:
+            self.requests.append((endpoint, seconds, error))
+
+    def click(self, seconds, error):
+        with self.lock:
+            self.clicks.append((seconds, error))
+
+
+def _get(session, url, params):
+    response = session.get(url, params=params, timeout=REQUEST_TIMEOUT)
+    if response.status_code >= 400:
+        return response, 'HTTP {0}'.format(response.status_code)
+    if response.headers.get('Content-Type', '').startswith('application/json'):
+        body = response.json()
+        if isinstance(body, dict) and 'error' in body:
+            return response, body['error']
+    return response, None
+
+
+def send_request(session, app_url, endpoint, params, recorder):
+    """
+    One request of a click, following its background job until the result is ready
+    """
+    start = time.perf_counter()
+    try:
+        response, error = _get(session, app_url + endpoint, params)
+        while error is None and response.status_code == 202:
+            response, error = _get(session, app_url + 'get-job-result/',
+                                   {'job': response.json()['job'], 'wait': JOB_POLL_WAIT})
+    except Exception as e:
+        error = type(e).__name__
+    recorder.request(endpoint, time.perf_counter() - start, error)
+    return error
+
+
+def click_station(session, app_url, station, recorder):
+    """
+    The requests of a station click, BROWSER_CONNECTIONS at a time
+    """
+    station_params = {
+        'watershed': 'south_america',
+        'subbasin': 'geoglows',
+        'streamcomid': station['comid'],
+        'stationcode': station['station_code'],
+        'stationname': station['station_name'],
+    }
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=BROWSER_CONNECTIONS) as executor:
+        futures = []
+        for endpoint, params in CLICK_REQUESTS:
+            request_params = dict(station_params, **params)
+            if endpoint == 'get-discharge-data':
+                request_params = {'stationcode': station['station_code'], 'stationname': station['station_name']}
+            futures.append(executor.submit(send_request, session, app_url, endpoint, request_params, recorder))
+        errors = [future.result() for future in futures]
+    recorder.click(time.perf_counter() - start, any(error is not None for error in errors))
+
+
+def virtual_user(app_url, stations, deadline, think_time, recorder, seed):
+    rng = random.Random(seed)
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=BROWSER_CONNECTIONS)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    while time.time() < deadline:
+        click_station(session, app_url, rng.choice(stations), recorder)
+        time.sleep(rng.uniform(0, 2 * think_time))
+
+
+def percentiles(values):
+    if not values:
+        return {p: float('nan') for p in PERCENTILES}
+    values = sorted(values)
+    return {p: values[min(int(math.ceil(p / 100.0 * len(values))) - 1, len(values) - 1)] for p in PERCENTILES}
+
+
+def run_load(app_url, users, duration, stations, think_time=5.0, workers=None, ramp_up=10.0):
+    """
+    Run users virtual users for duration seconds, returns the summary of the run
+    """
+    recorder = Recorder()
+    memory = []
+    stop = threading.Event()
+
+    def sample_memory():
+        while not stop.wait(1.0):
+            memory.append(worker_memory(workers))
+
+    if workers:
+        memory.append(worker_memory(workers))
+        sampler = threading.Thread(target=sample_memory, daemon=True)
+        sampler.start()
+
+    start = time.time()
+    deadline = start + duration
+    threads = []
+    for user in range(users):
+        thread = threading.Thread(target=virtual_user, args=(app_url, stations, deadline, think_time, recorder, user),
+                                  daemon=True)
+        thread.start()
+        threads.append(thread)
+        time.sleep(ramp_up / users)
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - start
+    stop.set()
+
+    endpoints = {}
+    for endpoint, seconds, error in recorder.requests:
+        endpoints.setdefault(endpoint, []).append((seconds, error))
+
+    summary = {
+        'users': users,
+        'seconds': elapsed,
+        'clicks': len(recorder.clicks),
+        'requests': len(recorder.requests),
+        'clicks_per_second': len(recorder.clicks) / elapsed,
+        'requests_per_second': len(recorder.requests) / elapsed,
+        'click_latency': percentiles([seconds for seconds, _ in recorder.clicks]),
+        'click_error_rate': (sum(1 for _, error in recorder.clicks if error) / len(recorder.clicks)
+                             if recorder.clicks else float('nan')),
+        'endpoints': {},
+        'errors': {},
+    }
+    for endpoint, results in endpoints.items():
+        summary['endpoints'][endpoint] = {
+            'requests': len(results),
+            'latency': percentiles([seconds for seconds, _ in results]),
+            'error_rate': sum(1 for _, error in results if error is not None) / len(results),
+        }
+    for endpoint, _, error in recorder.requests:
+        if error is not None:
+            key = '{0}: {1}'.format(endpoint, error)
+            summary['errors'][key] = summary['errors'].get(key, 0) + 1
+    if memory:
+        summary['memory_mib'] = {'start': memory[0], 'peak': max(memory), 'end': memory[-1]}
+
+    return summary
+
+
+def print_summary(summary):
+    print('\n{0} users, {1:.0f} s: {2} clicks ({3:.2f}/s), {4} requests ({5:.2f}/s), {6:.1%} clicks with errors'
+          .format(summary['users'], summary['seconds'], summary['clicks'], summary['clicks_per_second'],
+                  summary['requests'], summary['requests_per_second'], summary['click_error_rate']))
+    header = '{0:<26}{1:>9}' + ''.join('{{{0}:>9}}'.format(i + 2) for i in range(len(PERCENTILES))) + '{6:>9}'
+    print(header.format('', 'requests', *['p{0}'.format(p) for p in PERCENTILES], 'errors'))
+    row = '{0:<26}{1:>9}' + ''.join('{{{0}:>9.2f}}'.format(i + 2) for i in range(len(PERCENTILES))) + '{6:>9.1%}'
+    print(row.format('click', summary['clicks'], *[summary['click_latency'][p] for p in PERCENTILES],
+                     summary['click_error_rate']))
+    for endpoint, result in sorted(summary['endpoints'].items()):
+        print(row.format(endpoint, result['requests'], *[result['latency'][p] for p in PERCENTILES],
+                         result['error_rate']))
+    for error, count in sorted(summary['errors'].items(), key=lambda item: -item[1])[:10]:
+        print('  {0} x {1}'.format(count, error))
+    if 'memory_mib' in summary:
+        print('Worker memory: {0:.0f} MiB at start, {1:.0f} MiB peak, {2:.0f} MiB at end'.format(
+            summary['memory_mib']['start'], summary['memory_mib']['peak'], summary['memory_mib']['end']))
+
+
+def synthetic_stations(count):
+    return [{'station_code': str(15000000 + i), 'station_name': 'Station {0}'.format(i), 'comid': 9000000 + i}
+            for i in range(count)]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test of the app with virtual users clicking stations.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    upstreams = commands.add_parser('upstreams', help='Serve the stand-ins of ANA and GEOGloWS.')
+    upstreams.add_argument('--port', type=int, default=8900)
+    upstreams.add_argument('--ana-latency', type=float, default=1.5, help='Median latency of ANA (seconds).')
+    upstreams.add_argument('--geoglows-latency', type=float, default=0.8,
+                           help='Median latency of GEOGloWS (seconds).')
+
+    run = commands.add_parser('run', help='Run the virtual users against the app.')
+    run.add_argument('--app', required=True, help='URL of the app, e.g. http://127.0.0.1:8000/apps/'
+                                                  'hydroviewer-madeira-river/')
+    run.add_argument('--users', type=int, nargs='+', default=[1, 10, 25], help='Numbers of users, one run each.')
+    run.add_argument('--duration', type=float, default=120, help='Duration of each run (seconds).')
+    run.add_argument('--think-time', type=float, default=5.0, help='Mean time between the clicks of a user.')
+    run.add_argument('--stations', type=int, default=50,
+                     help='Number of synthetic stations (the stand-ins answer for any station).')
+    run.add_argument('--real-stations', action='store_true', help='Click the stations of the Madeira layer.')
+    run.add_argument('--workers', help='Command line pattern of the app workers, to report their memory.')
+    run.add_argument('--output', help='Write the summaries to this JSON file.')
+    args = parser.parse_args()
+
+    if args.command == 'upstreams':
+        serve_upstreams(args.port, args.ana_latency, args.geoglows_latency)
+    else:
+        if args.real_stations:
+            from .stations import get_stations
+            station_list = get_stations()
+        else:
+            station_list = synthetic_stations(args.stations)
+
+        app = args.app if args.app.endswith('/') else args.app + '/'
+        summaries = []
+        for user_count in args.users:
+            summaries.append(run_load(app, user_count, args.duration, station_list, think_time=args.think_time,
+                                      workers=args.workers))
+            print_summary(summaries[-1])
+
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(summaries, f, indent=2)
@@ -0,0 +1,55 @@
+"""
+Period of the data and chart requests, given by the start and end query parameters (YYYY-MM-DD, both optional).
+
+The series are cached whole and sliced on read, so a request for the last decade only aligns, corrects, plots
+and transfers that decade.
+"""
+import pandas as pd
+
+
+def _parse_date(text, name):
+    try:
+        return pd.Timestamp(text).normalize()
+    except (TypeError, ValueError):
+        raise ValueError('Invalid {0} date {1}.'.format(name, text))
+
+
+def get_period(get_data):
+    """
+    (start, end) of a request, None for the bounds that are not given. end is inclusive.
+    """
+    start = _parse_date(get_data['start'], 'start') if get_data.get('start') else None
+    end = _parse_date(get_data['end'], 'end') if get_data.get('end') else None
+    if start is not None and end is not None and start > end:
+        raise ValueError('The start date {0} is after the end date {1}.'.format(start.date(), end.date()))
+    return start, end
+
+
+def _bound(date, index):
+    if index.tz is not None and date.tz is None:
+        return date.tz_localize(index.tz)
+    return date
+
+
+def slice_period(series_df, start=None, end=None):
+    """
+    Rows of a series sorted by date within the period (a view of the series, not a copy)
+    """
+    if start is None and end is None:
+        return series_df
+
+    index = series_df.index
+    first = 0 if start is None else index.searchsorted(_bound(start, index), side='left')
+    last = len(index) if end is None else index.searchsorted(_bound(end + pd.Timedelta(days=1), index),
+                                                                side='left')
+    return series_df.iloc[first:last]
+
+
+def period_label(start, end):
+    """
+    Suffix of the file names of a period, empty for the whole record
+    """
+    if start is None and end is None:
+        return ''
+    return '_{0}_{1}'.format(start.strftime('%Y%m%d') if start is not None else 'start',
+                             end.strftime('%Y%m%d') if end is not None else 'end')
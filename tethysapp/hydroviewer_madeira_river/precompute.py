@@ -0,0 +1,100 @@
+"""
+Nightly precompute of the artefacts the station window reads (merged series, hydrograph pyramid, climatology,
+volumes, scatter bins and regression lines, default metrics) for every station, on a process pool:
+
+    python -m tethysapp.hydroviewer_madeira_river.precompute --processes 8
+
+The progress of the run is written to workspaces/app_workspace/precompute/run.json after every station, and a run
+that did not finish (crash, restart of the node) is resumed with the stations it had not done yet; --restart starts
+over. Artefacts whose inputs did not change are only read back, so a nightly run mostly rebuilds the stations with
+new or revised series. Schedule it after the cache refresh, e.g. with cron:
+
+    0 3 * * * python -m tethysapp.hydroviewer_madeira_river.precompute --processes 8
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .artefacts import refresh_station
+from .config import APP_WORKSPACE
+from .stations import get_stations
+
+PRECOMPUTE_DIR = os.path.join(APP_WORKSPACE, 'precompute')
+RUN_FILE = os.path.join(PRECOMPUTE_DIR, 'run.json')
+
+# Artefacts read by the tabs of the station window
+PRECOMPUTED = ['merged', 'pyramid', 'climatology', 'volume', 'scatter', 'metrics']
+
+
+def _now():
+    return dt.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def read_run():
+    """
+    Progress of the last run, None if there was none
+    """
+    if not os.path.exists(RUN_FILE):
+        return None
+    with open(RUN_FILE) as f:
+        return json.load(f)
+
+
+def write_run(run):
+    os.makedirs(PRECOMPUTE_DIR, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=PRECOMPUTE_DIR, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(run, f, indent=1)
+    os.replace(tmp_file, RUN_FILE)
+
+
+def run_precompute(processes=None, stations=None, restart=False):
+    """
+    Precompute the artefacts of all the stations, resuming the last run if it did not finish
+    """
+    if stations is None:
+        stations = get_stations()
+    by_code = {str(station['station_code']): station for station in stations}
+
+    run = read_run()
+    if run is None or run['finished'] is not None or restart:
+        run = {'started': _now(), 'finished': None, 'stations': list(by_code), 'done': [], 'failed': {}}
+        write_run(run)
+    else:
+        print('Resuming the run started at {0} ({1} of {2} stations done).'.format(run['started'], len(run['done']),
+                                                                                  len(run['stations'])))
+
+    done = set(run['done'])
+    pending = [by_code[code] for code in run['stations'] if code not in done and code in by_code]
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(refresh_station, station, names=PRECOMPUTED) for station in pending]
+        for future in as_completed(futures):
+            row = future.result()
+            code = str(row['station_code'])
+            if row['error'] is not None:
+                run['failed'][code] = row['error']
+            else:
+                run['failed'].pop(code, None)
+                run['done'].append(code)
+            write_run(run)
+
+    run['finished'] = _now()
+    write_run(run)
+
+    return run
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Precompute the station window artefacts of every station.')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes.')
+    parser.add_argument('--restart', action='store_true', help='Start a new run instead of resuming the last one.')
+    args = parser.parse_args()
+
+    result = run_precompute(processes=args.processes, restart=args.restart)
+    print('{0} stations done, {1} failed.'.format(len(result['done']), len(result['failed'])))
+    for code, error in result['failed'].items():
+        print('{0}: {1}'.format(code, error))
@@ -0,0 +1,198 @@
+"""
+On-demand profiling of controller requests for the portal administrators.
+
+Adding profile=<mode> to the query string of any controller returns a report instead of its response:
+
+    profile=calls   deterministic profile (cProfile), functions sorted by cumulative time
+    profile=flame   sampling profile rendered as an SVG flame graph
+    profile=memory  tracemalloc snapshot of the allocations made by the request
+"""
+import cProfile
+import functools
+import html
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+
+from django.http import HttpResponse
+
+SAMPLE_INTERVAL = 0.005
+
+FLAME_WIDTH = 1200
+FLAME_ROW_HEIGHT = 16
+FLAME_MIN_WIDTH = 0.5
+
+
+def _is_admin(request):
+    user = getattr(request, 'user', None)
+    return user is not None and user.is_authenticated and user.is_superuser
+
+
+def _frame_name(frame):
+    code = frame.f_code
+    return '{0} ({1}:{2})'.format(code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+
+
+class StackSampler:
+    """
+    Samples the stack of a thread at a fixed interval and counts the folded stacks
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_name(frame))
+                frame = frame.f_back
+            if stack:
+                folded = tuple(reversed(stack))
+                self.stacks[folded] = self.stacks.get(folded, 0) + 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def _flame_tree(stacks):
+    root = {'name': 'all', 'value': 0, 'children': {}}
+    for stack, count in stacks.items():
+        root['value'] += count
+        node = root
+        for name in stack:
+            node = node['children'].setdefault(name, {'name': name, 'value': 0, 'children': {}})
+            node['value'] += count
+    return root
+
+
+def _flame_color(name):
+    value = zlib.crc32(name.encode('utf-8'))
+    return 'rgb({0},{1},{2})'.format(205 + value % 50, 80 + (value >> 8) % 120, 30 + (value >> 16) % 50)
+
+
+def flame_graph_svg(stacks, title):
+    """
+    SVG flame graph of folded stacks (root at the bottom)
+    """
+    root = _flame_tree(stacks)
+    total = max(root['value'], 1)
+    scale = FLAME_WIDTH / total
+
+    rects = []
+    depth_max = [0]
+
+    def layout(node, x, depth):
+        depth_max[0] = max(depth_max[0], depth)
+        width = node['value'] * scale
+        if width >= FLAME_MIN_WIDTH:
+            rects.append((node, x, depth, width))
+        child_x = x
+        for child in sorted(node['children'].values(), key=lambda item: item['name']):
+            layout(child, child_x, depth + 1)
+            child_x += child['value'] * scale
+
+    layout(root, 0, 0)
+
+    height = (depth_max[0] + 3) * FLAME_ROW_HEIGHT
+    parts = ['<svg xmlns="http://www.w3.org/2000/svg" width="{0}" height="{1}" font-family="monospace" '
+             'font-size="11">'.format(FLAME_WIDTH, height),
+             '<text x="4" y="12">{0} ({1} samples)</text>'.format(html.escape(title), root['value'])]
+
+    for node, x, depth, width in rects:
+        y = height - (depth + 1) * FLAME_ROW_HEIGHT
+        label = '{0} ({1} samples, {2:.1f}%)'.format(node['name'], node['value'], 100.0 * node['value'] / total)
+        parts.append('<g><title>{0}</title><rect x="{1:.2f}" y="{2}" width="{3:.2f}" height="{4}" fill="{5}"/>'
+                     .format(html.escape(label), x, y, width, FLAME_ROW_HEIGHT - 1, _flame_color(node['name'])))
+        characters = int(width / 7)
+        if characters > 3:
+            text = node['name'] if len(node['name']) <= characters else node['name'][:characters - 2] + '..'
+            parts.append('<text x="{0:.2f}" y="{1}">{2}</text>'.format(x + 2, y + FLAME_ROW_HEIGHT - 4,
+                                                                      html.escape(text)))
+        parts.append('</g>')
+
+    parts.append('</svg>')
+    return '\n'.join(parts)
+
+
+def profile_calls(controller, request, *args, **kwargs):
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.runcall(controller, request, *args, **kwargs)
+    elapsed = time.perf_counter() - start
+
+    report = io.StringIO()
+    report.write('{0}: {1:.3f} s\n\n'.format(controller.__name__, elapsed))
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats('cumulative').print_stats(60)
+    stats.print_callees(30)
+    return HttpResponse(report.getvalue(), content_type='text/plain')
+
+
+def profile_flame(controller, request, *args, **kwargs):
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    try:
+        controller(request, *args, **kwargs)
+    finally:
+        sampler.stop()
+
+    return HttpResponse(flame_graph_svg(sampler.stacks, controller.__name__), content_type='image/svg+xml')
+
+
+def profile_memory(controller, request, *args, **kwargs):
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start(25)
+    try:
+        before = tracemalloc.take_snapshot()
+        controller(request, *args, **kwargs)
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    report = io.StringIO()
+    report.write('{0}: traced {1:.1f} MiB, peak {2:.1f} MiB\n\n'.format(controller.__name__, current / 2 ** 20,
+                                                                        peak / 2 ** 20))
+    report.write('Allocations made by the request (by line):\n')
+    for stat in after.compare_to(before, 'lineno')[:40]:
+        report.write('{0}\n'.format(stat))
+    report.write('\nLargest allocation tracebacks:\n')
+    for stat in after.compare_to(before, 'traceback')[:5]:
+        report.write('\n{0}\n'.format(stat))
+        for line in stat.traceback.format():
+            report.write('{0}\n'.format(line))
+
+    return HttpResponse(report.getvalue(), content_type='text/plain')
+
+
+PROFILERS = {'calls': profile_calls, 'flame': profile_flame, 'memory': profile_memory}
+
+
+def profiled(controller):
+    """
+    Decorator of the controllers: runs the request under a profiler when an administrator adds profile=<mode>
+    """
+    @functools.wraps(controller)
+    def wrapper(request, *args, **kwargs):
+        mode = request.GET.get('profile')
+        if mode in PROFILERS and _is_admin(request):
+            return PROFILERS[mode](controller, request, *args, **kwargs)
+        return controller(request, *args, **kwargs)
+    return wrapper
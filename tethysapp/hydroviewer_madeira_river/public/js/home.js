@@ -63,38 +63,78 @@ function init_map() {
 
 }
 
-let ajax_url = 'https://geoserver.hydroshare.org/geoserver/HS-7178e909b4824df29a87930f51ccaa9b/wfs?request=GetCapabilities';
-
-let capabilities = $.ajax(ajax_url, {
-	type: 'GET',
-	data:{
-		service: 'WFS',
-		version: '1.0.0',
-		request: 'GetCapabilities',
-		outputFormat: 'text/javascript'
-	},
-	success: function() {
-		let x = capabilities.responseText
-		.split('<FeatureTypeList>')[1]
-		.split('HS-7178e909b4824df29a87930f51ccaa9b:madeira_drainageline')[1]
-		.split('LatLongBoundingBox ')[1]
-		.split('/></FeatureType>')[0];
-
-		let minx = Number(x.split('"')[1]);
-		let miny = Number(x.split('"')[3]);
-		let maxx = Number(x.split('"')[5]);
-		let maxy = Number(x.split('"')[7]);
-
-		minx = minx + 2;
-		miny = miny + 2;
-		maxx = maxx - 2;
-		maxy = maxy - 2;
-
-		let extent = ol.proj.transform([minx, miny], 'EPSG:4326', 'EPSG:3857').concat(ol.proj.transform([maxx, maxy], 'EPSG:4326', 'EPSG:3857'));
-
-		map.getView().fit(extent, map.getSize());
+// STATION CATALOG //
+// Stations bootstrapped in the home page, to fit the map and resolve the clicks without asking the geoserver
+var station_catalog;
+const STATION_CLICK_TOLERANCE = 10; // pixels
+
+function get_station_catalog() {
+	if (station_catalog === undefined) {
+		let element = document.getElementById('station-catalog');
+		station_catalog = element ? JSON.parse(element.textContent) : null;
 	}
-});
+	return station_catalog;
+}
+
+function catalog_station_at_pixel(pixel) {
+	let catalog = get_station_catalog();
+	if (!catalog) {
+		return null;
+	}
+	let station = null;
+	let station_distance = STATION_CLICK_TOLERANCE;
+	catalog.features.forEach(function(feature) {
+		let station_pixel = map.getPixelFromCoordinate(ol.proj.fromLonLat(feature.geometry.coordinates));
+		let distance = Math.hypot(station_pixel[0] - pixel[0], station_pixel[1] - pixel[1]);
+		if (distance <= station_distance) {
+			station = feature;
+			station_distance = distance;
+		}
+	});
+	return station;
+}
+
+function fit_map_extent() {
+	let catalog = get_station_catalog();
+	if (catalog && catalog.bbox) {
+		let extent = ol.proj.transformExtent(catalog.bbox, 'EPSG:4326', 'EPSG:3857');
+		map.getView().fit(extent, {size: map.getSize(), padding: [40, 40, 40, 40]});
+		return;
+	}
+
+	let ajax_url = 'https://geoserver.hydroshare.org/geoserver/HS-7178e909b4824df29a87930f51ccaa9b/wfs?request=GetCapabilities';
+
+	let capabilities = $.ajax(ajax_url, {
+		type: 'GET',
+		data:{
+			service: 'WFS',
+			version: '1.0.0',
+			request: 'GetCapabilities',
+			outputFormat: 'text/javascript'
+		},
+		success: function() {
+			let x = capabilities.responseText
+			.split('<FeatureTypeList>')[1]
+			.split('HS-7178e909b4824df29a87930f51ccaa9b:madeira_drainageline')[1]
+			.split('LatLongBoundingBox ')[1]
+			.split('/></FeatureType>')[0];
+
+			let minx = Number(x.split('"')[1]);
+			let miny = Number(x.split('"')[3]);
+			let maxx = Number(x.split('"')[5]);
+			let maxy = Number(x.split('"')[7]);
+
+			minx = minx + 2;
+			miny = miny + 2;
+			maxx = maxx - 2;
+			maxy = maxy - 2;
+
+			let extent = ol.proj.transform([minx, miny], 'EPSG:4326', 'EPSG:3857').concat(ol.proj.transform([maxx, maxy], 'EPSG:4326', 'EPSG:3857'));
+
+			map.getView().fit(extent, map.getSize());
+		}
+	});
+}
 
 function get_discharge_info (stationcode, stationname) {
 	$('#observed-loading-Q').removeClass('hidden');
@@ -687,7 +727,7 @@ function map_events() {
 			return;
 		}
 		var pixel = map.getEventPixel(evt.originalEvent);
-		var hit = map.forEachLayerAtPixel(pixel, function(layer) {
+		var hit = catalog_station_at_pixel(pixel) || map.forEachLayerAtPixel(pixel, function(layer) {
 			if (layer == feature_layer) {
 				current_layer = layer;
 				return true;
@@ -698,6 +738,14 @@ function map_events() {
 
 	map.on("singleclick", function(evt) {
 
+		// Stations of the catalog are resolved locally
+		let station = catalog_station_at_pixel(evt.pixel);
+		if (station) {
+			open_station_panels();
+			select_station(station.properties);
+			return;
+		}
+
 		if (map.getTargetElement().style.cursor == "pointer") {
 
 			var view = map.getView();
@@ -705,75 +753,87 @@ function map_events() {
 			var wms_url = current_layer.getSource().getGetFeatureInfoUrl(evt.coordinate, viewResolution, view.getProjection(), { 'INFO_FORMAT': 'application/json' });
 
 			if (wms_url) {
-				$("#obsgraph").modal('show');
-				$('#observed-chart-Q').addClass('hidden');
-				$('#simulated-chart-Q').addClass('hidden');
-				$('#simulated-bc-chart-Q').addClass('hidden');
-				$('#hydrographs-chart').addClass('hidden');
-				$('#dailyAverages-chart').addClass('hidden');
-				$('#monthlyAverages-chart').addClass('hidden');
-				$('#scatterPlot-chart').addClass('hidden');
-				$('#scatterPlotLogScale-chart').addClass('hidden');
-				$('#volumeAnalysis-chart').addClass('hidden');
-				$('#forecast-chart').addClass('hidden');
-				$('#forecast-bc-chart').addClass('hidden');
-				$('#observed-loading-Q').removeClass('hidden');
-				$('#simulated-loading-Q').removeClass('hidden');
-				$('#simulated-bc-loading-Q').removeClass('hidden');
-				$('#hydrographs-loading').removeClass('hidden');
-				$('#dailyAverages-loading').removeClass('hidden');
-				$('#monthlyAverages-loading').removeClass('hidden');
-				$('#scatterPlot-loading').removeClass('hidden');
-				$('#scatterPlotLogScale-loading').removeClass('hidden');
-				$('#volumeAnalysis-loading').removeClass('hidden');
-				$('#forecast-loading').removeClass('hidden');
-				$('#forecast-bc-loading').removeClass('hidden');
-				$("#station-info").empty()
-				$('#download_observed_discharge').addClass('hidden');
-                $('#download_simulated_discharge').addClass('hidden');
-                $('#download_simulated_bc_discharge').addClass('hidden');
-                $('#download_forecast').addClass('hidden');
-                $('#download_forecast_bc').addClass('hidden');
+				open_station_panels();
 
 				$.ajax({
 					type: "GET",
 					url: wms_url,
 					dataType: 'json',
 					success: function (result) {
-						watershed = 'south_america' //OJO buscar como hacerla generica
-		         		//subbasin = 'continental' //OJO buscar como hacerla generica
-		         		subbasin = 'geoglows' //OJO buscar como hacerla generica
-		         		var startdate = '';
-		         		stationcode = result["features"][0]["properties"]["CodEstacao"];
-		         		stationname = result["features"][0]["properties"]["NomeEstaca"];
-		         		//streamcomid = result["features"][0]["properties"]["COMID"];
-		         		streamcomid = result["features"][0]["properties"]["new_COMID"];
-		         		stream = result["features"][0]["properties"]["NomeRio"];
-		         		$("#station-info").append('<h3 id="Station-Name-Tab">Current Station: '+ stationname
-                        			+ '</h3><h5 id="Station-Code-Tab">Station Code: '
-                        			+ stationcode + '</h3><h5 id="COMID-Tab">Station COMID: '
-                        			+ streamcomid+ '</h5><h5>Stream: '+ stream);
-                        get_discharge_info (stationcode, stationname);
-                        get_simulated_data (watershed, subbasin, streamcomid, stationcode, stationname);
-                        get_simulated_bc_data (watershed, subbasin, streamcomid, stationcode, stationname);
-                        get_hydrographs (watershed, subbasin, streamcomid, stationcode, stationname);
-                        get_dailyAverages (watershed, subbasin, streamcomid, stationcode, stationname);
-                        get_monthlyAverages (watershed, subbasin, streamcomid, stationcode, stationname);
-                        get_scatterPlot (watershed, subbasin, streamcomid, stationcode, stationname);
-                        get_scatterPlotLogScale (watershed, subbasin, streamcomid, stationcode, stationname);
-                        get_volumeAnalysis (watershed, subbasin, streamcomid, stationcode, stationname);
-                        createVolumeTable(watershed, subbasin, streamcomid, stationcode, stationname);
-                        get_time_series(watershed, subbasin, streamcomid, stationcode, stationname);
-                        get_time_series_bc(watershed, subbasin, streamcomid, stationcode, stationname);
-                        makeDefaultTable(watershed, subbasin, streamcomid, stationcode, stationname);
-                    }
-                });
-            }
+						select_station(result["features"][0]["properties"]);
+					}
+				});
+			}
 		}
 
 	});
 }
 
+function open_station_panels() {
+	$("#obsgraph").modal('show');
+	$('#observed-chart-Q').addClass('hidden');
+	$('#simulated-chart-Q').addClass('hidden');
+	$('#simulated-bc-chart-Q').addClass('hidden');
+	$('#hydrographs-chart').addClass('hidden');
+	$('#dailyAverages-chart').addClass('hidden');
+	$('#monthlyAverages-chart').addClass('hidden');
+	$('#scatterPlot-chart').addClass('hidden');
+	$('#scatterPlotLogScale-chart').addClass('hidden');
+	$('#volumeAnalysis-chart').addClass('hidden');
+	$('#forecast-chart').addClass('hidden');
+	$('#forecast-bc-chart').addClass('hidden');
+	$('#observed-loading-Q').removeClass('hidden');
+	$('#simulated-loading-Q').removeClass('hidden');
+	$('#simulated-bc-loading-Q').removeClass('hidden');
+	$('#hydrographs-loading').removeClass('hidden');
+	$('#dailyAverages-loading').removeClass('hidden');
+	$('#monthlyAverages-loading').removeClass('hidden');
+	$('#scatterPlot-loading').removeClass('hidden');
+	$('#scatterPlotLogScale-loading').removeClass('hidden');
+	$('#volumeAnalysis-loading').removeClass('hidden');
+	$('#forecast-loading').removeClass('hidden');
+	$('#forecast-bc-loading').removeClass('hidden');
+	$("#station-info").empty()
+	$('#download_observed_discharge').addClass('hidden');
+	$('#download_simulated_discharge').addClass('hidden');
+	$('#download_simulated_bc_discharge').addClass('hidden');
+	$('#download_forecast').addClass('hidden');
+	$('#download_forecast_bc').addClass('hidden');
+	$('#forecast-verification-table').empty();
+	$('#ensemble-forecast-chart').empty();
+	$('#stale-data-warning').addClass('hidden').empty();
+}
+
+function select_station(properties) {
+	selected_station = properties;
+	watershed = 'south_america' //OJO buscar como hacerla generica
+	//subbasin = 'continental' //OJO buscar como hacerla generica
+	subbasin = 'geoglows' //OJO buscar como hacerla generica
+	var startdate = '';
+	stationcode = properties["CodEstacao"];
+	stationname = properties["NomeEstaca"];
+	//streamcomid = properties["COMID"];
+	streamcomid = properties["new_COMID"];
+	stream = properties["NomeRio"];
+	$("#station-info").append('<h3 id="Station-Name-Tab">Current Station: '+ stationname
+			+ '</h3><h5 id="Station-Code-Tab">Station Code: '
+			+ stationcode + '</h3><h5 id="COMID-Tab">Station COMID: '
+			+ streamcomid+ '</h5><h5>Stream: '+ stream);
+	get_discharge_info (stationcode, stationname);
+	get_simulated_data (watershed, subbasin, streamcomid, stationcode, stationname);
+	get_simulated_bc_data (watershed, subbasin, streamcomid, stationcode, stationname);
+	get_hydrographs (watershed, subbasin, streamcomid, stationcode, stationname);
+	get_dailyAverages (watershed, subbasin, streamcomid, stationcode, stationname);
+	get_monthlyAverages (watershed, subbasin, streamcomid, stationcode, stationname);
+	get_scatterPlot (watershed, subbasin, streamcomid, stationcode, stationname);
+	get_scatterPlotLogScale (watershed, subbasin, streamcomid, stationcode, stationname);
+	get_volumeAnalysis (watershed, subbasin, streamcomid, stationcode, stationname);
+	createVolumeTable(watershed, subbasin, streamcomid, stationcode, stationname);
+	get_time_series(watershed, subbasin, streamcomid, stationcode, stationname);
+	get_time_series_bc(watershed, subbasin, streamcomid, stationcode, stationname);
+	makeDefaultTable(watershed, subbasin, streamcomid, stationcode, stationname);
+}
+
 
 
 function resize_graphs() {
@@ -869,6 +929,7 @@ $(function() {
         });
     };
     init_map();
+    fit_map_extent();
     map_events();
     resize_graphs();
 
@@ -991,8 +1052,8 @@ $(document).ready(function(){
 			getData[metricAbbr] = $(`#${metricAbbr}`).val();
 		}
 
-		// Creating the table
-		$.ajax({
+		// Creating the table (a background job, long records can take longer than the proxy timeout)
+		ajax_job({
 			url : "make-table-ajax", // the endpoint
 			type : "GET", // http method
 			data: getData,
@@ -1034,7 +1095,7 @@ function makeDefaultTable(watershed, subbasin, streamcomid, stationcode, station
     getData[metricAbbr] = $(`#${metricAbbr}`).val();
   }
   //console.log(getData);
-  $.ajax({
+  ajax_job({
     url : "make-table-ajax", // the endpoint
     type : "GET", // http method
     data: getData,
@@ -1127,7 +1188,7 @@ function get_time_series_bc(watershed, subbasin, streamcomid, stationcode, stati
     $('#forecast-bc-loading').removeClass('hidden');
     $('#forecast-bc-chart').addClass('hidden');
     $('#dates').addClass('hidden');
-    $.ajax({
+    ajax_job({
         type: 'GET',
         url: 'get-time-series-bc/',
         data: {
@@ -1188,3 +1249,287 @@ function get_time_series_bc(watershed, subbasin, streamcomid, stationcode, stati
         }
     });
 }
+
+// VALIDATION LEADERBOARD //
+var validation_layer;
+let leaderboard_sort = 'KGE (2012)';
+let leaderboard_order = 'asc';
+
+function get_leaderboard() {
+    $('#leaderboard-loading').removeClass('hidden');
+    $.ajax({
+        url: 'get-validation-leaderboard',
+        type: 'GET',
+        data: {'sort': leaderboard_sort, 'order': leaderboard_order},
+        error: function() {
+            $('#leaderboard-loading').addClass('hidden');
+            $('#leaderboard-table').html('<p class="alert alert-danger" style="text-align: center"><strong>An unknown error occurred while retrieving the leaderboard</strong></p>');
+        },
+        success: function(data) {
+            $('#leaderboard-loading').addClass('hidden');
+            if (!data.error) {
+                $('#leaderboard-table').html(data);
+            } else {
+                $('#leaderboard-table').html('<p class="alert alert-danger" style="text-align: center"><strong>' + data.error + '</strong></p>');
+            }
+        }
+    });
+}
+
+function validation_style(feature) {
+    return new ol.style.Style({
+        image: new ol.style.Circle({
+            radius: 6,
+            fill: new ol.style.Fill({color: feature.get('color')}),
+            stroke: new ol.style.Stroke({color: '#ffffff', width: 1})
+        })
+    });
+}
+
+function load_validation_layer() {
+    var params = {
+        metric: $('#leaderboard-metric').val(),
+        corrected: $('#leaderboard-corrected').is(':checked')
+    };
+
+    if (validation_layer) {
+        map.removeLayer(validation_layer);
+    }
+
+    validation_layer = new ol.layer.Vector({
+        source: new ol.source.Vector({
+            url: 'get-validation-geojson?' + jQuery.param(params),
+            format: new ol.format.GeoJSON()
+        }),
+        style: validation_style
+    });
+    map.addLayer(validation_layer);
+}
+
+$(document).ready(function() {
+    $('#leaderboard-modal').on('show.bs.modal', function() {
+        get_leaderboard();
+    });
+
+    $('#leaderboard-table').on('click', 'th', function() {
+        let column = $(this).text();
+        if (column == leaderboard_sort) {
+            leaderboard_order = (leaderboard_order == 'asc') ? 'desc' : 'asc';
+        } else {
+            leaderboard_sort = column;
+            leaderboard_order = 'asc';
+        }
+        get_leaderboard();
+    });
+
+    $('#leaderboard-show-layer, #leaderboard-metric, #leaderboard-corrected').change(function() {
+        if ($('#leaderboard-show-layer').is(':checked')) {
+            load_validation_layer();
+        } else if (validation_layer) {
+            map.removeLayer(validation_layer);
+            validation_layer = undefined;
+        }
+    });
+});
+
+// FORECAST VERIFICATION //
+$(document).ready(function() {
+    $('#forecast-verification-button').click(function() {
+        let stationcode = $("#Station-Code-Tab").html().split(': ')[1];
+        let streamcomid = $("#COMID-Tab").html().split(': ')[1];
+
+        $('#forecast-verification-loading').removeClass('hidden');
+        $('#forecast-verification-table').empty();
+        $.ajax({
+            url: 'get-forecast-verification',
+            type: 'GET',
+            data: {'streamcomid': streamcomid, 'stationcode': stationcode},
+            error: function() {
+                $('#forecast-verification-loading').addClass('hidden');
+                $('#forecast-verification-table').html('<p class="alert alert-danger" style="text-align: center"><strong>An unknown error occurred while verifying the forecasts</strong></p>');
+            },
+            success: function(data) {
+                $('#forecast-verification-loading').addClass('hidden');
+                if (!data.error) {
+                    $('#forecast-verification-table').html(data);
+                } else {
+                    $('#forecast-verification-table').html('<p class="alert alert-warning" style="text-align: center"><strong>' + data.error + '</strong></p>');
+                }
+            }
+        });
+    });
+});
+
+// CORRECTED ENSEMBLE FORECAST //
+$(document).ready(function() {
+    $('#ensemble-forecast-button').click(function() {
+        let stationname = $("#Station-Name-Tab").html().split(': ')[1];
+        let stationcode = $("#Station-Code-Tab").html().split(': ')[1];
+        let streamcomid = $("#COMID-Tab").html().split(': ')[1];
+
+        $('#ensemble-forecast-loading').removeClass('hidden');
+        $('#ensemble-forecast-chart').empty();
+        $.ajax({
+            url: 'get-ensemble-forecast-bc',
+            type: 'GET',
+            data: {'streamcomid': streamcomid, 'stationcode': stationcode, 'stationname': stationname},
+            error: function() {
+                $('#ensemble-forecast-loading').addClass('hidden');
+                $('#ensemble-forecast-chart').html('<p class="alert alert-danger" style="text-align: center"><strong>An unknown error occurred while retrieving the ensemble forecast</strong></p>');
+            },
+            success: function(data) {
+                $('#ensemble-forecast-loading').addClass('hidden');
+                if (!data.error) {
+                    $('#ensemble-forecast-chart').html(data);
+                    Plotly.Plots.resize($("#ensemble-forecast-chart .js-plotly-plot")[0]);
+                } else {
+                    $('#ensemble-forecast-chart').html('<p class="alert alert-warning" style="text-align: center"><strong>' + data.error + '</strong></p>');
+                }
+            }
+        });
+    });
+});
+
+// FORECAST ALERTS //
+var alerts_layer;
+
+function alerts_style(feature) {
+    return new ol.style.Style({
+        image: new ol.style.RegularShape({
+            points: 3,
+            radius: 9,
+            fill: new ol.style.Fill({color: feature.get('color')}),
+            stroke: new ol.style.Stroke({color: '#000000', width: 1})
+        })
+    });
+}
+
+$(document).ready(function() {
+    $('#forecast-alerts-toggle').click(function() {
+        if (alerts_layer) {
+            map.removeLayer(alerts_layer);
+            alerts_layer = undefined;
+            return;
+        }
+
+        alerts_layer = new ol.layer.Vector({
+            source: new ol.source.Vector({
+                url: 'get-forecast-alerts',
+                format: new ol.format.GeoJSON()
+            }),
+            style: alerts_style
+        });
+        map.addLayer(alerts_layer);
+    });
+});
+
+/* STALE DATA WARNING */
+// Responses built from cached data older than its refresh time carry the Age and Warning headers
+$(document).ajaxComplete(function(event, xhr) {
+    let warning = xhr.getResponseHeader('Warning');
+    let age = parseInt(xhr.getResponseHeader('Age'));
+    if (warning && warning.indexOf('110') === 0 && !isNaN(age)) {
+        let hours = (age / 3600).toFixed(1);
+        $('#stale-data-warning').removeClass('hidden')
+            .text('ANA or GEOGloWS could not be reached recently: showing data cached ' + hours + ' hours ago. It will be refreshed when the service responds.');
+    }
+});
+
+/* DOWNLOAD FORMAT */
+// The downloads of each tab are served in the format selected in that tab
+$(document).on('click', '#Download_hydrographs a, #download_forecast a, #download_forecast_bc a', function() {
+    let href = $(this).attr('href');
+    if (!href) {
+        return;
+    }
+    let format = $(this).closest('.tab-pane').find('.download-format').val() || 'csv';
+    href = href.replace(/&(format|start|end)=[^&]*/g, '');
+    if (!FORECAST_URL.test(href)) {
+        href += period_parameters();
+    }
+    $(this).attr('href', href + '&format=' + encodeURIComponent(format));
+});
+
+/* DATE RANGE */
+// The charts, tables and downloads of a station cover the period selected in its panel (the whole record if
+// no dates are given). The forecasts are always the latest ones, their requests and downloads do not take the period.
+var selected_station;
+var FORECAST_URL = /get-(time-series|ensemble-forecast|forecast)/;
+
+function period_parameters() {
+    let parameters = '';
+    let start = $('#period-start').val();
+    let end = $('#period-end').val();
+    if (start) {
+        parameters += '&start=' + encodeURIComponent(start);
+    }
+    if (end) {
+        parameters += '&end=' + encodeURIComponent(end);
+    }
+    return parameters;
+}
+
+$.ajaxPrefilter(function(options) {
+    if (typeof options.data === 'string' && /(^|&)stationcode=/.test(options.data) && !FORECAST_URL.test(options.url)) {
+        options.data += period_parameters();
+    }
+});
+
+$(document).on('click', '#apply-period', function() {
+    if (selected_station) {
+        open_station_panels();
+        select_station(selected_station);
+    }
+});
+
+/* BACKGROUND JOBS */
+// Same options as $.ajax for the controllers that run as background jobs: the request returns the id of the job
+// and its result is long-polled until it is ready. A job that failed or was lost is submitted once more, then its
+// error is passed to the error callback.
+function ajax_job(options) {
+    let success = options.success;
+    let error = options.error;
+    let attempts = 0;
+
+    function fail(resp, xhr) {
+        if (attempts < 2) {
+            submit();
+        } else {
+            error(xhr, resp.error);
+        }
+    }
+
+    function poll(job) {
+        $.ajax({
+            type: 'GET',
+            url: 'get-job-result/',
+            data: {'job': job, 'wait': 25},
+            error: error,
+            success: function(resp, status, xhr) {
+                if (xhr.status === 202) {
+                    poll(job);
+                } else if (resp && resp.error) {
+                    fail(resp, xhr);
+                } else {
+                    success(resp, status, xhr);
+                }
+            }
+        });
+    }
+
+    function submit() {
+        attempts += 1;
+        $.ajax($.extend({}, options, {
+            data: $.extend({}, options.data, {'async': 'true'}),
+            success: function(resp, status, xhr) {
+                if (xhr.status === 202 && resp.job) {
+                    poll(resp.job);
+                } else {
+                    success(resp, status, xhr);
+                }
+            }
+        }));
+    }
+
+    submit();
+}
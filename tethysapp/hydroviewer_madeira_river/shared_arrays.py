@@ -0,0 +1,252 @@
+"""
+Station series published in shared memory segments, mapped by all the worker processes of a node.
+
+Each series is one segment named after its kind and key (hvmr_observed_<station>, hvmr_simulated_<comid>, ...)
+with a small header followed by the days (int32 epoch days) and the values (float32) of the series. A worker
+that fetched a series publishes it and every other worker maps the same buffers instead of holding a copy. The
+header keeps the fingerprint of the series, so a derived series is only read back for the same inputs. A segment
+older than the timeout of its namespace is still served, marked as stale, and only published again when the cache
+has a series with another fingerprint:
+
+    python -m tethysapp.hydroviewer_madeira_river.shared_arrays --list
+    python -m tethysapp.hydroviewer_madeira_river.shared_arrays --clear
+"""
+import argparse
+import json
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from . import cache
+from .fingerprints import from_int64, to_int64
+
+SEGMENT_PREFIX = 'hvmr_'
+SHM_DIR = '/dev/shm'
+
+# Header: version, length, published time (0 while the segment is being written), fingerprint (0 if none)
+HEADER_FIELDS = 4
+HEADER_SIZE = HEADER_FIELDS * 8
+NAMES_SIZE = 128
+VERSION = 1
+
+# Interval between the lookups of the cache for a newer version of a stale segment
+STALE_CHECK_INTERVAL = 30
+
+# Segments mapped by this process, by name and published time
+_attached = {}
+
+# Last lookup of the cache for each stale segment, by name
+_stale_checked = {}
+
+
+def segment_name(kind, key):
+    return '{0}{1}_{2}'.format(SEGMENT_PREFIX, kind, key)
+
+
+def _open_segment(name, create=False, size=0):
+    """
+    Open a segment without registering it with the resource tracker,
+    so it is not removed when the process that created or mapped it exits
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    except TypeError:
+        segment = shared_memory.SharedMemory(name=name, create=create, size=size)
+        resource_tracker.unregister(segment._name, 'shared_memory')
+        return segment
+
+
+def _release_stale(name, published):
+    """
+    Close the older mappings of a segment that are no longer used by any dataframe
+    """
+    for attached_key in [k for k in _attached if k[0] == name and k[1] != published]:
+        try:
+            _attached[attached_key].close()
+            del _attached[attached_key]
+        except BufferError:
+            pass
+
+
+def publish_series(kind, key, series_df, published=None, fingerprint=None):
+    """
+    Copy the first column of a daily series into a new segment, replacing the previous one.
+    published is the time the series was fetched (now by default), fingerprint the one of the series by default.
+    """
+    if fingerprint is None:
+        fingerprint = series_df.attrs.get('fingerprint')
+    name = segment_name(kind, key)
+    series = series_df.iloc[:, 0]
+    length = len(series)
+    names = json.dumps({'index': series_df.index.name, 'column': series.name}).encode('utf-8')[:NAMES_SIZE]
+
+    try:
+        old = _open_segment(name)
+        old.unlink()
+        old.close()
+    except FileNotFoundError:
+        pass
+
+    try:
+        segment = _open_segment(name, create=True, size=HEADER_SIZE + NAMES_SIZE + length * 8)
+    except FileExistsError:
+        # Another worker is publishing the same series
+        return
+
+    header = np.ndarray(HEADER_FIELDS, dtype=np.int64, buffer=segment.buf)
+    offset = HEADER_SIZE
+    segment.buf[offset:offset + len(names)] = names
+    offset += NAMES_SIZE
+    days = np.ndarray(length, dtype=np.int32, buffer=segment.buf, offset=offset)
+    days[:] = series.index.values.astype('datetime64[D]').astype(np.int64)
+    offset += length * 4
+    values = np.ndarray(length, dtype=np.float32, buffer=segment.buf, offset=offset)
+    values[:] = series.values
+
+    header[0] = VERSION
+    header[1] = length
+    header[3] = to_int64(fingerprint) if fingerprint is not None else 0
+    # Written last, readers skip the segment until it is complete
+    header[2] = int(published if published is not None else time.time())
+
+    del header, days, values
+    segment.close()
+
+
+def _touch(name, published):
+    """
+    Set the published time of a segment whose series was fetched again without changes
+    """
+    try:
+        segment = _open_segment(name)
+    except FileNotFoundError:
+        return
+    header = np.ndarray(HEADER_FIELDS, dtype=np.int64, buffer=segment.buf)
+    if header[2] != 0:
+        header[2] = int(published)
+    del header
+    segment.close()
+
+
+def read_series(kind, key, fingerprint=None):
+    """
+    Dataframe whose values map the shared segment of a series (read only), with its published time in its attrs.
+    None if the series has not been published, is incomplete or does not have the given fingerprint.
+    """
+    name = segment_name(kind, key)
+
+    try:
+        segment = _open_segment(name)
+    except FileNotFoundError:
+        return None
+
+    header = np.ndarray(HEADER_FIELDS, dtype=np.int64, buffer=segment.buf).copy()
+    version, length, published = header[0], int(header[1]), int(header[2])
+    stored_fingerprint = from_int64(header[3])
+    if version != VERSION or published == 0 or (fingerprint is not None and stored_fingerprint != fingerprint):
+        segment.close()
+        return None
+
+    names = json.loads(bytes(segment.buf[HEADER_SIZE:HEADER_SIZE + NAMES_SIZE]).rstrip(b'\x00').decode('utf-8'))
+    offset = HEADER_SIZE + NAMES_SIZE
+    days = np.ndarray(length, dtype=np.int32, buffer=segment.buf, offset=offset)
+    values = np.ndarray((length, 1), dtype=np.float32, buffer=segment.buf, offset=offset + length * 4)
+    values.flags.writeable = False
+
+    index = pd.DatetimeIndex(days.astype('datetime64[D]'), name=names['index'])
+    series_df = pd.DataFrame(data=values, index=index, columns=[names['column']], copy=False)
+    series_df.attrs['published'] = published
+    if stored_fingerprint is not None:
+        series_df.attrs['fingerprint'] = stored_fingerprint
+    del days
+
+    _attached[(name, published)] = segment
+    _release_stale(name, published)
+
+    return series_df
+
+
+def _publish(kind, key, series_df, age, fingerprint=None):
+    try:
+        publish_series(kind, key, series_df, published=time.time() - age, fingerprint=fingerprint)
+    except Exception as e:
+        print('Could not publish {0}: {1}'.format(segment_name(kind, key), str(e)))
+
+
+def get_or_publish(kind, key, compute, max_age=None, fingerprint=None):
+    """
+    Shared series of kind and key, computed and published if it is missing or has another fingerprint.
+    compute returns the series and its age in seconds (e.g. from the cache).
+
+    A segment older than max_age seconds is served and marked as stale. At most once every STALE_CHECK_INTERVAL
+    seconds it is compared with the series of compute: it is only published again if the fingerprint changed, and
+    its published time is moved forward if the series was fetched again without changes.
+    """
+    series_df = read_series(kind, key, fingerprint=fingerprint)
+    if series_df is None:
+        series_df, age = compute()
+        _publish(kind, key, series_df, age, fingerprint=fingerprint)
+        return series_df
+
+    age = time.time() - series_df.attrs['published']
+    if max_age is None or age <= max_age:
+        return series_df
+
+    name = segment_name(kind, key)
+    now = time.time()
+    if now - _stale_checked.get(name, 0) < STALE_CHECK_INTERVAL:
+        cache.mark_stale(kind, key, age)
+        return series_df
+    _stale_checked[name] = now
+
+    fresh_df, fresh_age = compute()
+    fresh_fingerprint = fresh_df.attrs.get('fingerprint')
+    if fresh_fingerprint is None or fresh_fingerprint != series_df.attrs.get('fingerprint'):
+        _publish(kind, key, fresh_df, fresh_age, fingerprint=fingerprint)
+        return fresh_df
+
+    if fresh_age < age:
+        _touch(name, now - fresh_age)
+    else:
+        cache.mark_stale(kind, key, age)
+    return series_df
+
+
+def list_segments():
+    """
+    Names of the published segments
+    """
+    if not os.path.isdir(SHM_DIR):
+        return []
+    return sorted(name for name in os.listdir(SHM_DIR) if name.startswith(SEGMENT_PREFIX))
+
+
+def clear_segments():
+    """
+    Remove all the published segments, e.g. after a deployment
+    """
+    names = list_segments()
+    for name in names:
+        try:
+            segment = _open_segment(name)
+            segment.unlink()
+            segment.close()
+        except FileNotFoundError:
+            pass
+    return names
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inspect the shared memory station series.')
+    parser.add_argument('--list', action='store_true', help='List the published segments.')
+    parser.add_argument('--clear', action='store_true', help='Remove all the published segments.')
+    args = parser.parse_args()
+
+    if args.clear:
+        print('Removed {0} segments.'.format(len(clear_segments())))
+    else:
+        for segment in list_segments():
+            print(segment)
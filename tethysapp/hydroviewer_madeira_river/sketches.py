@@ -0,0 +1,233 @@
+"""
+Mergeable quantile sketches (t-digest) of the observed and simulated flows of each station and month.
+
+The sketches are updated only with the values newer than the last update, and the flow duration curves used
+for the bias correction are read from them, so building the mapping does not depend on the record length. Each
+sketch keeps the fingerprint of the series it was last updated with, the number of values it holds and a hash of
+the last REVISION_WINDOW of them: a series with the same fingerprint is skipped, and a sketch is rebuilt when the
+upstream revises the values it holds (a different count or a different tail).
+"""
+import os
+import tempfile
+
+import numpy as np
+
+from .bias_correction import PROBABILITIES
+from .config import APP_WORKSPACE
+from .fingerprints import get_fingerprint, values_hash
+
+SKETCHES_DIR = os.path.join(APP_WORKSPACE, 'sketches')
+
+COMPRESSION = 200
+
+KINDS = ('observed', 'simulated')
+
+# Last values of a sketch hashed to detect the revisions of the upstream (the revisions of older values that do
+# not change their count are not detected)
+REVISION_WINDOW = 366
+
+
+class TDigest:
+    """
+    Merging t-digest with the arcsine scale function, compressed with vectorized numpy operations
+    """
+
+    def __init__(self, compression=COMPRESSION, means=None, weights=None, minimum=np.inf, maximum=-np.inf):
+        self.compression = compression
+        self.means = np.empty(0) if means is None else np.asarray(means, dtype=np.float64)
+        self.weights = np.empty(0) if weights is None else np.asarray(weights, dtype=np.float64)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+
+    @property
+    def count(self):
+        return self.weights.sum()
+
+    def _compress(self, means, weights):
+        order = np.argsort(means, kind='mergesort')
+        means = means[order]
+        weights = weights[order]
+
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+
+        # Consecutive centroids in the same unit of the scale function are merged
+        groups = np.floor(k - k[0]).astype(np.int64)
+        groups = np.concatenate([[0], np.cumsum(groups[1:] != groups[:-1])])
+
+        merged_weights = np.bincount(groups, weights=weights)
+        self.means = np.bincount(groups, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+
+    def update(self, values):
+        """
+        Add an array of values, O(new values + centroids)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        values = values[np.isfinite(values)]
+        if len(values) == 0:
+            return
+
+        self.minimum = min(self.minimum, values.min())
+        self.maximum = max(self.maximum, values.max())
+        self._compress(np.concatenate([self.means, values]), np.concatenate([self.weights, np.ones(len(values))]))
+
+    def merge(self, other):
+        """
+        Merge another digest into this one
+        """
+        if len(other.means) == 0:
+            return
+
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self._compress(np.concatenate([self.means, other.means]), np.concatenate([self.weights, other.weights]))
+
+    def quantile(self, q):
+        """
+        Values at the non-exceedance probabilities q, NaN for an empty digest
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if len(self.means) == 0:
+            return np.full(q.shape, np.nan)
+
+        cumulative = np.cumsum(self.weights)
+        positions = (cumulative - self.weights / 2) / cumulative[-1]
+        return np.interp(q, np.concatenate([[0], positions, [1]]),
+                         np.concatenate([[self.minimum], self.means, [self.maximum]]))
+
+
+def _epoch_days(index):
+    return index.values.astype('datetime64[D]').astype(np.int64)
+
+
+def _sketch_file(station_code):
+    return os.path.join(SKETCHES_DIR, '{0}.npz'.format(station_code))
+
+
+def _tail(days, values, last_day):
+    """
+    Number of values up to last_day, and hash of the last REVISION_WINDOW of them (days are sorted)
+    """
+    count = int(np.searchsorted(days, last_day, side='right'))
+    start = max(count - REVISION_WINDOW, 0)
+    return count, values_hash(days[start:count], values[start:count])
+
+
+def new_station_sketches(comid):
+    return {
+        'comid': int(comid),
+        'last_day': {kind: np.iinfo(np.int64).min for kind in KINDS},
+        'fingerprint': {kind: None for kind in KINDS},
+        'count': {kind: 0 for kind in KINDS},
+        'tail': {kind: None for kind in KINDS},
+        'digests': {kind: {month: TDigest() for month in range(1, 13)} for kind in KINDS},
+    }
+
+
+def load_station_sketches(station_code):
+    """
+    Stored sketches of a station, None if there are none
+    """
+    path = _sketch_file(station_code)
+    if not os.path.exists(path):
+        return None
+
+    with np.load(path) as data:
+        sketches = new_station_sketches(int(data['comid']))
+        for kind in KINDS:
+            sketches['last_day'][kind] = int(data['{0}_last_day'.format(kind)])
+            if '{0}_tail'.format(kind) in data.files:
+                sketches['fingerprint'][kind] = str(data['{0}_fingerprint'.format(kind)])
+                sketches['count'][kind] = int(data['{0}_count'.format(kind)])
+                sketches['tail'][kind] = str(data['{0}_tail'.format(kind)])
+            offsets = np.concatenate([[0], np.cumsum(data['{0}_sizes'.format(kind)])])
+            means = data['{0}_means'.format(kind)]
+            weights = data['{0}_weights'.format(kind)]
+            bounds = data['{0}_bounds'.format(kind)]
+            for month in range(1, 13):
+                start, end = offsets[month - 1], offsets[month]
+                sketches['digests'][kind][month] = TDigest(means=means[start:end], weights=weights[start:end],
+                                                           minimum=bounds[month - 1, 0], maximum=bounds[month - 1, 1])
+
+    return sketches
+
+
+def save_station_sketches(station_code, sketches):
+    os.makedirs(SKETCHES_DIR, exist_ok=True)
+
+    arrays = {'comid': np.int64(sketches['comid'])}
+    for kind in KINDS:
+        digests = [sketches['digests'][kind][month] for month in range(1, 13)]
+        arrays['{0}_last_day'.format(kind)] = np.int64(sketches['last_day'][kind])
+        arrays['{0}_fingerprint'.format(kind)] = np.array(sketches['fingerprint'][kind] or '')
+        arrays['{0}_count'.format(kind)] = np.int64(sketches['count'][kind])
+        arrays['{0}_tail'.format(kind)] = np.array(sketches['tail'][kind] or '')
+        arrays['{0}_sizes'.format(kind)] = np.array([len(digest.means) for digest in digests], dtype=np.int64)
+        arrays['{0}_means'.format(kind)] = np.concatenate([digest.means for digest in digests])
+        arrays['{0}_weights'.format(kind)] = np.concatenate([digest.weights for digest in digests])
+        arrays['{0}_bounds'.format(kind)] = np.array([[digest.minimum, digest.maximum] for digest in digests])
+
+    # A temporary file of its own, as several workers can save the sketches of a station at the same time
+    fd, tmp_file = tempfile.mkstemp(dir=SKETCHES_DIR, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_file, _sketch_file(station_code))
+    except Exception:
+        os.remove(tmp_file)
+        raise
+
+
+def update_station_sketches(station_code, comid, simulated_df, observed_df):
+    """
+    Add the values newer than the last update of each series to the monthly sketches of a station.
+    A series with the fingerprint of the last update is skipped without reading it; a series whose values up to
+    the last update changed (e.g. revised by ANA) is sketched again from the start.
+    """
+    sketches = load_station_sketches(station_code)
+    if sketches is None or sketches['comid'] != int(comid):
+        sketches = new_station_sketches(comid)
+
+    changed = False
+    for kind, series_df in (('observed', observed_df), ('simulated', simulated_df)):
+        fingerprint = get_fingerprint(kind, series_df)
+        if fingerprint == sketches['fingerprint'][kind]:
+            continue
+
+        series = series_df.iloc[:, 0].dropna()
+        days = _epoch_days(series.index)
+
+        if sketches['tail'][kind] is None or _tail(days, series.values, sketches['last_day'][kind]) != (
+                sketches['count'][kind], sketches['tail'][kind]):
+            sketches['last_day'][kind] = np.iinfo(np.int64).min
+            sketches['digests'][kind] = {month: TDigest() for month in range(1, 13)}
+
+        new = days > sketches['last_day'][kind]
+        if new.any():
+            values = series.values[new]
+            months = series.index.month.values[new]
+            for month in np.unique(months):
+                sketches['digests'][kind][month].update(values[months == month])
+            sketches['last_day'][kind] = int(days[new].max())
+
+        sketches['fingerprint'][kind] = fingerprint
+        sketches['count'][kind], sketches['tail'][kind] = _tail(days, series.values, sketches['last_day'][kind])
+        changed = True
+
+    if changed:
+        save_station_sketches(station_code, sketches)
+
+    return sketches
+
+
+def fdc_mappings(sketches):
+    """
+    Simulated and observed flow duration curves of every month, read from the sketches
+    """
+    return {
+        month: (sketches['digests']['simulated'][month].quantile(PROBABILITIES),
+                sketches['digests']['observed'][month].quantile(PROBABILITIES))
+        for month in range(1, 13)
+    }
@@ -0,0 +1,48 @@
+from .config import GEOSERVER_WFS_URL, STATIONS_LAYER
+from .lazy_imports import lazy_import
+
+requests = lazy_import('requests')
+
+
+def get_station_features():
+    """
+    Get the Madeira stations layer from the geoserver WFS as GeoJSON features
+    """
+    params = {
+        'service': 'WFS',
+        'version': '1.0.0',
+        'request': 'GetFeature',
+        'typeName': STATIONS_LAYER,
+        'outputFormat': 'application/json',
+        'srsName': 'EPSG:4326',
+    }
+
+    response = requests.get(GEOSERVER_WFS_URL, params=params)
+    response.raise_for_status()
+
+    return response.json()['features']
+
+
+def get_stations():
+    """
+    List the stations of the Madeira layer with the attributes used by the app
+    """
+    stations = []
+
+    for feature in get_station_features():
+        properties = feature['properties']
+        coordinates = feature['geometry']['coordinates']
+        # MultiPoint geometries hold a single point
+        if isinstance(coordinates[0], list):
+            coordinates = coordinates[0]
+
+        stations.append({
+            'station_code': str(properties['CodEstacao']),
+            'station_name': properties['NomeEstaca'],
+            'comid': int(properties['new_COMID']),
+            'river': properties.get('NomeRio'),
+            'lon': coordinates[0],
+            'lat': coordinates[1],
+        })
+
+    return stations
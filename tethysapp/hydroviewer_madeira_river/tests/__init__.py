@@ -0,0 +1,11 @@
+"""
+Tests of the app modules. They run on their own with the Django defaults:
+
+    python -m unittest discover -s tethysapp/hydroviewer_madeira_river/tests -t .
+"""
+import django
+from django.conf import settings
+
+if not settings.configured:
+    settings.configure()
+    django.setup()
@@ -0,0 +1,120 @@
+import time
+import unittest
+from unittest import mock
+
+from django.http import HttpResponse
+
+from tethysapp.hydroviewer_madeira_river import cache
+
+
+def memory_settings(offline=False):
+    return {
+        'backend': 'memory',
+        'location': '',
+        'timeouts': dict(cache.DEFAULT_TIMEOUTS),
+        'max_entries': dict(cache.DEFAULT_MAX_ENTRIES),
+        'offline': offline,
+    }
+
+
+class CacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        for patcher in (mock.patch.dict(cache._settings, memory_settings(), clear=True),
+                        mock.patch.dict(cache._caches, {}, clear=True),
+                        mock.patch.dict(cache._refreshed, {}, clear=True)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: [instance.clear() for instance in cache._caches.values()])
+
+    def store(self, key, value, age):
+        cache.get_cache('observed').set(key, (time.time() - age, value))
+
+    def test_missing_entry_is_computed_and_stored(self):
+        value, age = cache.get_with_age('observed', 'a', lambda: 'fresh')
+        self.assertEqual(value, 'fresh')
+        self.assertEqual(age, 0.0)
+        self.assertEqual(cache.get_or_set('observed', 'a', lambda: 'other'), 'fresh')
+
+    def test_stale_entry_is_served_and_refreshed(self):
+        timeout = cache.DEFAULT_TIMEOUTS['observed']
+        self.store('a', 'old', timeout + 60)
+        compute = mock.Mock(return_value='new')
+
+        with mock.patch.object(cache, '_schedule_refresh') as schedule_refresh:
+            value, age = cache.get_with_age('observed', 'a', compute)
+
+        self.assertEqual(value, 'old')
+        self.assertGreaterEqual(age, timeout + 60)
+        schedule_refresh.assert_called_once_with('observed', 'a', compute)
+        compute.assert_not_called()
+
+    def test_refresh_replaces_the_stale_entry(self):
+        self.store('a', 'old', cache.DEFAULT_TIMEOUTS['observed'] + 60)
+        cache.get_with_age('observed', 'a', lambda: 'new')
+
+        deadline = time.time() + 5
+        while cache._refreshing and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(cache.get_with_age('observed', 'a', lambda: 'other'), ('new', mock.ANY))
+
+    def test_refresh_is_not_retried_before_refresh_retry(self):
+        compute = mock.Mock(return_value='new')
+        with mock.patch.object(cache._refresh_executor, 'submit') as submit:
+            cache._schedule_refresh('observed', 'a', compute)
+            cache._schedule_refresh('observed', 'a', compute)
+        submit.assert_called_once_with(cache._refresh, 'observed', 'a', compute)
+        cache._refreshing.discard(('observed', 'a'))
+
+    def test_fresh_entry_is_not_refreshed(self):
+        self.store('a', 'cached', 10)
+        with mock.patch.object(cache, '_schedule_refresh') as schedule_refresh:
+            value, age = cache.get_with_age('observed', 'a', lambda: 'new')
+        self.assertEqual(value, 'cached')
+        schedule_refresh.assert_not_called()
+
+    def test_offline_missing_entry_raises_offline_error(self):
+        cache._settings['offline'] = True
+        compute = mock.Mock(return_value='new')
+        with self.assertRaises(cache.OfflineError):
+            cache.get_with_age('observed', 'a', compute)
+        compute.assert_not_called()
+
+    def test_offline_stale_entry_is_served_without_refresh(self):
+        cache._settings['offline'] = True
+        self.store('a', 'old', cache.DEFAULT_TIMEOUTS['observed'] + 60)
+        with mock.patch.object(cache, '_schedule_refresh') as schedule_refresh:
+            value, age = cache.get_with_age('observed', 'a', lambda: 'new')
+        self.assertEqual(value, 'old')
+        schedule_refresh.assert_not_called()
+
+    def test_marks_age_of_stale_responses(self):
+        timeout = cache.DEFAULT_TIMEOUTS['observed']
+        self.store('a', 'old', timeout + 60)
+
+        @cache.marks_age
+        def controller(request):
+            return HttpResponse(cache.get_or_set('observed', 'a', lambda: 'new'))
+
+        with mock.patch.object(cache, '_schedule_refresh'):
+            response = controller(None)
+
+        self.assertEqual(response.content, b'old')
+        self.assertGreaterEqual(int(response['Age']), timeout + 60)
+        self.assertEqual(response['Warning'], '110 - "Response is Stale"')
+
+    def test_marks_age_leaves_fresh_responses(self):
+        self.store('a', 'cached', 10)
+
+        @cache.marks_age
+        def controller(request):
+            return HttpResponse(cache.get_or_set('observed', 'a', lambda: 'new'))
+
+        response = controller(None)
+        self.assertFalse(response.has_header('Age'))
+        self.assertFalse(response.has_header('Warning'))
+
+
+if __name__ == '__main__':
+    unittest.main()
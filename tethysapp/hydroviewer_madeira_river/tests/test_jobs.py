@@ -0,0 +1,132 @@
+import queue
+import unittest
+from unittest import mock
+
+from django.http import HttpResponse, JsonResponse
+from django.test import RequestFactory
+
+from tethysapp.hydroviewer_madeira_river import cache, jobs
+from tethysapp.hydroviewer_madeira_river.tests.test_cache import memory_settings
+
+
+class FakeClock:
+    """
+    Stand-in of the time module: sleeping moves the clock forward
+    """
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def controller(request):
+    return JsonResponse({'station': request.GET.get('station')})
+
+
+class JobsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        for patcher in (mock.patch.dict(cache._settings, memory_settings(), clear=True),
+                        mock.patch.dict(cache._caches, {}, clear=True),
+                        mock.patch.dict(jobs._pending, {}, clear=True),
+                        mock.patch.object(jobs, '_queue', queue.Queue()),
+                        mock.patch.object(jobs, '_start_threads'),
+                        mock.patch.object(jobs, 'time', self.clock)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(lambda: [instance.clear() for instance in cache._caches.values()])
+        self.factory = RequestFactory()
+
+    def request(self, **parameters):
+        return self.factory.get('/', dict({'station': 'a', 'async': 'true'}, **parameters))
+
+    def test_identical_submissions_share_a_job(self):
+        job, entry = jobs.submit('controller', controller, self.request())
+        same_job, same_entry = jobs.submit('controller', controller, self.request(_='123'))
+
+        self.assertEqual(job, same_job)
+        self.assertEqual(same_entry['status'], 'queued')
+        self.assertEqual(jobs._queue.qsize(), 1)
+
+        other_job, _ = jobs.submit('controller', controller, self.request(station='b'))
+        self.assertNotEqual(job, other_job)
+        self.assertEqual(jobs._queue.qsize(), 2)
+
+    def test_done_job_is_not_run_again(self):
+        job, _ = jobs.submit('controller', controller, self.request())
+        jobs._queue.get()
+        jobs._pending.pop(job)
+        jobs._run(job, controller, self.request())
+
+        same_job, entry = jobs.submit('controller', controller, self.request())
+        self.assertEqual(same_job, job)
+        self.assertEqual(entry['status'], 'done')
+        self.assertTrue(jobs._queue.empty())
+
+    def test_wait_is_capped_at_max_wait(self):
+        jobs._store('job', {'status': 'queued'})
+        start = self.clock.now
+
+        entry = jobs.wait('job', 3600)
+
+        self.assertEqual(entry['status'], 'queued')
+        self.assertGreaterEqual(self.clock.now - start, jobs.MAX_WAIT)
+        self.assertLessEqual(self.clock.now - start, jobs.MAX_WAIT + jobs.POLL_INTERVAL)
+
+    def test_lost_job_is_reported_as_failed(self):
+        jobs._store('job', {'status': 'running'})
+        self.clock.now += jobs.JOB_TIMEOUT
+
+        entry = jobs.wait('job', 0)
+
+        self.assertEqual(entry['status'], 'failed')
+        self.assertEqual(entry['error'], 'the job was lost')
+
+    def test_lost_job_is_run_again(self):
+        job, _ = jobs.submit('controller', controller, self.request())
+        jobs._queue.get()
+        jobs._pending.pop(job)
+        self.clock.now += jobs.JOB_TIMEOUT
+
+        same_job, entry = jobs.submit('controller', controller, self.request())
+        self.assertEqual(same_job, job)
+        self.assertEqual(jobs._queue.qsize(), 1)
+
+    def test_error_response_fails_the_job(self):
+        jobs._run('job', lambda request: JsonResponse({'error': 'no data'}), self.request())
+        entry = jobs.get_job('job')
+        self.assertEqual(entry['status'], 'failed')
+        self.assertEqual(entry['error'], 'no data')
+
+        jobs._run('job', lambda request: HttpResponse(status=502), self.request())
+        self.assertEqual(jobs.get_job('job')['error'], 'HTTP 502')
+
+    def test_result_of_a_done_job(self):
+        jobs._run('job', controller, self.request())
+        entry = jobs.get_job('job')
+        self.assertEqual(entry['status'], 'done')
+
+        response = jobs.job_response(entry)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content, b'{"station": "a"}')
+
+    def test_per_process_cache_runs_synchronously(self):
+        response = jobs.background(controller)(self.request())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(jobs._queue.empty())
+
+    def test_shared_cache_runs_a_job(self):
+        with mock.patch.object(cache, 'is_shared', return_value=True):
+            response = jobs.background(controller)(self.request())
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(jobs._queue.qsize(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
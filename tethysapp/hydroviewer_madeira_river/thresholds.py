@@ -0,0 +1,284 @@
+"""
+Return-period thresholds of every station reach and basin-wide forecast exceedance alerts.
+
+The thresholds (and the monthly flow duration curves used to correct the forecasts) are computed once
+from the historic simulation and its bias corrected version:
+
+    python -m tethysapp.hydroviewer_madeira_river.thresholds --processes 8
+
+Each forecast cycle only compares the forecast peaks of all the stations against the threshold matrix:
+
+    python -m tethysapp.hydroviewer_madeira_river.thresholds --alerts
+"""
+import argparse
+import datetime as dt
+import json
+import math
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from . import fetchers
+from .bias_correction import PROBABILITIES, apply_mapping, correct_historical
+from .config import APP_WORKSPACE
+from .stations import get_stations
+
+THRESHOLDS_FILE = os.path.join(APP_WORKSPACE, 'return_periods.npz')
+ALERTS_FILE = os.path.join(APP_WORKSPACE, 'forecast_alerts.json')
+
+RETURN_PERIODS = np.array([2, 5, 10, 25, 50, 100])
+
+# Forecast statistics compared against the thresholds
+FORECAST_COLUMNS = ['flow_avg_m^3/s', 'flow_75%_m^3/s', 'flow_max_m^3/s']
+
+ALERT_COLORS = ['#4daf4a', '#fef001', '#fd9a01', '#fd3805', '#8000f6', '#80006a', '#000000']
+
+_loaded = {'mtime': None, 'thresholds': None}
+
+
+def gumbel_return_periods(series_df):
+    """
+    Flows of RETURN_PERIODS from a Gumbel fit of the annual maxima of a daily series
+    """
+    annual_max = series_df.iloc[:, 0].groupby(series_df.index.year).max().dropna().values
+    if len(annual_max) < 2:
+        return np.full(len(RETURN_PERIODS), np.nan)
+
+    frequency_factor = -math.sqrt(6) / math.pi * (0.5772 + np.log(np.log(RETURN_PERIODS / (RETURN_PERIODS - 1))))
+    return annual_max.mean() + frequency_factor * annual_max.std(ddof=1)
+
+
+def return_periods_df(values):
+    """
+    Thresholds in the dataframe layout expected by geoglows.plots (rperiods)
+    """
+    data = {'return_period_{0}'.format(period): [value] for period, value in zip(RETURN_PERIODS, values)}
+    return pd.DataFrame(data)
+
+
+def evaluate_station(station):
+    """
+    Return periods of the simulated and corrected series and the monthly flow duration curves of a station
+    """
+    empty_fdc = np.full((12, len(PROBABILITIES)), np.nan)
+    result = {
+        'simulated': np.full(len(RETURN_PERIODS), np.nan),
+        'corrected': np.full(len(RETURN_PERIODS), np.nan),
+        'simulated_fdc': empty_fdc,
+        'observed_fdc': empty_fdc.copy(),
+    }
+
+    try:
+        simulated_df = fetchers.get_simulated_data(station['comid'])
+        observed_df = fetchers.get_observed_data(station['station_code'])
+        mappings = fetchers.get_fdc_mappings(station['station_code'], station['comid'], simulated_df, observed_df)
+        corrected_df = correct_historical(simulated_df, mappings)
+
+        result['simulated'] = gumbel_return_periods(simulated_df)
+        result['corrected'] = gumbel_return_periods(corrected_df)
+        for month in range(1, 13):
+            result['simulated_fdc'][month - 1], result['observed_fdc'][month - 1] = mappings[month]
+
+    except Exception as e:
+        print('{0}: {1}'.format(station['station_code'], str(e)))
+
+    return result
+
+
+def build_thresholds(processes=None, stations=None):
+    """
+    Compute the thresholds of all the stations in parallel and store them in the app workspace
+    """
+    if stations is None:
+        stations = get_stations()
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        results = list(executor.map(evaluate_station, stations))
+
+    arrays = {
+        'station_code': np.array([station['station_code'] for station in stations]),
+        'station_name': np.array([station['station_name'] for station in stations]),
+        'comid': np.array([station['comid'] for station in stations], dtype=np.int64),
+        'lon': np.array([station['lon'] for station in stations], dtype=np.float64),
+        'lat': np.array([station['lat'] for station in stations], dtype=np.float64),
+        'return_periods': RETURN_PERIODS,
+    }
+    for key in ('simulated', 'corrected', 'simulated_fdc', 'observed_fdc'):
+        arrays[key] = np.stack([result[key] for result in results])
+
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(THRESHOLDS_FILE), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_file, THRESHOLDS_FILE)
+
+    return arrays
+
+
+def load_thresholds():
+    """
+    Precomputed thresholds, reloaded only when the file changes. None if they have not been computed yet.
+    """
+    if not os.path.exists(THRESHOLDS_FILE):
+        return None
+
+    mtime = os.path.getmtime(THRESHOLDS_FILE)
+    if _loaded['mtime'] != mtime:
+        with np.load(THRESHOLDS_FILE) as data:
+            _loaded['thresholds'] = {key: data[key] for key in data.files}
+        _loaded['mtime'] = mtime
+
+    return _loaded['thresholds']
+
+
+def station_return_periods(station_code, corrected=False):
+    """
+    Thresholds of one station as an rperiods dataframe, None if they are not available
+    """
+    thresholds = load_thresholds()
+    if thresholds is None:
+        return None
+
+    rows = np.flatnonzero(thresholds['station_code'] == str(station_code))
+    if len(rows) == 0:
+        return None
+
+    values = thresholds['corrected' if corrected else 'simulated'][rows[0]]
+    if not np.isfinite(values).all():
+        return None
+
+    return return_periods_df(values)
+
+
+def exceedance_levels(peaks, thresholds):
+    """
+    Number of return periods exceeded by each forecast peak, compared in one broadcast.
+    peaks is (station x statistic) and thresholds is (station x return period).
+    """
+    flags = peaks[:, :, None] >= thresholds[:, None, :]
+    return flags.sum(axis=2)
+
+
+def _forecast_peaks(comid):
+    """
+    Issue time, first month and peak of each compared statistic of the current forecast of a reach
+    """
+    try:
+        forecast_df = fetchers.get_forecast_stats(comid)
+        peaks = np.array([forecast_df[column].max() if column in forecast_df.columns else np.nan
+                          for column in FORECAST_COLUMNS])
+        return str(forecast_df.index[0]), forecast_df.index[0].month, peaks
+    except Exception as e:
+        print('{0}: {1}'.format(comid, str(e)))
+        return None, None, np.full(len(FORECAST_COLUMNS), np.nan)
+
+
+def build_alerts(threads=8):
+    """
+    Exceedance flags of the current forecast cycle for all the stations
+    """
+    thresholds = load_thresholds()
+    if thresholds is None:
+        raise ValueError('The return period thresholds have not been computed yet.')
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        forecasts = list(executor.map(_forecast_peaks, thresholds['comid'].tolist()))
+
+    peaks = np.stack([forecast[2] for forecast in forecasts])
+
+    # Correct the peaks with the flow duration curves of the forecast month of each station
+    corrected_peaks = np.full(peaks.shape, np.nan)
+    for i, (issue, month, station_peaks) in enumerate(forecasts):
+        if month is not None:
+            corrected_peaks[i] = apply_mapping(station_peaks, thresholds['simulated_fdc'][i, month - 1],
+                                               thresholds['observed_fdc'][i, month - 1])
+
+    levels = exceedance_levels(peaks, thresholds['simulated'])
+    corrected_levels = exceedance_levels(corrected_peaks, thresholds['corrected'])
+
+    issues = [forecast[0] for forecast in forecasts if forecast[0] is not None]
+    alerts = {
+        'generated': dt.datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%SZ'),
+        'forecast_issue': max(issues) if issues else None,
+        'return_periods': RETURN_PERIODS.tolist(),
+        'statistics': FORECAST_COLUMNS,
+        'stations': [],
+    }
+    for i in range(len(thresholds['comid'])):
+        alerts['stations'].append({
+            'station_code': str(thresholds['station_code'][i]),
+            'station_name': str(thresholds['station_name'][i]),
+            'comid': int(thresholds['comid'][i]),
+            'lon': float(thresholds['lon'][i]),
+            'lat': float(thresholds['lat'][i]),
+            'levels': levels[i].tolist(),
+            'corrected_levels': corrected_levels[i].tolist(),
+        })
+
+    fd, tmp_file = tempfile.mkstemp(dir=os.path.dirname(ALERTS_FILE), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(alerts, f)
+    os.replace(tmp_file, ALERTS_FILE)
+
+    return alerts
+
+
+def load_alerts():
+    """
+    Alerts of the last forecast cycle, None if they have not been computed yet
+    """
+    if not os.path.exists(ALERTS_FILE):
+        return None
+
+    with open(ALERTS_FILE) as f:
+        return json.load(f)
+
+
+def alerts_geojson(alerts, corrected=False):
+    """
+    GeoJSON alert layer, the level is the highest return period exceeded by the average forecast
+    and the possible level the one exceeded by the maximum forecast
+    """
+    key = 'corrected_levels' if corrected else 'levels'
+    return_periods = alerts['return_periods']
+    features = []
+
+    for station in alerts['stations']:
+        level = station[key][0]
+        possible_level = station[key][-1]
+        features.append({
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [station['lon'], station['lat']]},
+            'properties': {
+                'station_code': station['station_code'],
+                'station_name': station['station_name'],
+                'comid': station['comid'],
+                'return_period': return_periods[level - 1] if level > 0 else None,
+                'possible_return_period': return_periods[possible_level - 1] if possible_level > 0 else None,
+                'color': ALERT_COLORS[level],
+            },
+        })
+
+    return {
+        'type': 'FeatureCollection',
+        'features': features,
+        'forecast_issue': alerts['forecast_issue'],
+        'generated': alerts['generated'],
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compute return period thresholds and forecast alerts.')
+    parser.add_argument('--processes', type=int, default=None, help='Number of worker processes.')
+    parser.add_argument('--alerts', action='store_true', help='Only compute the alerts of the current forecast.')
+    args = parser.parse_args()
+
+    if not args.alerts:
+        result = build_thresholds(processes=args.processes)
+        print('Computed thresholds for {0} stations.'.format(len(result['comid'])))
+
+    result = build_alerts()
+    alerted = [station for station in result['stations'] if station['levels'][0] > 0]
+    print('{0} stations exceed the 2 year return period.'.format(len(alerted)))
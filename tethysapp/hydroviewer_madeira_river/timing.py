@@ -0,0 +1,110 @@
+"""
+Timing of the stages of every controller request.
+
+The stages of a request (ANA and GEOGloWS downloads, parsing, bias correction, merging, figure construction,
+rendering) are returned in the Server-Timing header of the response and observed in a Prometheus histogram labelled
+by endpoint, stage and upstream, served by the metrics endpoint. With several worker processes, set
+PROMETHEUS_MULTIPROC_DIR so the metrics endpoint aggregates all of them.
+"""
+import functools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from .lazy_imports import lazy_import
+
+prometheus_client = lazy_import('prometheus_client')
+prometheus_multiprocess = lazy_import('prometheus_client.multiprocess')
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Histogram of the stage durations, registered on first use so importing the controllers does not load
+# prometheus_client
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+# Endpoint and stage durations of the request being handled
+_request = ContextVar('hydroviewer_request', default=None)
+
+
+def stage_seconds():
+    with _histograms_lock:
+        if 'stage_seconds' not in _histograms:
+            _histograms['stage_seconds'] = prometheus_client.Histogram(
+                'hydroviewer_stage_seconds',
+                'Duration of the stages of the Hydroviewer Madeira requests',
+                ['endpoint', 'stage', 'upstream'],
+                buckets=STAGE_BUCKETS,
+            )
+        return _histograms['stage_seconds']
+
+
+@contextmanager
+def stage(name, upstream='none'):
+    """
+    Time a block as a stage of the current request
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        request = _request.get()
+        endpoint = request['endpoint'] if request is not None else 'batch'
+        if request is not None:
+            request['stages'].append((name, duration))
+        stage_seconds().labels(endpoint=endpoint, stage=name, upstream=upstream).observe(duration)
+
+
+def timed_stage(name, upstream='none'):
+    """
+    Decorator timing every call of a function as a stage
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with stage(name, upstream):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def server_timing(stages):
+    """
+    Server-Timing header value, with the durations of repeated stages added together
+    """
+    totals = {}
+    for name, duration in stages:
+        totals[name] = totals.get(name, 0) + duration
+    return ', '.join('{0};dur={1:.1f}'.format(name, duration * 1000) for name, duration in totals.items())
+
+
+def timed(controller):
+    """
+    Decorator of the controllers: times the stages of the request and adds the Server-Timing header
+    """
+    @functools.wraps(controller)
+    def wrapper(request, *args, **kwargs):
+        token = _request.set({'endpoint': controller.__name__, 'stages': []})
+        try:
+            with stage('total'):
+                response = controller(request, *args, **kwargs)
+            response['Server-Timing'] = server_timing(_request.get()['stages'])
+            return response
+        finally:
+            _request.reset(token)
+    return wrapper
+
+
+def metrics_text():
+    """
+    Prometheus exposition of the stage histograms, of all the workers in multiprocess mode
+    """
+    stage_seconds()
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = prometheus_client.CollectorRegistry()
+        prometheus_multiprocess.MultiProcessCollector(registry)
+        return prometheus_client.generate_latest(registry), prometheus_client.CONTENT_TYPE_LATEST
+    return prometheus_client.generate_latest(), prometheus_client.CONTENT_TYPE_LATEST